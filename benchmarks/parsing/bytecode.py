@@ -0,0 +1,50 @@
+"""Benchmark the extraction of the constants (selectors, addresses, storage slots) from the bytecode.
+
+The disassembly is shared by all the bytecode queries (opcodes, control flow, dispatcher...),
+so the extraction is timed on a warm disassembly, like it runs in the scoring pipeline.
+
+Run from the root of the repository:
+python -m benchmarks.parsing.bytecode
+"""
+
+import random
+import re
+import timeit
+
+import ioseeth.parsing.bytecode
+
+# DATA ########################################################################
+
+def generate_bytecode(size: int=24576) -> str:
+    """Emit random instructions up to the size limit of the runtime code, with a share of PUSH4 + EQ, PUSH20 and PUSH32."""
+    __code = bytearray()
+    while len(__code) < size:
+        __opcode = random.choice((0x63, 0x73, 0x7f) + tuple(range(0x00, 0x60)) + tuple(range(0x80, 0xa0)))
+        __code.append(__opcode)
+        __code.extend(random.getrandbits(8) for _ in range(max(0, __opcode - 0x5f)))
+        if __opcode == 0x63:
+            __code.append(ioseeth.parsing.bytecode.EQ)
+    return __code[:size].hex()
+
+# BASELINE ####################################################################
+
+SELECTOR_REGEX = re.compile(ioseeth.parsing.bytecode.selector_regex(raw=True), flags=re.IGNORECASE)
+ADDRESS_REGEX = re.compile(ioseeth.parsing.bytecode.address_regex(raw=True), flags=re.IGNORECASE)
+STORAGE_SLOT_REGEX = re.compile(ioseeth.parsing.bytecode.storage_slot_regex(raw=True), flags=re.IGNORECASE)
+
+def get_constants_with_regexes(bytecode: str) -> tuple:
+    """Previous route: one findall per kind of constant over the HEX string, misaligned matches included."""
+    return (set(SELECTOR_REGEX.findall(bytecode)), set(ADDRESS_REGEX.findall(bytecode)), set(STORAGE_SLOT_REGEX.findall(bytecode)))
+
+def get_constants_from_instructions(bytecode: str) -> ioseeth.parsing.bytecode.Constants:
+    return ioseeth.parsing.bytecode.get_constants.__wrapped__(bytecode=bytecode) # bypass the cache by code hash
+
+# MAIN ########################################################################
+
+if __name__ == '__main__':
+    random.seed(42)
+    __bytecode = generate_bytecode()
+    ioseeth.parsing.bytecode.disassemble(bytecode=__bytecode) # warm
+    for __name, __function in (('regex', get_constants_with_regexes), ('instructions', get_constants_from_instructions)):
+        __time = min(timeit.repeat(lambda: __function(__bytecode), number=100, repeat=5)) / 100
+        print('{name}: {time:.1f}us for {size} bytes'.format(name=__name, time=1e6 * __time, size=len(__bytecode) // 2))
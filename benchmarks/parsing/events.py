@@ -0,0 +1,56 @@
+"""Benchmark the decoding of the Transfer events.
+
+Run from the root of the repository:
+python -m benchmarks.parsing.events
+"""
+
+import random
+import timeit
+
+import web3._utils.events
+
+import ioseeth.parsing.events
+
+# DATA ########################################################################
+
+def generate_transfer_logs(count: int=4000) -> list:
+    """Emit count Transfer events, half with the ERC-20 layout and half with the ERC-721 layout."""
+    __logs = []
+    for __i in range(count):
+        __sender, __recipient, __value = random.getrandbits(160), random.getrandbits(160), random.getrandbits(96)
+        __indexed = bool(__i % 2)
+        __logs.append({
+            'address': '0x{:040x}'.format(random.getrandbits(160)),
+            'topics': ['0x' + ioseeth.parsing.events.TRANSFER_TOPIC.hex(), '0x{:064x}'.format(__sender), '0x{:064x}'.format(__recipient)] + __indexed * ['0x{:064x}'.format(__value)],
+            'data': '0x' if __indexed else '0x{:064x}'.format(__value),
+            'logIndex': __i,
+            'transactionIndex': 0,
+            'transactionHash': '0x' + 64 * '0',
+            'blockHash': '0x' + 64 * '0',
+            'blockNumber': 1})
+    return __logs
+
+# BASELINE ####################################################################
+
+def parse_transfer_events_with_web3(logs: list) -> tuple:
+    """Previous route: web3 event machinery, stringified args parsed back into ints."""
+    __abi = ioseeth.parsing.events.EVENT_ABIS[ioseeth.parsing.events.TRANSFER_TOPIC.hex()]
+    __codec = ioseeth.parsing.events._abi_codec()
+    __rows = []
+    for __log in logs:
+        __variant = ioseeth.parsing.events._generate_the_most_probable_abi_indexation_variant(abi=__abi, indexed=len(__log['topics']) - 1)
+        __args = web3._utils.events.get_event_data(__codec, __variant, __log)['args']
+        __rows.append((__log['address'].lower(), str(__args['from']).lower(), str(__args['to']).lower(), int(str(__args['value']))))
+    return tuple(__rows)
+
+def parse_transfer_events_natively(logs: list) -> tuple:
+    return tuple(zip(*ioseeth.parsing.events.parse_transfer_events(logs=logs)[:4]))
+
+# MAIN ########################################################################
+
+if __name__ == '__main__':
+    __logs = generate_transfer_logs(count=4000)
+    assert parse_transfer_events_with_web3(__logs) == parse_transfer_events_natively(__logs)
+    for __name, __function in (('web3', parse_transfer_events_with_web3), ('native', parse_transfer_events_natively)):
+        __time = min(timeit.repeat(lambda: __function(__logs), number=1, repeat=3))
+        print('{name}: {time:.4f}s for {count} logs'.format(name=__name, time=__time, count=len(__logs)))
@@ -0,0 +1,46 @@
+"""Benchmark the discovery of arrays in large calldata.
+
+Run from the root of the repository:
+python -m benchmarks.parsing.inputs
+"""
+
+import random
+import re
+import timeit
+
+import ioseeth.parsing.inputs
+
+# DATA ########################################################################
+
+def generate_multisend_data(count: int=4999) -> str:
+    """Encode a call to multisend(address[],uint256[]) with count recipients: 2 * count + 4 words."""
+    __addresses = [random.getrandbits(160) | (1 << 159) for _ in range(count)]
+    __values = [random.randint(1, 2 * count) for _ in range(count)] # small amounts, like token ids, are also array length candidates
+    __words = [64, 64 + 32 * (count + 1), count] + __addresses + [count] + __values
+    return '0x' + 'e63d38ed' + ''.join('{:064x}'.format(__w) for __w in __words)
+
+# BASELINE ####################################################################
+
+def get_array_candidates_with_regex(data: str, element_regex: str, element_check: callable, parse_element: callable, min_length: int=4) -> list:
+    """Previous implementation: one regex per length candidate, run on the whole HEX string."""
+    __arrays = []
+    for __l in ioseeth.parsing.inputs.get_array_length_candidates(data):
+        __re = re.compile(ioseeth.parsing.inputs.array_regex(length=__l, element_regex=element_regex))
+        for __a in __re.findall(data.lower()):
+            if ioseeth.parsing.inputs.is_valid_array(data=__a, check=element_check, length=min_length):
+                __arrays.append(ioseeth.parsing.inputs.parse_array(__a, parse_element))
+    return __arrays
+
+def get_matching_arrays_with_regex(data: str, min_length: int=4) -> list:
+    __addresses = get_array_candidates_with_regex(data, ioseeth.parsing.inputs.address_regex(), ioseeth.parsing.inputs.is_valid_address, ioseeth.parsing.inputs.parse_address, min_length)
+    __values = get_array_candidates_with_regex(data, ioseeth.parsing.inputs.value_regex(), ioseeth.parsing.inputs.is_valid_value, ioseeth.parsing.inputs.parse_value, min_length)
+    return [(__a, __v) for __a in __addresses for __v in __values if len(__a) == len(__v)]
+
+# MAIN ########################################################################
+
+if __name__ == '__main__':
+    __data = generate_multisend_data(count=4999)
+    assert get_matching_arrays_with_regex(__data) == ioseeth.parsing.inputs.get_matching_arrays_of_address_and_value(__data)
+    for __name, __function in (('regex', get_matching_arrays_with_regex), ('words', ioseeth.parsing.inputs.get_matching_arrays_of_address_and_value)):
+        __time = min(timeit.repeat(lambda: __function(__data), number=1, repeat=1))
+        print('{name}: {time:.4f}s for {count} words'.format(name=__name, time=__time, count=(len(__data) - 10) // 64))
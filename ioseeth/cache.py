@@ -0,0 +1,197 @@
+"""Cache the results of expensive computations.
+
+The facts derived from a bytecode depend only on its content:
+they are indexed by the hash of the code, so that clones and redeployments
+share the same entries whatever their address.
+"""
+
+import collections
+import functools
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import toolblocks.parsing.common
+import ioseeth.utils
+
+# CONSTANTS ###################################################################
+
+BYTECODE_CACHE_SIZE = 4096
+ATIME_INTERVAL = 60. # seconds, the access times are only refreshed when older, to keep the reads from writing
+
+CacheInfo = collections.namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+_MISSING = object() # sentinel, since None / False are valid results
+
+# HASH ########################################################################
+
+@functools.lru_cache(maxsize=1024)
+def code_hash(bytecode: str) -> str:
+    """Compute the Keccak 256 hash of the code, whatever its encoding (HEX string / bytes)."""
+    return ioseeth.utils.keccak(primitive=toolblocks.parsing.common.to_bytes(bytecode))
+
+# DISK ########################################################################
+
+class DiskStore:
+    """Persist pickled values in a SQLite table, indexed by string keys.
+    When a max size is given (in bytes), the least recently accessed entries are evicted beyond it.
+    The access times have the precision of the refresh interval."""
+
+    def __init__(self, path: str, table: str='cache', maxsize: int=0, interval: float=ATIME_INTERVAL) -> None:
+        self.path = path
+        self.table = table
+        self.maxsize = maxsize
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._size = None # estimate of the total size, refreshed on eviction
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily, and again in forked processes since connections can't be shared."""
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL') # concurrent readers across processes
+            self._connection.execute('CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB, size INTEGER, atime REAL)'.format(table=self.table))
+            self._connection.execute('CREATE INDEX IF NOT EXISTS {table}_atime ON {table} (atime)'.format(table=self.table))
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str, default: any=None) -> any:
+        """Return the value stored for the key, or the default."""
+        with self._lock:
+            __row = self._connect().execute('SELECT value, atime FROM {table} WHERE key = ?'.format(table=self.table), (key,)).fetchone()
+            __now = time.time()
+            if __row and self.maxsize > 0 and __now - __row[1] >= self.interval: # only the bounded stores track the accesses, when stale
+                self._connect().execute('UPDATE {table} SET atime = ? WHERE key = ?'.format(table=self.table), (__now, key))
+        return pickle.loads(__row[0]) if __row else default
+
+    def set(self, key: str, value: any) -> None:
+        """Store or replace the value for the key."""
+        __blob = pickle.dumps(value)
+        with self._lock:
+            self._connect().execute('INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?)'.format(table=self.table), (key, __blob, len(__blob), time.time()))
+            if self.maxsize > 0:
+                self._size = (self.size() if self._size is None else self._size) + len(__blob)
+                if self._size > self.maxsize:
+                    self._evict()
+
+    def size(self) -> int:
+        """Total size of the stored values, in bytes."""
+        return self._connect().execute('SELECT COALESCE(SUM(size), 0) FROM {table}'.format(table=self.table)).fetchone()[0]
+
+    def _evict(self) -> None:
+        """Delete the least recently accessed entries, down to 90% of the max size to amortize the cost."""
+        __excess = self.size() - int(0.9 * self.maxsize) # other processes may have written too
+        __keys = []
+        for __key, __size in self._connect().execute('SELECT key, size FROM {table} ORDER BY atime ASC'.format(table=self.table)):
+            if __excess <= 0:
+                break
+            __keys.append((__key,))
+            __excess -= __size
+        self._connect().executemany('DELETE FROM {table} WHERE key = ?'.format(table=self.table), __keys)
+        self._size = self.size()
+
+    def clear(self) -> None:
+        """Delete all the entries."""
+        with self._lock:
+            self._connect().execute('DELETE FROM {table}'.format(table=self.table))
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM {table}'.format(table=self.table)).fetchone()[0]
+
+# MEMORY ######################################################################
+
+class LRUCache:
+    """Bounded in-memory cache, optionally backed by a disk store."""
+
+    def __init__(self, maxsize: int=BYTECODE_CACHE_SIZE, store: DiskStore=None) -> None:
+        self.maxsize = maxsize
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def _remember(self, key: tuple, value: any) -> None:
+        """Insert the value in memory, evicting the least recently used entries beyond the max size."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > max(0, self.maxsize):
+                self._data.popitem(last=False)
+
+    def get(self, key: tuple, default: any=None) -> any:
+        """Return the cached value, from memory then disk, or the default."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+        __value = self.store.get(repr(key), _MISSING) if self.store is not None else _MISSING
+        with self._lock:
+            if __value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        self._remember(key=key, value=__value)
+        return __value
+
+    def set(self, key: tuple, value: any) -> None:
+        """Cache the value in memory and on disk."""
+        self._remember(key=key, value=value)
+        if self.store is not None:
+            self.store.set(repr(key), value)
+
+    def info(self) -> CacheInfo:
+        """Report the hit and miss counts, like functools.lru_cache."""
+        with self._lock:
+            return CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._data))
+
+    def clear(self) -> None:
+        """Empty the memory and reset the statistics, the disk store is left untouched."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+# BYTECODE ####################################################################
+
+BYTECODE_CACHE = LRUCache(maxsize=BYTECODE_CACHE_SIZE)
+
+def configure_bytecode_cache(maxsize: int=BYTECODE_CACHE_SIZE, path: str='') -> LRUCache:
+    """Replace the cache of the bytecode analysis, optionally persisted in a SQLite file."""
+    global BYTECODE_CACHE
+    BYTECODE_CACHE = LRUCache(maxsize=maxsize, store=DiskStore(path=path) if path else None)
+    return BYTECODE_CACHE
+
+def memoize_by_code_hash(func: callable) -> callable:
+    """Cache the results of a function of the bytecode, indexed by the hash of the code and the other arguments.
+    The other code arguments, named "*_bytecode", are indexed by their hash too, whether passed by position or keyword."""
+    __name = '{module}.{name}'.format(module=func.__module__, name=func.__qualname__)
+    __params = tuple(__p.name for __p in inspect.signature(func).parameters.values() if __p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD))
+
+    @functools.wraps(func)
+    def __wrapper(*args, **kwargs) -> any:
+        # name the positional arguments, so that both call shapes share the same key
+        __named = dict(zip(__params, args), **kwargs)
+        __args = args[len(__params):]
+        __bytecode = __named.pop('bytecode', '')
+        try:
+            __kwargs = tuple(sorted((__k, code_hash(__v) if __k.endswith('_bytecode') else __v) for __k, __v in __named.items()))
+            __key = (__name, code_hash(__bytecode), __args, __kwargs)
+            hash(__key)
+        except TypeError: # unhashable arguments, like ABIs
+            return func(*args, **kwargs)
+        __value = BYTECODE_CACHE.get(__key, _MISSING)
+        if __value is _MISSING:
+            __value = func(*args, **kwargs)
+            BYTECODE_CACHE.set(__key, __value)
+        return __value
+
+    return __wrapper
@@ -6,21 +6,25 @@ from web3 import Web3
 
 import toolblocks.parsing.common as fpc
 import ioseeth.indicators.wordlists as wordlists
-import ioseeth.parsing.abi as abi
 import ioseeth.parsing.balances as balances
 import ioseeth.parsing.events as events
 import ioseeth.parsing.inputs as inputs
 
 # SELECTORS INDICATORS ########################################################
 
-KNOWN_SIGNATURES = (
-    wordlists.generate_signature_wordlist(pattern=wordlists.PATTERNS[0], verbs=wordlists.VERBS, adjectives=wordlists.ADJECTIVES, tokens=wordlists.TOKENS, nouns=wordlists.NOUNS, args=wordlists.ARGS)
-    + wordlists.generate_signature_wordlist(pattern=wordlists.PATTERNS[1], verbs=wordlists.VERBS, adjectives=wordlists.ADJECTIVES, tokens=wordlists.TOKENS, nouns=wordlists.NOUNS, args=wordlists.ARGS))
+def __getattr__(name: str) -> any:
+    """Expand the wordlists only when the legacy constants are actually accessed."""
+    if name == 'KNOWN_SIGNATURES':
+        return wordlists.generate_batching_signatures()
+    if name == 'KNOWN_SELECTORS':
+        return wordlists.map_selectors_to_batching_signatures()
+    raise AttributeError('module {module} has no attribute {name}'.format(module=__name__, name=name))
 
-KNOWN_SELECTORS = {abi.calculate_selector(_s): _s for _s in KNOWN_SIGNATURES}
-
-def input_data_has_batching_selector(data: str, known: tuple=tuple(KNOWN_SELECTORS)) -> bool:
-    return fpc.to_hexstr(data)[:8].lower() in known # selector => signature mapping
+def input_data_has_batching_selector(data: str, known: tuple=None) -> bool:
+    __selector = fpc.to_hexstr(data)[:8].lower()
+    if known is not None:
+        return __selector in known # selector => signature mapping
+    return len(__selector) == 8 and wordlists.table_has_selector(selector=int(__selector, 16)) # binary search in the precomputed table
 
 # INPUTS INDICATORS ###########################################################
 
@@ -37,29 +41,26 @@ def input_data_has_matching_arrays_of_values_and_addresses(data: str, min_length
 
 # TODO: add ERC1155
 
+# the logs can be given raw or already parsed with events.parse_transfer_events, to decode them once per transaction
+
 def log_has_multiple_erc20_transfer_events(logs: tuple, min_count: int, min_total: int) -> bool:
-    _events = events.filter_logs_for_erc20_transfer_events(logs=logs)
-    _amounts = [int(_e['value']) for _e in _events]
-    return len(_events) >= min_count and sum(_amounts) >= min_total
+    _events = events.parse_transfer_events(logs=logs)
+    return len(_events.value) >= min_count and sum(_events.value) >= min_total
 
 def log_has_multiple_erc20_mint_events(logs: tuple, min_count: int, min_total: int) -> bool:
-    _events = events.filter_logs_for_erc20_transfer_events(logs=logs)
-    _amounts = [int(_e['value']) for _e in _events]
-    _origins = [int(_e['from'], 16) == 0 for _e in _events] # creation / minting of tokens
-    return len(_events) >= min_count and sum(_amounts) >= min_total and all(_origins)
+    _events = events.parse_transfer_events(logs=logs)
+    return len(_events.value) >= min_count and sum(_events.value) >= min_total and all(_events.is_mint)
 
 def log_has_erc20_transfer_of_null_amount(logs: tuple) -> bool:
-    _events = events.filter_logs_for_erc20_transfer_events(logs=logs)
-    _amounts = [int(_e['value']) for _e in _events]
-    return any([_a == 0 for _a in _amounts])
+    _events = events.parse_transfer_events(logs=logs)
+    return any([_a == 0 for _a in _events.value])
 
 def log_has_multiple_erc721_transfer_events(logs: tuple, min_count: int) -> bool:
-    return len(events.filter_logs_for_erc721_transfer_events(logs=logs)) >= min_count
+    return len(events.parse_transfer_events(logs=logs).value) >= min_count # ERC-20 and ERC-721 "Transfer" events have the same signature
 
 def log_has_multiple_erc721_mint_events(logs: tuple, min_count: int) -> bool:
-    _events = events.filter_logs_for_erc721_transfer_events(logs=logs)
-    _origins = [int(_e['from'], 16) == 0 for _e in _events] # creation / minting of tokens
-    return len(_events) >= min_count and all(_origins)
+    _events = events.parse_transfer_events(logs=logs)
+    return len(_events.value) >= min_count and all(_events.is_mint)
 
 # VALUE INDICATORS ###########################################################
 
@@ -78,3 +79,8 @@ def multiple_native_token_balances_changed(w3: Web3, data: str, block: int, min_
 
 def native_token_balance_changed(w3: Web3, address: str, block: int, tolerance: int=10**17) -> bool:
     return balances.get_balance_delta(w3=w3, address=address, block=block) > tolerance # in case the contract has a fee, set to 0.1 EHT by default
+
+async def multiple_native_token_balances_changed_async(provider: 'ioseeth.scraping.rpc.AsyncBatchProvider', data: str, block: int, min_count: int, min_total: int) -> bool:
+    _recipients = list(itertools.chain.from_iterable(inputs.get_array_of_address_candidates(data=data, min_length=min_count)))
+    _deltas = (await balances.get_balance_deltas_async(provider=provider, addresses=_recipients, block=block)).values() # all the queries are batched
+    return len(_deltas) >= min_count and sum(_deltas) >= min_total
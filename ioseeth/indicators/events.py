@@ -54,6 +54,13 @@ def erc20_transfer_constraints(inputs: dict, **kwargs) -> int:
 
 EVENT_CONSTRAINTS[ioseeth.utils.keccak(text='Transfer(address,address,uint256)')] = erc20_transfer_constraints
 
+def check_transfer_events_constraints(logs: tuple) -> tuple:
+    """Check the constraints on all the Transfer events of a transaction, from its parsed view."""
+    __transfers = ioseeth.parsing.events.parse_transfer_events(logs=logs)
+    return tuple(
+        erc20_transfer_constraints(inputs={'from': __s, 'to': __r, 'value': __v})
+        for __s, __r, __v in zip(__transfers.sender, __transfers.recipient, __transfers.value))
+
 # ERC-721 #####################################################################
 
 def erc721_transfer_constraints(inputs: dict, **kwargs) -> int:
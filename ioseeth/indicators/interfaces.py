@@ -0,0 +1,39 @@
+"""Index the selectors of known interfaces, to evaluate all of them from a single extraction."""
+
+import collections.abc
+
+import ioseeth.parsing.abi
+import ioseeth.parsing.bytecode
+
+# REGISTRY ####################################################################
+
+INTERFACES = {} # name => set of selectors, as integers
+
+def compile_selectors(selectors: collections.abc.Iterable) -> frozenset:
+    """Convert HEX selectors into a set of integers."""
+    return frozenset(int(__s, 16) for __s in selectors)
+
+def compile_abi(abi: tuple) -> frozenset:
+    """Hash the functions of an ABI into a set of integer selectors."""
+    return compile_selectors(ioseeth.parsing.abi.map_selectors_to_signatures(abi=abi, target='function').keys())
+
+def register_interface(name: str, selectors: frozenset, index: dict=INTERFACES) -> None:
+    """Add an interface to the registry, it is compiled once and for all."""
+    index[name] = frozenset(selectors)
+
+# COVERAGE ####################################################################
+
+def get_interface_coverage(bytecode: str, names: tuple=(), index: dict=INTERFACES) -> dict:
+    """Calculate the ratio of each interface implemented by the bytecode, from a single extraction of its selectors."""
+    __selectors = ioseeth.parsing.bytecode.get_selectors(bytecode=bytecode)
+    return {
+        __name: (len(__selectors & __interface) / len(__interface) if __interface else 1.)
+        for __name, __interface in index.items() if __name in names or not names}
+
+def bytecode_has_known_interface(bytecode: str, name: str, threshold: float=0.8, index: dict=INTERFACES) -> bool:
+    """Check if the bytecode implements a registered interface."""
+    return get_interface_coverage(bytecode=bytecode, names=(name,), index=index).get(name, 0.) >= threshold
+
+def bytecode_has_any_known_interface(bytecode: str, names: tuple, threshold: float=0.8, index: dict=INTERFACES) -> bool:
+    """Check if the bytecode implements any of the given interfaces."""
+    return any(__c >= threshold for __c in get_interface_coverage(bytecode=bytecode, names=names, index=index).values())
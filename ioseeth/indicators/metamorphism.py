@@ -1,6 +1,8 @@
 """Generic indicators for smart contracts."""
 
+import ioseeth.cache
 import ioseeth.parsing.bytecode
+import ioseeth.parsing.signatures
 
 # KNWON #######################################################################
 
@@ -9,8 +11,11 @@ import ioseeth.parsing.bytecode
 INIT_CODES = (
     '5860208158601c335a63aaf10f428752fa158151803b80938091923cf3',)
 
+ioseeth.parsing.signatures.register_signatures(prefix='metamorphism/init-code', patterns=dict(enumerate(INIT_CODES)))
+
 # CREATION CODE ###############################################################
 
+@ioseeth.cache.memoize_by_code_hash
 def bytecode_has_known_metamorphic_init_code(bytecode: str) -> bool:
     """Check whether the creation bytecode contains known init code to setup metamorphic contracts."""
-    return any(__i in bytecode for __i in INIT_CODES)
+    return ioseeth.parsing.signatures.count_signatures(bytecode=bytecode, names=ioseeth.parsing.signatures.get_family(prefix='metamorphism/init-code')) > 0
@@ -2,7 +2,13 @@
 
 import web3
 
+import toolblocks.parsing.common
+
+import ioseeth.indicators.interfaces
 import ioseeth.parsing.bytecode
+import ioseeth.parsing.clones
+import ioseeth.parsing.interpreter
+import ioseeth.parsing.signatures
 
 # CONSTANTS ###################################################################
 
@@ -21,7 +27,7 @@ BEACON_SLOTS = {
     'erc-1967': 'a3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50',}
 
 INTERFACES = {
-    'erc-1167': (
+    'erc-1167/child': (
         # bytes4(keccak256("implementation()"))
         '5c60da1b',
         # bytes4(keccak256("childImplementation()"))
@@ -36,6 +42,16 @@ INTERFACES = {
         # Comptroller: bytes4(keccak256("comptrollerImplementation()"))
         'bb82aa5e',),}
 
+ioseeth.parsing.signatures.register_signatures(prefix='proxy/logic-slot', patterns=LOGIC_SLOTS)
+ioseeth.parsing.signatures.register_signatures(prefix='proxy/beacon-slot', patterns=BEACON_SLOTS)
+
+def _register(interfaces: dict=INTERFACES) -> None:
+    """Compile the proxy interfaces into the shared registry."""
+    for __name, __selectors in interfaces.items():
+        ioseeth.indicators.interfaces.register_interface(name=__name, selectors=ioseeth.indicators.interfaces.compile_selectors(selectors=__selectors))
+
+_register()
+
 # PROXY #######################################################################
 
 #TODO improve bytecode disassembly: wrong opcode
@@ -44,17 +60,52 @@ INTERFACES = {
 def bytecode_redirects_execution(bytecode: str, opcodes: tuple=DELEGATE_OPCODES) -> bool:
     return any(_o in bytecode for _o in opcodes)
 
+# INTERFACES ##################################################################
+
+def bytecode_has_proxy_interface(bytecode: str, threshold: float=1.) -> bool:
+    return ioseeth.indicators.interfaces.bytecode_has_any_known_interface(bytecode=bytecode, names=tuple(INTERFACES), threshold=threshold)
+
 # STANDARDS ###################################################################
 
+def _get_storage_slots(bytecode: str) -> frozenset:
+    """Combine the literal words with the slots resolved by the interpreter, when they are computed (keccak, slot - 1)."""
+    return frozenset(ioseeth.parsing.bytecode.get_storage_slots(bytecode=bytecode)) | frozenset(ioseeth.parsing.interpreter.get_storage_slots(bytecode=bytecode))
+
+def _count_standard_proxy_slots(bytecode: str, standards: dict, enough: int=0) -> int:
+    """Query the registered signatures for the known slots, scan for the others, and complete with the computed slots.
+    The interpreter only runs when the literal matches are fewer than enough (all the standards by default)."""
+    __hits = ioseeth.parsing.signatures.get_signature_hits(bytecode=bytecode)
+    __names = {_slot: ioseeth.parsing.signatures.lookup_signature(pattern=_slot) for _slot in standards.values()}
+    __found = [(__names[_slot] in __hits if __names[_slot] else _slot in bytecode) for _slot in standards.values()]
+    if sum(__found) >= (enough or len(__found)):
+        return sum(__found)
+    __slots = frozenset(ioseeth.parsing.interpreter.get_storage_slots(bytecode=bytecode))
+    return sum(__f or _slot in __slots for __f, _slot in zip(__found, standards.values()))
+
 def bytecode_uses_standard_proxy_slots(bytecode: str, standards: dict=LOGIC_SLOTS) -> bool:
-    return any(_slot in bytecode for _slot in standards.values())
+    return _count_standard_proxy_slots(bytecode=bytecode, standards=standards, enough=1) > 0
 
 def bytecode_has_proxy_slots_from_several_standards(bytecode: str, standards: dict=LOGIC_SLOTS) -> bool:
-    return sum(_slot in bytecode for _slot in standards.values()) > 1
+    return _count_standard_proxy_slots(bytecode=bytecode, standards=standards, enough=2) > 1
 
 # LOGIC CONTRACT ##############################################################
 
-def storage_logic_addresses(w3: web3.Web3, address: str, bytecode: str, standards: dict=LOGIC_SLOTS) -> bool:
-    _slots = ioseeth.parsing.bytecode.get_storage_slots(bytecode=bytecode)
-    _values = (w3.eth.get_storage_at(address, _s) for _s in standards.values() if _s in _slots)
-    return ('0x' + (_v.hex())[26:] for _v in _values if int(_v.hex(), 16) > 0)
+def parse_slot_address(value: any) -> str:
+    """Read the address stored in a storage word, or an empty string if the slot is empty."""
+    __word = toolblocks.parsing.common.to_bytes(value)[-20:]
+    return '0x' + __word.hex() if int.from_bytes(__word, 'big') > 0 else ''
+
+def storage_logic_addresses(w3: web3.Web3, address: str, bytecode: str, standards: dict=LOGIC_SLOTS) -> tuple:
+    """Read the implementations stored in the standard slots, and in the other slots the bytecode delegates to."""
+    _slots = _get_storage_slots(bytecode=bytecode)
+    _delegated = ioseeth.parsing.interpreter.get_delegated_slots(bytecode=bytecode)
+    _queried = [_s for _s in standards.values() if _s in _slots] + [_s for _s in _delegated if _s not in standards.values()]
+    _values = [w3.eth.get_storage_at(address, '0x' + _s) for _s in _queried]
+    return tuple(_a for _a in map(parse_slot_address, _values) if _a)
+
+# MINIMAL PROXY ###############################################################
+
+def get_minimal_proxy_implementation(bytecode: str) -> str:
+    """Extract the implementation hardcoded in a minimal proxy (ERC-1167 & co), without any RPC call."""
+    __clone = ioseeth.parsing.clones.classify_clone(bytecode=bytecode)
+    return __clone.implementation if __clone is not None else ''
@@ -1,65 +1,75 @@
 """Indicators on anti-debugging techniques."""
 
-import re
-
+import ioseeth.cache
 import ioseeth.parsing.bytecode
+import ioseeth.parsing.creation
+import ioseeth.parsing.patterns
 
-# REGEX #######################################################################
-
-def cast_to_address_regex() -> str:
-    """Regex matching a cast to the address type."""
-    return r'73ffffffffffffffffffffffffffffffffffffffff16'
+# PATTERNS ####################################################################
 
-def null_value_regex() -> str:
-    """Regex matching a null value: PUSH 0 then optionally DUP."""
-    return r'(?:6000|5f)(?:8[01234])?'
+def null_value_pattern() -> tuple:
+    """Instructions pushing a null value: PUSH 0 then optionally DUP."""
+    return ioseeth.parsing.patterns.sequence(
+        ioseeth.parsing.patterns.either(ioseeth.parsing.patterns.push(0), ioseeth.parsing.patterns.push(1, argument=0)),
+        ioseeth.parsing.patterns.optional(ioseeth.parsing.patterns.token(*range(ioseeth.parsing.bytecode.DUP1, ioseeth.parsing.bytecode.DUP5 + 1))))
 
-def null_address_regex() -> str:
-    """Regex matching a null address, in the bytecode."""
-    return null_value_regex() + cast_to_address_regex()
+def cast_to_address_pattern() -> tuple:
+    """Instructions casting to the address type: AND with a 20 bytes mask."""
+    return ioseeth.parsing.patterns.sequence(
+        ioseeth.parsing.patterns.push(20, argument=2**160 - 1),
+        ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.AND))
 
-def coinbase_address_regex() -> str:
-    """Regex matching a coinbase cast to address, in the bytecode."""
-    return r'41' + cast_to_address_regex()
+def equality_test_pattern() -> tuple:
+    """Instructions testing an equality: SUB / EQ + ISZERO."""
+    return ioseeth.parsing.patterns.either(
+        ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.SUB),
+        ioseeth.parsing.patterns.sequence(ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.EQ), ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.ISZERO)))
 
-def equality_test_regex() -> str:
-    """Regex matching an equality test: SUB / EQ."""
-    return r'(?:03|1415)'
+def jumpi_pattern() -> tuple:
+    """Instructions jumping on a condition: PUSH the destination then JUMPI."""
+    return ioseeth.parsing.patterns.sequence(
+        ioseeth.parsing.patterns.push(1, 2, 3),
+        ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.JUMPI))
 
-def jumpi_regex() -> str:
-    """Regex matching a conditional jump: PUSH the destination then JUMPI."""
-    return r'6[012][0-9a-f]{2,6}57'
+def coinbase_test_pattern() -> tuple:
+    """Instructions testing block.coinbase: COINBASE, optionally cast and compared to a null value, then JUMPI."""
+    return ioseeth.parsing.patterns.sequence(
+        ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.COINBASE),
+        ioseeth.parsing.patterns.optional(cast_to_address_pattern()),
+        ioseeth.parsing.patterns.optional(null_value_pattern()),
+        ioseeth.parsing.patterns.optional(cast_to_address_pattern()),
+        ioseeth.parsing.patterns.optional(equality_test_pattern()),
+        jumpi_pattern())
 
-def coinbase_test_regex() -> str:
-    """Regex matching a test on block.coinbase, in the bytecode."""
-    __coinbase = '41'
-    __null = null_value_regex()
-    __cast = cast_to_address_regex()
-    __eq = equality_test_regex()
-    __jump = jumpi_regex()
-    return '(?:{null})?(?:{cast})?{coinbase}(?:{cast})?(?:{null})?(?:{cast})?(?:{test})?{jump}'.format(null=__null, cast=__cast, coinbase=__coinbase, test=__eq, jump=__jump)
+def difficulty_test_pattern() -> tuple:
+    """Instructions testing block.difficulty / prevrandao (0x44): PREVRANDAO, optionally compared, then JUMPI."""
+    return ioseeth.parsing.patterns.sequence(
+        ioseeth.parsing.patterns.token(ioseeth.parsing.bytecode.PREVRANDAO),
+        ioseeth.parsing.patterns.optional(equality_test_pattern()),
+        jumpi_pattern())
 
-def difficulty_test_regex() -> str:
-    """Regex matching a test on block.difficulty / prevrandao (0x44), in the bytecode."""
-    __null = null_value_regex()
-    __eq = equality_test_regex()
-    __jump = jumpi_regex()
-    return '(?:{null})?44(?:{test})?{jump}'.format(null=__null, test=__eq, jump=__jump)
+COINBASE_TEST_MATCHER = ioseeth.parsing.patterns.Matcher(pattern=coinbase_test_pattern())
+DIFFICULTY_TEST_MATCHER = ioseeth.parsing.patterns.Matcher(pattern=difficulty_test_pattern())
 
 # RED-PILL TESTS ##############################################################
 
+def _search(matcher: ioseeth.parsing.patterns.Matcher, bytecode: str) -> bool:
+    """Search the reachable code of every contract in the data: the runtime code embedded in creation data is unreachable from its init code."""
+    return any(
+        matcher.search(bytecode=__code)
+        for __contract in ioseeth.parsing.creation.iterate_over_contracts(bytecode=bytecode)
+        for __code in __contract if __code)
+
+@ioseeth.cache.memoize_by_code_hash
 def bytecode_has_coinbase_test(bytecode: str) -> bool:
     """Check whether the contract tries to detect a simulation env by looking for default values in block.coinbase."""
-    __match = False
-    # make sure data is not interpreted as the COINBASE opcode (HEX in PUSH instruction or HEX after the end of the contract)
-    if ioseeth.parsing.bytecode.bytecode_has_specific_opcode(bytecode=bytecode, opcode=ioseeth.parsing.bytecode.COINBASE):
-        __match = bool(re.findall(pattern=coinbase_test_regex(), string=bytecode))
-    return __match
+    if ioseeth.parsing.bytecode.COINBASE not in ioseeth.parsing.bytecode.get_opcodes(bytecode=bytecode, reachable=False):
+        return False # skip the scan
+    return _search(matcher=COINBASE_TEST_MATCHER, bytecode=bytecode) # the data in PUSH instructions and after the end of the contract is not matched
 
+@ioseeth.cache.memoize_by_code_hash
 def bytecode_has_difficulty_test(bytecode: str) -> bool:
     """Check whether the contract tries to detect a simulation env by looking for default values in block.difficulty."""
-    __match = False
-    # make sure data is not interpreted as the PREVRANDAO / DIFFICULTY opcode (HEX in PUSH instruction or HEX after the end of the contract)
-    if ioseeth.parsing.bytecode.bytecode_has_specific_opcode(bytecode=bytecode, opcode=ioseeth.parsing.bytecode.PREVRANDAO):
-        __match = bool(re.findall(pattern=difficulty_test_regex(), string=bytecode))
-    return __match
+    if ioseeth.parsing.bytecode.PREVRANDAO not in ioseeth.parsing.bytecode.get_opcodes(bytecode=bytecode, reachable=False):
+        return False # skip the scan
+    return _search(matcher=DIFFICULTY_TEST_MATCHER, bytecode=bytecode)
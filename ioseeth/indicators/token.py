@@ -1,8 +1,10 @@
 """Indicators on token contracts."""
 
 import ioseeth.indicators.generic
+import ioseeth.indicators.interfaces
 import ioseeth.parsing.abi
 import ioseeth.parsing.bytecode
+import ioseeth.parsing.clones
 import ioseeth.parsing.inputs
 
 # CONSTANTS ###################################################################
@@ -12,31 +14,55 @@ ERC20_ABI = ioseeth.parsing.abi.load(path='token/ERC20/ERC20.json')
 ERC721_ABI = ioseeth.parsing.abi.load(path='token/ERC721/ERC721.json')
 ERC1155_ABI = ioseeth.parsing.abi.load(path='token/ERC1155/ERC1155.json')
 
+INTERFACES = {
+    'erc-20': ERC20_ABI,
+    'erc-721': ERC721_ABI,
+    'erc-777': ERC777_ABI,
+    'erc-1155': ERC1155_ABI,}
+
+def _register(interfaces: dict=INTERFACES) -> None:
+    """Compile the token interfaces into the shared registry, in a function scope to keep the module namespace clean."""
+    for __name, __abi in interfaces.items():
+        ioseeth.indicators.interfaces.register_interface(name=__name, selectors=ioseeth.indicators.interfaces.compile_abi(abi=__abi))
+
+_register()
+
+# GENERIC #####################################################################
+
+def _resolve_code(bytecode: str, implementations: dict) -> str:
+    """Analyse the implementation in place of its clones, or nothing when it is unknown: clones have no interface of their own."""
+    __clone = ioseeth.parsing.clones.classify_clone(bytecode=bytecode)
+    return bytecode if __clone is None else implementations.get(__clone.implementation, '')
+
+def _bytecode_has_token_interface(bytecode: str, name: str, abi: tuple, threshold: float, implementations: dict) -> bool:
+    """Use the precompiled selectors for the standard ABIs, and hash the others on the fly."""
+    __code = _resolve_code(bytecode=bytecode, implementations=implementations)
+    return bool(__code) and (
+        ioseeth.indicators.interfaces.bytecode_has_known_interface(bytecode=__code, name=name, threshold=threshold) if abi is INTERFACES[name]
+        else ioseeth.indicators.generic.bytecode_has_specific_interface(bytecode=__code, abi=abi, threshold=threshold))
+
 # ERC-20 ######################################################################
 
-def bytecode_has_erc20_interface(bytecode: str, abi: tuple=ERC20_ABI, threshold: float=0.8) -> bool:
-    return ioseeth.indicators.generic.bytecode_has_specific_interface(bytecode=bytecode, abi=abi, threshold=threshold)
+def bytecode_has_erc20_interface(bytecode: str, abi: tuple=ERC20_ABI, threshold: float=0.8, implementations: dict=ioseeth.parsing.clones.IMPLEMENTATIONS) -> bool:
+    return _bytecode_has_token_interface(bytecode=bytecode, name='erc-20', abi=abi, threshold=threshold, implementations=implementations)
 
 # ERC-721 #####################################################################
 
-def bytecode_has_erc721_interface(bytecode: str, abi: tuple=ERC721_ABI, threshold: float=0.8) -> bool:
-    return ioseeth.indicators.generic.bytecode_has_specific_interface(bytecode=bytecode, abi=abi, threshold=threshold)
+def bytecode_has_erc721_interface(bytecode: str, abi: tuple=ERC721_ABI, threshold: float=0.8, implementations: dict=ioseeth.parsing.clones.IMPLEMENTATIONS) -> bool:
+    return _bytecode_has_token_interface(bytecode=bytecode, name='erc-721', abi=abi, threshold=threshold, implementations=implementations)
 
 # ERC-777 #####################################################################
 
-def bytecode_has_erc777_interface(bytecode: str, abi: tuple=ERC777_ABI, threshold: float=0.8) -> bool:
-    return ioseeth.indicators.generic.bytecode_has_specific_interface(bytecode=bytecode, abi=abi, threshold=threshold)
+def bytecode_has_erc777_interface(bytecode: str, abi: tuple=ERC777_ABI, threshold: float=0.8, implementations: dict=ioseeth.parsing.clones.IMPLEMENTATIONS) -> bool:
+    return _bytecode_has_token_interface(bytecode=bytecode, name='erc-777', abi=abi, threshold=threshold, implementations=implementations)
 
 # ERC-1155 ####################################################################
 
-def bytecode_has_erc1155_interface(bytecode: str, abi: tuple=ERC1155_ABI, threshold: float=0.8) -> bool:
-    return ioseeth.indicators.generic.bytecode_has_specific_interface(bytecode=bytecode, abi=abi, threshold=threshold)
+def bytecode_has_erc1155_interface(bytecode: str, abi: tuple=ERC1155_ABI, threshold: float=0.8, implementations: dict=ioseeth.parsing.clones.IMPLEMENTATIONS) -> bool:
+    return _bytecode_has_token_interface(bytecode=bytecode, name='erc-1155', abi=abi, threshold=threshold, implementations=implementations)
 
 # ANY TOKEN ###################################################################
 
-def bytecode_has_any_token_interface(bytecode: str, threshold: float=0.8) -> bool:
-    return (
-        bytecode_has_erc20_interface(bytecode=bytecode, threshold=threshold)
-        or bytecode_has_erc721_interface(bytecode=bytecode, threshold=threshold)
-        or bytecode_has_erc777_interface(bytecode=bytecode, threshold=threshold)
-        or bytecode_has_erc1155_interface(bytecode=bytecode, threshold=threshold))
+def bytecode_has_any_token_interface(bytecode: str, threshold: float=0.8, implementations: dict=ioseeth.parsing.clones.IMPLEMENTATIONS) -> bool:
+    __code = _resolve_code(bytecode=bytecode, implementations=implementations)
+    return bool(__code) and ioseeth.indicators.interfaces.bytecode_has_any_known_interface(bytecode=__code, names=tuple(INTERFACES), threshold=threshold)
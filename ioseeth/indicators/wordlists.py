@@ -4,7 +4,17 @@ Ex:
 - bulkTransferToken(address,address[],uint[])
 """
 
+import collections.abc
+import functools
 import itertools
+import mmap
+import os.path
+import tempfile
+
+import numpy
+
+import ioseeth.parsing.abi
+import ioseeth.utils
 
 # DEFAULT ARGUMENTS ###########################################################
 
@@ -76,3 +86,72 @@ def generate_signature_wordlist(
         _signature = _signature[0].lower() + _signature[1:] # camel case
         _signatures.append(_signature)
     return _signatures
+
+def generate_batching_signatures() -> list:
+    """Generate the plausible signatures for all the patterns."""
+    return list(itertools.chain.from_iterable(generate_signature_wordlist(pattern=__p) for __p in PATTERNS))
+
+# SELECTOR TABLE ##############################################################
+
+# layout: magic + fingerprint of the wordlists + sorted array of uint32 little-endian selectors
+# the table is shipped with the package, and only written by the build step in __main__
+TABLE_MAGIC = b'IOSEL001'
+TABLE_DTYPE = numpy.dtype('<u4') # explicit width and byte order, whatever the platform
+TABLE_PATH = os.path.join(ioseeth.utils.get_data_dir_path(), 'selectors/batching.bin')
+
+def fingerprint() -> bytes:
+    """Hash the wordlists, to detect when the table needs to be regenerated."""
+    return bytes.fromhex(ioseeth.utils.keccak(text=repr((PATTERNS, VERBS, ADJECTIVES, TOKENS, NOUNS, ARGS))))
+
+def generate_selector_table(signatures: list) -> numpy.ndarray:
+    """Compute the sorted and unique selectors of a list of signatures."""
+    return numpy.array(sorted(set(int(ioseeth.parsing.abi.calculate_selector(__s), 16) for __s in signatures)), dtype=TABLE_DTYPE)
+
+def save_selector_table(table: collections.abc.Sequence, path: str=TABLE_PATH) -> None:
+    """Write the selector table to disk, along with the fingerprint of the wordlists."""
+    __table = numpy.asarray(table, dtype=TABLE_DTYPE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    __fd, __tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.batching-') # same filesystem, for an atomic rename
+    try:
+        with os.fdopen(__fd, 'wb') as __f:
+            __f.write(TABLE_MAGIC + fingerprint() + __table.tobytes())
+        os.replace(__tmp, path) # the readers see either the old or the new table, never a partial one
+    except BaseException:
+        os.remove(__tmp)
+        raise
+
+def load_selector_table(path: str=TABLE_PATH) -> numpy.ndarray:
+    """Memory map the selector table, or return None when it is missing or outdated."""
+    __header = len(TABLE_MAGIC) + 32
+    try:
+        with open(path, 'rb') as __f:
+            __map = mmap.mmap(__f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError): # missing or empty file
+        return None
+    if __map[:__header] != TABLE_MAGIC + fingerprint() or (len(__map) - __header) % TABLE_DTYPE.itemsize:
+        return None # outdated or truncated
+    return numpy.frombuffer(__map, dtype=TABLE_DTYPE, offset=__header)
+
+@functools.lru_cache(maxsize=1)
+def get_selector_table(path: str=TABLE_PATH) -> numpy.ndarray:
+    """Load the selector table, or regenerate it in memory when the wordlists changed."""
+    __table = load_selector_table(path=path)
+    return generate_selector_table(signatures=generate_batching_signatures()) if __table is None else __table
+
+def table_has_selector(selector: int, table: collections.abc.Sequence=None) -> bool:
+    """Binary search of the selector in the sorted table."""
+    __table = get_selector_table() if table is None else table
+    __i = int(numpy.searchsorted(__table, selector))
+    return __i < len(__table) and __table[__i] == selector
+
+# REVERSE LOOKUP ##############################################################
+
+@functools.lru_cache(maxsize=1)
+def map_selectors_to_batching_signatures() -> dict:
+    """Hash all the signatures, only when the reverse lookup is actually required."""
+    return {ioseeth.parsing.abi.calculate_selector(__s): __s for __s in generate_batching_signatures()}
+
+# MAIN ########################################################################
+
+if __name__ == '__main__': # build step: python -m ioseeth.indicators.wordlists
+    save_selector_table(table=generate_selector_table(signatures=generate_batching_signatures()))
@@ -4,6 +4,7 @@ import collections.abc
 
 import ioseeth.indicators.batch
 import ioseeth.metrics.probabilities
+import ioseeth.parsing.events
 
 # CONFIDENCE ##################################################################
 
@@ -16,10 +17,12 @@ def confidence_score(
 ) -> float:
     """Evaluate the probability that a transaction is an airdrop."""
     _scores = []
+    # decode the transfers once for all the indicators
+    _transfers = ioseeth.parsing.events.parse_transfer_events(logs=logs)
     # performs token transfers
     _has_token_mint_events = (
-        ioseeth.indicators.batch.log_has_multiple_erc20_mint_events(logs=logs, min_count=min_transfer_count, min_total=min_transfer_total)
-        or ioseeth.indicators.batch.log_has_multiple_erc721_mint_events(logs=logs, min_count=min_transfer_count))
+        ioseeth.indicators.batch.log_has_multiple_erc20_mint_events(logs=_transfers, min_count=min_transfer_count, min_total=min_transfer_total)
+        or ioseeth.indicators.batch.log_has_multiple_erc721_mint_events(logs=_transfers, min_count=min_transfer_count))
     _scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
         indicator=_has_token_mint_events,
         true_score=0.9, # the tokens were minted
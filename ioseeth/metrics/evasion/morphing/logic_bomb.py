@@ -2,6 +2,8 @@
 
 import collections.abc
 
+import ioseeth.cache
+import ioseeth.metrics.generic
 import ioseeth.metrics.probabilities
 import ioseeth.parsing.bytecode
 import ioseeth.indicators.redpill
@@ -13,6 +15,7 @@ RED_PILL_OPCODES = (ioseeth.parsing.bytecode.COINBASE,)
 
 # RED PILL ####################################################################
 
+@ioseeth.cache.memoize_by_code_hash
 def is_trace_red_pill_contract_creation(
     action: str, # trace.type
     runtime_bytecode: str, # trace.result.code
@@ -44,10 +47,4 @@ def is_traces_red_pill_contract_creation(
     **kwargs
 ) -> float:
     """Evaluate the probability that a contract has the capacity to evade simulation environments."""
-    __scores = [
-        is_trace_red_pill_contract_creation(
-            action=__t.get('type', ''),
-            runtime_bytecode=__t.get('output', ''))
-        for __t in traces]
-    # a single match is enough
-    return max(__scores)
+    return ioseeth.metrics.generic.score_traces(traces=traces, metric=is_trace_red_pill_contract_creation)
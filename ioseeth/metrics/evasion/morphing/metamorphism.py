@@ -7,10 +7,14 @@ from web3 import Web3
 
 import toolblocks.parsing.common
 
+import ioseeth.cache
 import ioseeth.indicators.generic
 import ioseeth.indicators.metamorphism
+import ioseeth.metrics.generic
 import ioseeth.metrics.probabilities
 import ioseeth.parsing.bytecode
+import ioseeth.parsing.creation
+import ioseeth.parsing.signatures
 
 # CONSTANTS ###################################################################
 
@@ -18,6 +22,9 @@ RESET_OPCODES = (ioseeth.parsing.bytecode.SELFDESTRUCT, ioseeth.parsing.bytecode
 FACTORY_SELECTORS = ('aaf10f42', '0d917df4', '25ff967e', 'c7fcb49b',) # getImplementation(), ?, setByteCode(bytes), ?
 GET_IMPLEMENTATION_SELECTORS = ('aaf10f42',)
 
+ioseeth.parsing.signatures.register_signatures(prefix='selector/factory', patterns=dict(enumerate(FACTORY_SELECTORS)))
+ioseeth.parsing.signatures.register_signatures(prefix='selector/get-implementation', patterns=dict(enumerate(GET_IMPLEMENTATION_SELECTORS)))
+
 # INIT CODE ###################################################################
 
 def is_bytecode_metamorphic_init_code(
@@ -43,13 +50,14 @@ def is_bytecode_metamorphic_init_code(
         false_score=0.3))
     # retrieves implementation address from factory
     __scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
-        indicator=any(__s in bytecode for __s in GET_IMPLEMENTATION_SELECTORS),
+        indicator=ioseeth.parsing.signatures.count_signatures(bytecode=bytecode, names=ioseeth.parsing.signatures.get_family(prefix='selector/get-implementation')) > 0,
         true_score=0.6,
         false_score=0.5))
     return ioseeth.metrics.probabilities.conflation(__scores)
 
 # FACTORY #####################################################################
 
+@ioseeth.cache.memoize_by_code_hash
 def is_trace_factory_contract_creation(
     action: str, # trace.type
     creation_bytecode: str, # trace.action.init
@@ -90,14 +98,7 @@ def is_traces_factory_contract_creation(
     """Evaluate the probability that any internal transaction deployed a metamorphic factory.
     0x0f7c1dad199b29bc016c0984194b7b29ba68b130bd3d9a83e5bb20de7159d33c
     0x29b2d5787757d494907b349662a3730340c88641d5ae78037928c2870d2b4cce"""
-    __scores = [
-        is_trace_factory_contract_creation(
-            action=__t.get('type', ''),
-            creation_bytecode=__t.get('input', ''),
-            runtime_bytecode=__t.get('output', ''))
-        for __t in traces]
-    # a single match is enough
-    return max(__scores)
+    return ioseeth.metrics.generic.score_traces(traces=traces, metric=is_trace_factory_contract_creation)
 
 def is_transaction_factory_contract_deployment(
     to: str, # tx.to
@@ -108,16 +109,15 @@ def is_transaction_factory_contract_deployment(
     0x0f7c1dad199b29bc016c0984194b7b29ba68b130bd3d9a83e5bb20de7159d33c
     0x29b2d5787757d494907b349662a3730340c88641d5ae78037928c2870d2b4cce"""
     __scores = []
-    # parse the input data of the transaction
-    __parts = ioseeth.parsing.bytecode.parse_creation_data(data=data)
     # contract creation by EOA
     __scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
         indicator=not bool(to),
         true_score=0.5, # could be any contract creation
         false_score=0.4)) # factories are (slightly) more likely to be deployed by an EOA than another contract 
-    # static analysis
-    if not to and len(__parts) > 1:
-        __scores.append(is_trace_factory_contract_creation(action='create', creation_bytecode=data, runtime_bytecode=__parts[1]))
+    # static analysis of every contract deployed by the input data, including those embedded in the init code
+    __contracts = tuple(ioseeth.parsing.creation.iterate_over_contracts(bytecode=data)) if not to else ()
+    if __contracts:
+        __scores.append(max(is_trace_factory_contract_creation(action='create', creation_bytecode=__i, runtime_bytecode=__r) for __i, __r in __contracts))
     # combine
     return ioseeth.metrics.probabilities.conflation(__scores)
 
@@ -129,6 +129,7 @@ def is_transaction_factory_contract_deployment(
 
 # MUTANT ######################################################################
 
+@ioseeth.cache.memoize_by_code_hash
 def is_trace_mutant_contract_creation(
     action: str, # trace.type
     creation_bytecode: str, # trace.action.init
@@ -163,11 +164,4 @@ def is_traces_mutant_contract_creation(
     """Evaluate the probability that any internal transaction (re)deployed a mutant contract.
     0x0f7c1dad199b29bc016c0984194b7b29ba68b130bd3d9a83e5bb20de7159d33c
     0x29b2d5787757d494907b349662a3730340c88641d5ae78037928c2870d2b4cce"""
-    __scores = [
-        is_trace_mutant_contract_creation(
-            action=__t.get('type', ''),
-            creation_bytecode=__t.get('input', ''),
-            runtime_bytecode=__t.get('output', ''))
-        for __t in traces]
-    # a single match is enough
-    return max(__scores)
+    return ioseeth.metrics.generic.score_traces(traces=traces, metric=is_trace_mutant_contract_creation)
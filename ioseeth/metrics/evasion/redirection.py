@@ -2,10 +2,13 @@
 
 from web3 import Web3
 
+import toolblocks.parsing.common
+
 import ioseeth.indicators.proxy
 import ioseeth.indicators.token
 import ioseeth.metrics.probabilities
 import ioseeth.metrics.normal.proxy
+import ioseeth.parsing.clones
 
 # HIDDEN PROXY ################################################################
 
@@ -27,10 +30,14 @@ import ioseeth.metrics.normal.proxy
 def is_hidden_proxy(
     data: str,
     bytecode: str,
+    implementation: str=None, # code at the end of the proxy chain, see ioseeth.scraping.proxy
     **kwargs
 ) -> float:
     """Evaluate that a contract is redirecting execution."""
     __scores = []
+    # clones are standard and public proxies, no need to analyse them
+    if ioseeth.parsing.clones.is_clone(bytecode=bytecode):
+        return ioseeth.metrics.probabilities.conflation([0.5, 0.2]) # redirects, but in plain sight
     # requirement: must redirect execution
     __scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
         indicator=ioseeth.metrics.normal.proxy.is_redirecting_execution_to_another_contract(data=data, bytecode=bytecode) >= 0.7,
@@ -42,4 +49,20 @@ def is_hidden_proxy(
         indicator=ioseeth.indicators.token.bytecode_has_any_token_interface(bytecode=bytecode, threshold=0.9),
         true_score=0.8, # tokens should never happen redirect
         false_score=0.5)) # there are other types of hidden proxies
+    # score the code at the end of the proxy chain
+    if implementation is not None:
+        __empty = not toolblocks.parsing.common.to_bytes(implementation)
+        # the implementation is empty
+        __scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
+            indicator=__empty,
+            true_score=0.7, # weird, the proxy points to an EOA or a destroyed contract
+            false_score=0.5))
+        # the implementation is a token, behind a proxy that doesn't follow the standards
+        __scores.append(ioseeth.metrics.probabilities.indicator_to_probability(
+            indicator=(
+                not __empty
+                and not ioseeth.indicators.proxy.bytecode_uses_standard_proxy_slots(bytecode=bytecode)
+                and ioseeth.indicators.token.bytecode_has_any_token_interface(bytecode=implementation, threshold=0.9)),
+            true_score=0.8, # the token logic is hidden behind a custom redirection
+            false_score=0.5))
     return ioseeth.metrics.probabilities.conflation(__scores)
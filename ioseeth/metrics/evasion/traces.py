@@ -0,0 +1,46 @@
+"""Evaluate all the evasion metrics on the traces of a transaction, in a single pass.
+
+The traces of a transaction often repeat the same code, like factories deploying dozens of clones:
+each distinct trace is scored once, and the bytecode facts are cached by code hash across traces.
+"""
+
+import collections
+import collections.abc
+
+import ioseeth.cache
+import ioseeth.metrics.evasion.morphing.logic_bomb
+import ioseeth.metrics.evasion.morphing.metamorphism
+import ioseeth.metrics.generic
+
+# CONSTANTS ###################################################################
+
+TraceScores = collections.namedtuple('TraceScores', ('red_pill', 'factory', 'mutant', 'self_destruct'))
+
+EMPTY_SCORES = TraceScores(
+    red_pill=ioseeth.metrics.generic.DEFAULT_SCORE,
+    factory=ioseeth.metrics.generic.DEFAULT_SCORE,
+    mutant=ioseeth.metrics.generic.DEFAULT_SCORE,
+    self_destruct=ioseeth.metrics.generic.DEFAULT_SCORE)
+
+# TRACE #######################################################################
+
+@ioseeth.cache.memoize_by_code_hash # indexed by the hashes of both codes, shared with the individual metrics
+def analyze_trace(action: str, creation_bytecode: str, runtime_bytecode: str) -> TraceScores:
+    """Evaluate all the evasion metrics on a single trace."""
+    return TraceScores(
+        red_pill=ioseeth.metrics.evasion.morphing.logic_bomb.is_trace_red_pill_contract_creation(action=action, creation_bytecode=creation_bytecode, runtime_bytecode=runtime_bytecode),
+        factory=ioseeth.metrics.evasion.morphing.metamorphism.is_trace_factory_contract_creation(action=action, creation_bytecode=creation_bytecode, runtime_bytecode=runtime_bytecode),
+        mutant=ioseeth.metrics.evasion.morphing.metamorphism.is_trace_mutant_contract_creation(action=action, creation_bytecode=creation_bytecode, runtime_bytecode=runtime_bytecode),
+        self_destruct=ioseeth.metrics.generic.is_trace_contract_self_destruction(action=action))
+
+# TRACES ######################################################################
+
+def analyze_traces(traces: collections.abc.Iterable) -> TraceScores:
+    """Evaluate all the evasion metrics on the traces of a transaction, a single match is enough for each."""
+    __scores = {}
+    for __t in traces:
+        __key = ioseeth.metrics.generic.get_trace_key(trace=__t)
+        if __key not in __scores: # distinct action / code
+            __scores[__key] = analyze_trace(action=__key[0], creation_bytecode=__key[1], runtime_bytecode=__key[2])
+    # keep the highest score of each metric
+    return TraceScores(*(max(__s) for __s in zip(*__scores.values()))) if __scores else EMPTY_SCORES
@@ -1,7 +1,28 @@
 """Identify generic properties of transactions / traces / addresses."""
 
+import collections.abc
+
 import ioseeth.metrics.probabilities
 
+# CONSTANTS ###################################################################
+
+DEFAULT_SCORE = 0.5 # neutral, when there are no traces to analyse
+
+# TRACES ######################################################################
+
+def get_trace_key(trace: dict) -> tuple:
+    """Identify the traces that have the same scores: their action and their code."""
+    return (trace.get('type', '') or '', trace.get('input', '') or '', trace.get('output', '') or '')
+
+def score_traces(traces: collections.abc.Iterable, metric: callable, default: float=DEFAULT_SCORE) -> float:
+    """Evaluate a trace metric once per distinct trace, a single match is enough."""
+    __scores = {}
+    for __t in traces:
+        __key = get_trace_key(trace=__t)
+        if __key not in __scores:
+            __scores[__key] = metric(action=__key[0], creation_bytecode=__key[1], runtime_bytecode=__key[2])
+    return max(__scores.values()) if __scores else default
+
 # SUICIDE #####################################################################
 
 def is_trace_contract_self_destruction(
@@ -0,0 +1,167 @@
+"""Stream transactions from dumps to scores, with a bounded memory footprint.
+
+Each stage is a generator: the transactions are read, parsed and scored one at a time.
+The stages can run in background threads, linked by bounded queues: a stage blocks
+when its output queue is full, so a slow consumer throttles the readers upstream.
+"""
+
+import collections
+import collections.abc
+import concurrent.futures
+import functools
+import itertools
+import json
+import os
+import pickle
+import queue
+import threading
+
+import ioseeth.metrics.scoring
+
+# CONSTANTS ###################################################################
+
+QUEUE_SIZE = 1024 # items buffered between two stages
+
+_DONE = object() # sentinel, marks the end of a stage
+
+# READ ########################################################################
+
+def read_jsonl(path: str) -> collections.abc.Iterator:
+    """Yield the objects of a JSON lines file, one at a time."""
+    with open(path, 'r') as __f:
+        for __line in __f:
+            if __line.strip():
+                yield json.loads(__line)
+
+def read_pickle(path: str) -> collections.abc.Iterator:
+    """Yield the objects pickled one after another in a file."""
+    with open(path, 'rb') as __f:
+        while True:
+            try:
+                yield pickle.load(__f)
+            except EOFError:
+                return
+
+def _list_files(path: str) -> list:
+    """List the files in a directory tree, in a deterministic order."""
+    if not os.path.isdir(path):
+        return [path]
+    return sorted(os.path.join(__r, __f) for __r, _, __fs in os.walk(path) for __f in __fs)
+
+def read_transactions(paths: collections.abc.Iterable) -> collections.abc.Iterator:
+    """Yield the transactions from JSONL and pickle files, or the directories containing them."""
+    for __path in itertools.chain.from_iterable(_list_files(__p) for __p in ([paths] if isinstance(paths, str) else paths)):
+        if __path.endswith(('.jsonl', '.json')):
+            yield from read_jsonl(path=__path)
+        elif __path.endswith(('.pkl', '.pickle')):
+            yield from read_pickle(path=__path)
+
+# WRITE #######################################################################
+
+def _default_encoder(value: any) -> any:
+    """Serialize the bytes and other objects found in the web3 data."""
+    return value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
+
+def write_jsonl(records: collections.abc.Iterable, path: str) -> int:
+    """Write the records as they come, one JSON object per line, and return their count."""
+    __count = 0
+    with open(path, 'a') as __f:
+        for __r in records:
+            __f.write(json.dumps(__r, default=_default_encoder) + '\n')
+            __count += 1
+    return __count
+
+# BACKPRESSURE ################################################################
+
+def buffer(iterable: collections.abc.Iterable, maxsize: int=QUEUE_SIZE) -> collections.abc.Iterator:
+    """Consume the iterable in a background thread, at most maxsize items ahead of the caller."""
+    __queue = queue.Queue(maxsize=max(1, maxsize))
+    __stop = threading.Event()
+
+    def __put(item: any, error: Exception=None) -> bool:
+        """Block while the consumer is behind, and give up when it stopped."""
+        while not __stop.is_set():
+            try:
+                __queue.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __produce() -> None:
+        try:
+            for __item in iterable:
+                if not __put(__item):
+                    return
+            __put(_DONE)
+        except Exception as __e: # forwarded to the consumer
+            __put(_DONE, __e)
+
+    __thread = threading.Thread(target=__produce, daemon=True)
+    __thread.start()
+    try:
+        while True:
+            __item, __error = __queue.get()
+            if __error is not None:
+                raise __error
+            if __item is _DONE:
+                return
+            yield __item
+    finally:
+        __stop.set() # the consumer stopped early
+
+def _chunk(iterable: collections.abc.Iterable, size: int) -> collections.abc.Iterator:
+    """Group the items in lists of the given size, the last one may be shorter."""
+    __items = iter(iterable)
+    while True:
+        __chunk = list(itertools.islice(__items, max(1, size)))
+        if not __chunk:
+            return
+        yield __chunk
+
+def _map_chunk(func: callable, chunk: list) -> list:
+    """Apply the function on a chunk of items, in a worker process."""
+    return [func(__x) for __x in chunk]
+
+def map_bounded(func: callable, iterable: collections.abc.Iterable, workers: int=0, chunksize: int=ioseeth.metrics.scoring.CHUNK_SIZE, maxsize: int=QUEUE_SIZE) -> collections.abc.Iterator:
+    """Apply the function on a process pool, in order, with at most maxsize items in flight.
+    Unlike Executor.map, the input is not read ahead entirely."""
+    __pending = collections.deque()
+    __window = max(1, maxsize // max(1, chunksize)) # chunks in flight
+    with concurrent.futures.ProcessPoolExecutor(max_workers=ioseeth.metrics.scoring._worker_count(workers=workers), initializer=ioseeth.metrics.scoring.warmup) as __pool:
+        for __chunk in _chunk(iterable, size=chunksize):
+            __pending.append(__pool.submit(_map_chunk, func, __chunk))
+            if len(__pending) >= __window: # wait for the oldest results before reading more
+                yield from __pending.popleft().result()
+        while __pending:
+            yield from __pending.popleft().result()
+
+# STAGES ######################################################################
+
+def parse_stage(transactions: collections.abc.Iterable) -> collections.abc.Iterator:
+    """Select the fields of each transaction and decode its logs, the other fields are dropped."""
+    return map(ioseeth.metrics.scoring.parse_transaction, transactions)
+
+def score_record(fields: dict, metrics: dict=ioseeth.metrics.scoring.METRICS) -> dict:
+    """Evaluate the metrics on a parsed transaction, identified by its hash."""
+    __record = {'hash': _default_encoder(fields.get('hash', ''))}
+    __record.update(ioseeth.metrics.scoring.evaluate_metrics(fields=fields, metrics=metrics))
+    return __record
+
+def score_stage(transactions: collections.abc.Iterable, metrics: dict=ioseeth.metrics.scoring.METRICS, workers: int=1, chunksize: int=ioseeth.metrics.scoring.CHUNK_SIZE, maxsize: int=QUEUE_SIZE) -> collections.abc.Iterator:
+    """Evaluate the metrics on each parsed transaction, in this process or on a pool of workers."""
+    __score = functools.partial(score_record, metrics=metrics)
+    if workers == 1:
+        return map(__score, transactions)
+    return map_bounded(func=__score, iterable=transactions, workers=workers, chunksize=chunksize, maxsize=maxsize)
+
+# PIPELINE ####################################################################
+
+def stream_scores(transactions: collections.abc.Iterable, metrics: dict=ioseeth.metrics.scoring.METRICS, workers: int=1, maxsize: int=QUEUE_SIZE) -> collections.abc.Iterator:
+    """Yield the score record of each transaction as soon as it is computed, reading ahead at most maxsize transactions."""
+    __parsed = buffer(parse_stage(transactions=transactions), maxsize=maxsize)
+    return buffer(score_stage(transactions=__parsed, metrics=metrics, workers=workers, maxsize=maxsize), maxsize=maxsize)
+
+def run(inputs: collections.abc.Iterable, output: str, metrics: dict=ioseeth.metrics.scoring.METRICS, workers: int=1, maxsize: int=QUEUE_SIZE) -> int:
+    """Score all the transactions in the input files and append the records to a JSONL file."""
+    return write_jsonl(records=stream_scores(transactions=read_transactions(paths=inputs), metrics=metrics, workers=workers, maxsize=maxsize), path=output)
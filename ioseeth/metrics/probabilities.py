@@ -4,17 +4,25 @@ Given a set of probabilities {p_i}, adding another probability p will:
 - leave the conflation score unchanged if p = 0.5
 - increase the score if p > 0.5
 - decrease the score otherwise
+
+The batch functions score N transactions at once, from N x M arrays of M indicators.
 """
 
 import functools
 import operator
 
+import numpy
+
 # CAST ########################################################################
 
 def indicator_to_probability(indicator: bool, true_score: float, false_score: float) -> float:
     """Cast a boolean indicator into a float probability."""
     return float(indicator) * true_score + (1. - float(indicator)) * false_score
 
+def indicators_to_probabilities(indicators: numpy.ndarray, true_scores: numpy.ndarray, false_scores: numpy.ndarray) -> numpy.ndarray:
+    """Cast an N x M array of boolean indicators into probabilities, with one pair of scores per column."""
+    return numpy.where(numpy.asarray(indicators, dtype=bool), numpy.asarray(true_scores, dtype=numpy.float64), numpy.asarray(false_scores, dtype=numpy.float64))
+
 # COMBINE #####################################################################
 
 def conflation(scores: list) -> float:
@@ -23,3 +31,11 @@ def conflation(scores: list) -> float:
     return (
         functools.reduce(operator.mul, scores, 1.)
         / (functools.reduce(operator.mul, scores, 1.) + functools.reduce(operator.mul, _inverse_scores, 1.)))
+
+def batch_conflation(scores: numpy.ndarray) -> numpy.ndarray:
+    """Conflate each row of an N x M array of probabilities, in log-odds space to avoid the underflow of long products.
+    The rows that hold both a 0 and a 1 are undefined, and scored NaN."""
+    __scores = numpy.atleast_2d(numpy.asarray(scores, dtype=numpy.float64))
+    with numpy.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        __odds = numpy.sum(numpy.log(__scores) - numpy.log1p(-__scores), axis=-1) # +-inf for certain events
+        return 1. / (1. + numpy.exp(-__odds))
@@ -0,0 +1,88 @@
+"""Score whole blocks / ranges of blocks, spread across a pool of processes.
+
+The metrics are pure functions of the transaction fields: each transaction is scored independently,
+and the results are returned in the order of the inputs.
+"""
+
+import collections.abc
+import concurrent.futures
+import functools
+import itertools
+import os
+
+import ioseeth.indicators.batch
+import ioseeth.indicators.proxy
+import ioseeth.indicators.token
+import ioseeth.indicators.wordlists
+import ioseeth.metrics.batch.airdrop
+import ioseeth.metrics.batch.batch
+import ioseeth.metrics.batch.native
+import ioseeth.metrics.evasion.morphing.logic_bomb
+import ioseeth.metrics.evasion.morphing.metamorphism
+import ioseeth.parsing.events
+
+# CONSTANTS ###################################################################
+
+CHUNK_SIZE = 64 # transactions per task, to amortize the pickling
+
+TRANSACTION_FIELDS = {'hash': '', 'data': '0x', 'logs': (), 'traces': (), 'value': 0, 'to': ''} # with their default value
+
+METRICS = {
+    'batch/confidence': ioseeth.metrics.batch.batch.confidence_score,
+    'batch/malicious': ioseeth.metrics.batch.batch.malicious_score,
+    'airdrop/confidence': ioseeth.metrics.batch.airdrop.confidence_score,
+    'airdrop/malicious': ioseeth.metrics.batch.airdrop.malicious_score,
+    'native/confidence': ioseeth.metrics.batch.native.confidence_score,
+    'native/malicious': ioseeth.metrics.batch.native.malicious_score,
+    'evasion/red-pill': ioseeth.metrics.evasion.morphing.logic_bomb.is_traces_red_pill_contract_creation,
+    'evasion/factory': ioseeth.metrics.evasion.morphing.metamorphism.is_traces_factory_contract_creation,
+    'evasion/mutant': ioseeth.metrics.evasion.morphing.metamorphism.is_traces_mutant_contract_creation,}
+
+# WORKERS #####################################################################
+
+def warmup() -> None:
+    """Load the lookup tables once per process, rather than on the first transaction of each worker."""
+    ioseeth.indicators.wordlists.get_selector_table()
+    ioseeth.parsing.events.get_event_decoder(abi=ioseeth.parsing.events.EVENT_ABIS[ioseeth.parsing.events.TRANSFER_TOPIC.hex()], topics=3 * [ioseeth.parsing.events.TRANSFER_TOPIC])
+
+def _worker_count(workers: int=0) -> int:
+    """Default to all the cores available to the process."""
+    __available = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    return workers if workers > 0 else __available
+
+# TRANSACTION #################################################################
+
+def parse_transaction(transaction: dict) -> dict:
+    """Select the fields used by the metrics, and decode the logs once for all of them."""
+    __fields = {__k: transaction.get(__k, __d) or __d for __k, __d in TRANSACTION_FIELDS.items()}
+    __fields['data'] = transaction.get('data', '') or transaction.get('input', '') or TRANSACTION_FIELDS['data'] # web3 names it "input"
+    __fields['logs'] = ioseeth.parsing.events.parse_transfer_events(logs=__fields['logs'])
+    return __fields
+
+def evaluate_metrics(fields: dict, metrics: dict=METRICS) -> dict:
+    """Evaluate all the metrics on the parsed fields of a transaction."""
+    return {__name: __metric(**fields) for __name, __metric in metrics.items()}
+
+def score_transaction(transaction: dict, metrics: dict=METRICS) -> dict:
+    """Evaluate all the metrics on a single transaction."""
+    return evaluate_metrics(fields=parse_transaction(transaction=transaction), metrics=metrics)
+
+# BATCH #######################################################################
+
+def score_transactions(transactions: collections.abc.Iterable, metrics: dict=METRICS, workers: int=0, chunksize: int=CHUNK_SIZE) -> list:
+    """Evaluate the metrics on many transactions, in parallel when more than one worker is available.
+    The scores are listed in the same order as the transactions."""
+    __score = functools.partial(score_transaction, metrics=metrics)
+    __workers = _worker_count(workers=workers)
+    if __workers <= 1:
+        warmup()
+        return list(map(__score, transactions))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=__workers, initializer=warmup) as __pool:
+        return list(__pool.map(__score, transactions, chunksize=max(1, chunksize)))
+
+def score_blocks(blocks: collections.abc.Iterable, metrics: dict=METRICS, workers: int=0, chunksize: int=CHUNK_SIZE) -> list:
+    """Evaluate the metrics on the transactions of several blocks, sharing a single pool.
+    Each block is given as a list of transactions, and the scores are grouped the same way."""
+    __blocks = [list(__b) for __b in blocks]
+    __scores = iter(score_transactions(transactions=itertools.chain.from_iterable(__blocks), metrics=metrics, workers=workers, chunksize=chunksize))
+    return [list(itertools.islice(__scores, len(__b))) for __b in __blocks]
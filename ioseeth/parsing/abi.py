@@ -1,5 +1,6 @@
 """Handle ABIs."""
 
+import functools
 import json
 import os.path
 
@@ -26,9 +27,14 @@ def calculate_signature(abi: dict) -> str:
         name=abi.get('name', ''),
         types=(__input.get('type', '') for __input in abi.get('inputs', [])))
 
+@functools.lru_cache(maxsize=4096)
+def _hash_signature(signature: str) -> str:
+    """Hash a signature once, since the same ABIs are hashed for every log / bytecode."""
+    return ioseeth.utils.keccak(text=signature)
+
 def calculate_hash(abi: dict) -> str:
     """Compose a function / event / error hash from its ABI."""
-    return ioseeth.utils.keccak(text=calculate_signature(abi=abi))
+    return _hash_signature(signature=calculate_signature(abi=abi))
 
 # HASH ########################################################################
 
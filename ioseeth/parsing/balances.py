@@ -1,22 +1,47 @@
 """Track the evolution of native token balances."""
 
 import functools
+import warnings
 
+import eth_utils.address
 from web3 import Web3
 
+# COMPATIBILITY ###############################################################
+
+def _resolve_w3(w3: Web3, provider: Web3, name: str) -> Web3:
+    """Accept the former "provider" argument, with a deprecation warning."""
+    if provider is not None:
+        warnings.warn('the "provider" argument of {name} is deprecated, use "w3" instead'.format(name=name), DeprecationWarning, stacklevel=3)
+    return provider if w3 is None else w3
+
 # DELTA #######################################################################
 
 @functools.lru_cache(maxsize=128)
-def get_balance_delta(provider: Web3, address: str, block: int) -> int:
-    """Calculate the difference in balance before / after a given block."""
+def _get_balance_delta(w3: Web3, address: str, block: int) -> int:
     _before = _after = 0
     if address:
-        _before = provider.eth.get_balance(Web3.toChecksumAddress(address), block - 1)
-        _after = provider.eth.get_balance(Web3.toChecksumAddress(address), block)
+        _before = w3.eth.get_balance(eth_utils.address.to_checksum_address(address), block - 1)
+        _after = w3.eth.get_balance(eth_utils.address.to_checksum_address(address), block)
     return _after - _before
 
-@functools.lru_cache(maxsize=128)
-def get_balance_deltas(provider: Web3, addresses: list, block: int) -> dict:
+def get_balance_delta(w3: Web3=None, address: str='', block: int=0, provider: Web3=None) -> int:
+    """Calculate the difference in balance before / after a given block."""
+    return _get_balance_delta(w3=_resolve_w3(w3=w3, provider=provider, name='get_balance_delta'), address=address, block=block)
+
+def get_balance_deltas(w3: Web3=None, addresses: list=(), block: int=0, provider: Web3=None) -> dict:
     """List all the addresses that sustained a balance change."""
-    _deltas = {_a: get_balance_delta(provider=provider, address=_a, block=block) for _a in addresses}
+    _w3 = _resolve_w3(w3=w3, provider=provider, name='get_balance_deltas')
+    _deltas = {_a: _get_balance_delta(w3=_w3, address=_a, block=block) for _a in addresses}
+    return {_a: _d for _a, _d in _deltas.items() if abs(_d) > 0}
+
+# ASYNC #######################################################################
+
+async def get_balance_deltas_async(provider: 'ioseeth.scraping.rpc.AsyncBatchProvider', addresses: list, block: int) -> dict:
+    """Calculate the balance deltas of all the addresses with batched requests, and keep the ones that changed.
+    The provider comes from ioseeth.scraping.rpc, not imported here: the synchronous indicators don't load the async stack."""
+    _addresses = [_a for _a in dict.fromkeys(addresses) if _a] # unique, in order
+    _balances = await provider.batch(
+        [('eth_getBalance', (_a, hex(block - 1))) for _a in _addresses]
+        + [('eth_getBalance', (_a, hex(block))) for _a in _addresses])
+    _deltas = {_a: int(_after, 16) - int(_before, 16) for _a, _before, _after in zip(_addresses, _balances[:len(_addresses)], _balances[len(_addresses):])}
     return {_a: _d for _a, _d in _deltas.items() if abs(_d) > 0}
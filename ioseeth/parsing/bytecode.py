@@ -4,34 +4,87 @@ Follows the decomposition detailed in the article by OpenZeppelin:
 https://blog.openzeppelin.com/deconstructing-a-solidity-contract-part-i-introduction-832efd2d7737
 """
 
+import array
+import collections
+import functools
+import itertools
 import re
 
 import toolblocks.parsing.common
+import ioseeth.cache
 
 # OPCODES #####################################################################
 
 STOP = 0x00
+ADD = 0x01
+MUL = 0x02
+SUB = 0x03
+DIV = 0x04
+MOD = 0x06
+EXP = 0x0A
+LT = 0x10
+GT = 0x11
+SLT = 0x12
+SGT = 0x13
 EQ = 0x14
+ISZERO = 0x15
+AND = 0x16
+OR = 0x17
+XOR = 0x18
+NOT = 0x19
+SHL = 0x1B
+SHR = 0x1C
+SHA3 = 0x20
+CODESIZE = 0x38
+CODECOPY = 0x39
 EXTCODECOPY = 0x3C
 BLOCKHASH = 0x40
 COINBASE = 0x41
 PREVRANDAO = 0x44
+POP = 0x50
+MLOAD = 0x51
+MSTORE = 0x52
+MSTORE8 = 0x53
+SLOAD = 0x54
+SSTORE = 0x55
+JUMP = 0x56
+JUMPI = 0x57
+PC = 0x58
 JUMPDEST = 0x5B
 PUSH0 = 0x5F
+PUSH4 = 0x63
+PUSH20 = 0x73
 PUSH32 = 0x7F
+DUP1 = 0x80
+DUP5 = 0x84
+DUP16 = 0x8F
+SWAP1 = 0x90
+SWAP16 = 0x9F
+LOG0 = 0xA0
+LOG4 = 0xA4
 CREATE = 0xF0
+CALL = 0xF1
 CALLCODE = 0xF2
 RETURN = 0xF3
 DELEGATECALL = 0xF4
 CREATE2 = 0xF5
+STATICCALL = 0xFA
 REVERT = 0xFD
 INVALID = 0xFE
 SELFDESTRUCT = 0xFF
 
 HALTING = [STOP, RETURN, REVERT, INVALID, SELFDESTRUCT]
 
-is_halting = lambda opcode: opcode in HALTING
+# up to Cancun, the other bytes halt like INVALID
+DEFINED = frozenset(itertools.chain(
+    range(STOP, 0x0C), range(LT, 0x1E), (SHA3,), range(0x30, 0x4B), range(0x50, LOG4 + 1),
+    range(CREATE, CREATE2 + 1), (STATICCALL, REVERT, INVALID, SELFDESTRUCT)))
+
+is_undefined = lambda opcode: opcode not in DEFINED
+is_halting = lambda opcode: opcode in HALTING or is_undefined(opcode)
 is_push = lambda opcode: opcode >= PUSH0 and opcode <= PUSH32
+is_dup = lambda opcode: opcode >= DUP1 and opcode <= DUP16
+is_swap = lambda opcode: opcode >= SWAP1 and opcode <= SWAP16
 
 # REGEX #######################################################################
 
@@ -70,13 +123,105 @@ def split_creation(bytecode: str) -> list:
 
 # METADATA ####################################################################
 
-def split_metadata(bytecode: str) -> list:
-    """Split the metadata from the bytecode, returning both."""
-    return re.split(pattern=metadata_regex(), string=bytecode, flags=re.IGNORECASE)
+Metadata = collections.namedtuple('Metadata', ('size', 'compiler', 'version', 'storage', 'digest')) # size of the trailer, including its 2 bytes length
+
+METADATA_STORAGES = ('ipfs', 'bzzr0', 'bzzr1')
+
+def _decode_cbor(data: bytes, index: int=0, depth: int=0) -> tuple:
+    """Decode the subset of CBOR used by the compilers: integers, strings, arrays, maps and booleans.
+    Returns the value and the index of the next item, raises ValueError on anything else."""
+    if index >= len(data) or depth > 4:
+        raise ValueError('truncated CBOR data')
+    __major, __minor = data[index] >> 5, data[index] & 0x1f
+    __index = index + 1
+    if __major == 7 and __minor in (20, 21): # false, true
+        return __minor == 21, __index
+    if __minor < 24:
+        __argument = __minor
+    elif __minor < 28: # the argument follows on 1, 2, 4 or 8 bytes
+        __size = 1 << (__minor - 24)
+        __argument = int.from_bytes(data[__index:__index + __size], 'big')
+        __index += __size
+    else:
+        raise ValueError('unsupported CBOR item')
+    if __major == 0:
+        return __argument, __index
+    if __major in (2, 3): # byte & text strings
+        if __index + __argument > len(data):
+            raise ValueError('truncated CBOR data')
+        __value = data[__index:__index + __argument]
+        return (__value if __major == 2 else __value.decode('utf-8', errors='replace')), __index + __argument
+    if __major in (4, 5): # arrays & maps
+        __items = []
+        for _ in range(__argument * (1 + (__major == 5))):
+            __item, __index = _decode_cbor(data=data, index=__index, depth=depth + 1)
+            __items.append(__item)
+        return (__items if __major == 4 else dict(zip(__items[::2], __items[1::2]))), __index
+    raise ValueError('unsupported CBOR item')
+
+def _format_version(version: any) -> str:
+    """Format the version of the compiler, encoded either as a byte string (solc) or a list of integers (vyper)."""
+    if isinstance(version, bytes) and len(version) == 3:
+        return '.'.join(str(__v) for __v in version)
+    if isinstance(version, list):
+        return '.'.join(str(__v) for __v in version)
+    return str(version)
+
+def _strip_prefix(bytecode: str) -> str:
+    """Remove the optional 0x prefix of a HEX string."""
+    return bytecode[2:] if bytecode[:2].lower() == '0x' else bytecode
+
+def _get_length(bytecode: str) -> int:
+    """Count the bytes of the code, in HEX or raw format."""
+    return len(_strip_prefix(bytecode)) // 2 if isinstance(bytecode, str) else len(bytecode)
+
+def _get_tail(bytecode: str, size: int) -> bytes:
+    """Convert the last bytes of the code only, the rest of the buffer is left untouched.
+    Raises ValueError on malformed HEX."""
+    if not isinstance(bytecode, str):
+        return bytes(bytecode[len(bytecode) - size:])
+    __hex = _strip_prefix(bytecode)
+    return bytes.fromhex(__hex[len(__hex) - 2 * size:])
+
+def parse_metadata(bytecode: str) -> Metadata:
+    """Decode the CBOR trailer of the runtime code, whose length is given by its last 2 bytes.
+    Only the trailer is converted: the cost doesn't depend on the size of the code, so it isn't memoized.
+    Returns None when the code doesn't end with a known trailer."""
+    if _get_length(bytecode) < 2:
+        return None
+    try:
+        __size = int.from_bytes(_get_tail(bytecode=bytecode, size=2), 'big') + 2
+        if __size <= 2 or __size > _get_length(bytecode):
+            return None
+        __value, __end = _decode_cbor(data=_get_tail(bytecode=bytecode, size=__size)[:-2])
+    except ValueError:
+        return None
+    if isinstance(__value, list) and __value and isinstance(__value[-1], dict): # vyper >= 0.3.10 prepends the sizes of the code sections
+        __value = __value[-1]
+    if __end != __size - 2 or not isinstance(__value, dict) or not ({'solc', 'vyper'} | set(METADATA_STORAGES)) & set(__value):
+        return None
+    __storage = next((__k for __k in METADATA_STORAGES if __k in __value), '')
+    __compiler = 'vyper' if 'vyper' in __value else 'solc' if ('solc' in __value or __storage) else ''
+    return Metadata(
+        size=__size,
+        compiler=__compiler,
+        version=_format_version(__value[__compiler]) if __compiler in __value else '',
+        storage=__storage,
+        digest=__value[__storage].hex() if __storage and isinstance(__value[__storage], bytes) else '')
+
+def split_metadata(bytecode: str) -> tuple:
+    """Split the metadata from the bytecode, returning both.
+    The trailer of the runtime code is located from its length, the regex is only used for the metadata followed by other data.
+    Not memoized: the parts keep the format of the input, which the code hash ignores."""
+    __metadata = parse_metadata(bytecode=bytecode)
+    if __metadata is not None:
+        __split = len(bytecode) - __metadata.size * (1 + isinstance(bytecode, str)) # 2 HEX characters per byte
+        return (bytecode[:__split], bytecode[__split:], bytecode[:0])
+    return tuple(re.split(pattern=metadata_regex(), string=bytecode, flags=re.IGNORECASE))
 
 # PARSE CREATION DATA #########################################################
 
-#TODO recursive parsing in case several contracts are deployed
+# single contract only, ioseeth.parsing.creation splits the deployments of several contracts
 # 0xb61e1747cb5b2b9ff4a5dd18e625c1b5547a655d4d5136505e7cabd5e5299e93
 
 def parse_creation_data(data: str) -> tuple:
@@ -107,47 +252,248 @@ def parse_creation_data(data: str) -> tuple:
 def instruction_length(opcode: int) -> int:
     return 1 + is_push(opcode) * (opcode - PUSH0) # 1 byte for the opcode + n bytes of data
 
+# DISASSEMBLY #################################################################
+
+DISASSEMBLY_CACHE_SIZE = 256
+
+# parallel arrays, the i-th instruction is described by the i-th item of each array
+Disassembly = collections.namedtuple('Disassembly', ('code', 'offsets', 'opcodes', 'ends'))
+
+@functools.lru_cache(maxsize=DISASSEMBLY_CACHE_SIZE)
+def disassemble(bytecode: str) -> Disassembly:
+    """Decode the bytecode in a single pass, into arrays of offsets, opcodes and push data ends.
+    The reachability is given by the control flow graph."""
+    __code = toolblocks.parsing.common.to_bytes(bytecode)
+    __len = len(__code)
+    __offsets = array.array('I') # start of each instruction
+    __opcodes = array.array('B')
+    __ends = array.array('I') # the push data spans from offset + 1 to end (exclusive), empty for the other opcodes
+    __i = 0
+    while __i < __len:
+        __oc = __code[__i]
+        __next = __i + 1 + (PUSH0 < __oc <= PUSH32) * (__oc - PUSH0) # inlined instruction_length
+        __offsets.append(__i)
+        __opcodes.append(__oc)
+        __ends.append(min(__next, __len)) # the data of the last PUSH can be truncated
+        __i = __next
+    return Disassembly(code=__code, offsets=__offsets, opcodes=__opcodes, ends=__ends)
+
 def iterate_over_instructions(bytecode: str) -> iter:
     """Split the bytecode into raw instructions and returns an iterator."""
-    __bytes = toolblocks.parsing.common.to_bytes(bytecode)
-    __i = 0
-    while __i < len(__bytes):
-        __len = instruction_length(opcode=__bytes[__i])
-        yield __bytes[__i:__i+__len]
-        __i = __i + __len
+    __d = disassemble(bytecode=bytecode)
+    return (__d.code[__o:__e] for __o, __e in zip(__d.offsets, __d.ends))
+
+# CONTROL FLOW ################################################################
+
+ControlFlowGraph = collections.namedtuple('ControlFlowGraph', ('blocks', 'successors', 'reachable', 'occurrences'))
+
+def _get_block_targets(disassembly: Disassembly, start: int, end: int, jumpdests: dict) -> tuple:
+    """List the blocks that follow the block [start, end), and tell whether it ends on a jump with a computed destination."""
+    __last = end - 1
+    __oc = disassembly.opcodes[__last]
+    __static = __oc in (JUMP, JUMPI) and __last > start and is_push(disassembly.opcodes[__last - 1]) # PUSH target JUMP
+    __target = jumpdests.get(int.from_bytes(disassembly.code[disassembly.offsets[__last - 1] + 1:disassembly.ends[__last - 1]], 'big')) if __static else None
+    __targets = [] if __target is None else [__target] # invalid destinations halt
+    if __oc != JUMP and not is_halting(__oc) and end < len(disassembly.opcodes): # falls through
+        __targets.append(end)
+    return __targets, __oc in (JUMP, JUMPI) and not __static
+
+@ioseeth.cache.memoize_by_code_hash
+def get_control_flow_graph(bytecode: str) -> ControlFlowGraph:
+    """Split the code in basic blocks, follow the jumps from the entry point and index the reachable instructions by opcode.
+    Once a computed jump is reachable, every JUMPDEST is a potential destination."""
+    __d = disassemble(bytecode=bytecode)
+    __n = len(__d.opcodes)
+    __blocks = array.array('I', (__i for __i in range(__n) if __i == 0 or __d.opcodes[__i] == JUMPDEST or __d.opcodes[__i - 1] in (JUMP, JUMPI) or is_halting(__d.opcodes[__i - 1])))
+    __jumpdests = {__d.offsets[__i]: __i for __i in __blocks if __d.opcodes[__i] == JUMPDEST}
+    __ends = __blocks[1:] + array.array('I', [__n])
+    __indexes = {__b: __k for __k, __b in enumerate(__blocks)} # block start => block number
+    __successors = []
+    __dynamic = []
+    for __start, __end in zip(__blocks, __ends):
+        __targets, __computed = _get_block_targets(disassembly=__d, start=__start, end=__end, jumpdests=__jumpdests)
+        __successors.append(tuple(__indexes[__t] for __t in __targets))
+        __dynamic.append(__computed)
+    # traverse from the entry point
+    __reachable = bytearray(__n)
+    __seen = bytearray(len(__blocks))
+    __computed = False
+    __todo = [0] if __n else []
+    while __todo:
+        __k = __todo.pop()
+        if __seen[__k]:
+            continue
+        __seen[__k] = 1
+        __reachable[__blocks[__k]:__ends[__k]] = b'\x01' * (__ends[__k] - __blocks[__k])
+        __todo.extend(__successors[__k])
+        if __dynamic[__k] and not __computed: # over-approximate: the destination may be computed from anything
+            __computed = True
+            __todo.extend(__indexes[__i] for __i in __jumpdests.values())
+    # index the reachable instructions by opcode
+    __bits = collections.defaultdict(lambda: bytearray((__n + 7) // 8))
+    for __i in range(__n):
+        if __reachable[__i]:
+            __bits[__d.opcodes[__i]][__i >> 3] |= 1 << (__i & 7)
+    return ControlFlowGraph(
+        blocks=__blocks,
+        successors=tuple(__successors),
+        reachable=__reachable,
+        occurrences={__oc: int.from_bytes(__b, 'little') for __oc, __b in __bits.items()}) # bit i <=> instruction i
 
-def bytecode_has_specific_opcode(bytecode: str, opcode: int) -> bool:
-    """Check if the runtime code contains a specific opcode."""
-    __instructions = iterate_over_instructions(bytecode=bytecode)
-    __halted = False
+# OPCODES #####################################################################
 
-    for __i in __instructions:
-        __oc = __i[0] # the opcode at the start of the instruction
-        if __oc == opcode and not __halted:
-            return True
-        elif __oc == JUMPDEST:
-            __halted = False
-        elif is_halting(__oc):
-            __halted = True
+@ioseeth.cache.memoize_by_code_hash
+def get_opcodes(bytecode: str, reachable: bool=True) -> frozenset:
+    """List the distinct opcodes in the bytecode, optionally ignoring those that can't be reached from the entry point."""
+    return (
+        frozenset(get_control_flow_graph(bytecode=bytecode).occurrences) if reachable
+        else frozenset(disassemble(bytecode=bytecode).opcodes))
 
-    return False
+def bytecode_has_specific_opcode(bytecode: str, opcode: int) -> bool:
+    """Check if the runtime code contains a specific opcode, that can be reached."""
+    return opcode in get_control_flow_graph(bytecode=bytecode).occurrences
 
 def bytecode_has_specific_opcodes(bytecode: str, opcodes: tuple, check: callable=any) -> bool:
     """Check if the runtime code contains any/all of the specified opcodes."""
-    return check(bytecode_has_specific_opcode(bytecode=bytecode, opcode=__o) for __o in opcodes)
+    __opcodes = get_control_flow_graph(bytecode=bytecode).occurrences
+    return check(__o in __opcodes for __o in opcodes)
+
+# CONSTANTS ###################################################################
+
+Constants = collections.namedtuple('Constants', ('selectors', 'addresses', 'words'))
+
+# the opcodes are stored one byte per instruction: searching them is aligned on the instructions
+CONSTANTS_REGEX = re.compile(rb'\x63(?=\x14)|\x73|\x7f') # PUSH4 followed by EQ | PUSH20 | PUSH32
+
+@ioseeth.cache.memoize_by_code_hash
+def get_constants(bytecode: str) -> Constants:
+    """Extract the selectors (PUSH4 followed by EQ), addresses (PUSH20) and words (PUSH32) in a single pass over the instructions."""
+    __d = disassemble(bytecode=bytecode)
+    __constants = {PUSH4: set(), PUSH20: set(), PUSH32: set()}
+    for __m in CONSTANTS_REGEX.finditer(__d.opcodes.tobytes()):
+        __i = __m.start()
+        __oc = __d.opcodes[__i]
+        __data = __d.code[__d.offsets[__i] + 1:__d.ends[__i]]
+        if len(__data) == __oc - PUSH0: # ignore the truncated data at the end of the bytecode
+            __constants[__oc].add(__data)
+    return Constants(
+        selectors=frozenset(int.from_bytes(__s, 'big') for __s in __constants[PUSH4]),
+        addresses=frozenset(__constants[PUSH20]),
+        words=frozenset(__constants[PUSH32]))
+
+# DISPATCHER ##################################################################
+
+def _get_push_value(disassembly: Disassembly, index: int) -> int:
+    """Read the argument of a PUSH instruction as an integer, None for the other instructions."""
+    __oc = disassembly.opcodes[index]
+    return int.from_bytes(disassembly.code[disassembly.offsets[index] + 1:disassembly.ends[index]], 'big') if is_push(__oc) else None
+
+def _find_selector_extractions(disassembly: Disassembly) -> list:
+    """Locate the instructions right after the selector is read from the calldata: SHR by 224 bits or DIV by 2**224."""
+    __starts = []
+    for __i in range(1, len(disassembly.opcodes)):
+        __oc = disassembly.opcodes[__i]
+        __divisor = _get_push_value(disassembly, __i - 1) if disassembly.opcodes[__i - 1] != SWAP1 or __i < 2 else _get_push_value(disassembly, __i - 2)
+        if (__oc == SHR and _get_push_value(disassembly, __i - 1) == 0xe0) or (__oc == DIV and __divisor == 2**224):
+            __next = __i + 1
+            if __next + 1 < len(disassembly.opcodes) and _get_push_value(disassembly, __next) == 0xffffffff and disassembly.opcodes[__next + 1] == AND:
+                __next += 2 # old solc masks the selector
+            if __next + 1 < len(disassembly.opcodes) and _get_push_value(disassembly, __next) == 0 and disassembly.opcodes[__next + 1] == MSTORE:
+                __next += 2 # old vyper stores it in memory
+            __starts.append(__next)
+    return __starts
+
+def _match_comparison(disassembly: Disassembly, index: int) -> tuple:
+    """Match a comparison of the selector with a constant, followed by a conditional jump.
+    Returns (constant, comparison opcode, negated, jump destination, index after JUMPI) or None."""
+    __ops = disassembly.opcodes
+    __n = len(__ops)
+    __i = index + is_dup(__ops[index]) if index < __n else index # DUP the selector then PUSH the constant
+    if __i >= __n or not (PUSH0 < __ops[__i] <= PUSH4):
+        return None
+    __constant = _get_push_value(disassembly, __i)
+    __i += 1
+    if __i < __n and is_dup(__ops[__i]): # or PUSH the constant then DUP the selector
+        __i += 1
+    elif __i + 1 < __n and _get_push_value(disassembly, __i) == 0 and __ops[__i + 1] == MLOAD: # vyper keeps the selector in memory
+        __i += 2
+    if __i >= __n or __ops[__i] not in (EQ, XOR, SUB, GT, LT, SGT, SLT):
+        return None
+    __comparison = __ops[__i]
+    __i += 1
+    __negated = False
+    while __i < __n and __ops[__i] == ISZERO:
+        __negated = not __negated
+        __i += 1
+    if __i + 1 >= __n or not (PUSH0 < __ops[__i] <= PUSH4) or __ops[__i + 1] != JUMPI:
+        return None
+    return (__constant, __comparison, __negated, _get_push_value(disassembly, __i), __i + 2)
+
+@ioseeth.cache.memoize_by_code_hash
+def get_dispatch_table(bytecode: str) -> tuple:
+    """Walk the function hub and pair each selector with the offset of its entry point, sorted by selector.
+    Handles the linear (EQ), negated (XOR / SUB / EQ + ISZERO) and binary search (GT / LT) dispatchers.
+    The result is shared by the cache, hence immutable."""
+    __d = disassemble(bytecode=bytecode)
+    __indexes = {__o: __i for __i, __o in enumerate(__d.offsets)}
+    __is_jumpdest = lambda __offset: __offset in __indexes and __d.opcodes[__indexes[__offset]] == JUMPDEST
+    __table = {}
+    __todo = _find_selector_extractions(disassembly=__d)
+    __visited = set()
+    while __todo:
+        __i = __todo.pop()
+        while __i < len(__d.opcodes) and __i not in __visited: # walk a block of the hub
+            __visited.add(__i)
+            __oc = __d.opcodes[__i]
+            if __oc == JUMPDEST:
+                __i += 1
+                continue
+            if PUSH0 < __oc <= PUSH4 and __i + 1 < len(__d.opcodes) and __d.opcodes[__i + 1] == JUMP: # jump to the next hub block or the fallback
+                if __is_jumpdest(_get_push_value(__d, __i)):
+                    __todo.append(__indexes[_get_push_value(__d, __i)])
+                break
+            __match = _match_comparison(disassembly=__d, index=__i)
+            if __match is None: # end of the hub
+                break
+            __constant, __comparison, __negated, __destination, __next = __match
+            if not __is_jumpdest(__destination):
+                break
+            __target = __indexes[__destination]
+            if __comparison in (GT, LT, SGT, SLT): # split of the binary search
+                __todo.append(__target)
+                __i = __next
+            elif (__comparison == EQ) != __negated: # jumps to the function when the selector matches
+                __table[__constant] = __destination
+                __i = __next
+            else: # jumps to the next test when the selector differs, the function follows
+                if __next < len(__d.offsets):
+                    __table[__constant] = __d.offsets[__next]
+                __todo.append(__target)
+                break
+    return tuple(sorted(__table.items()))
 
 # SELECTORS ###################################################################
 
+@ioseeth.cache.memoize_by_code_hash
 def get_function_selectors(bytecode: str, raw: bool=True) -> tuple:
     """Get all the function selectors from the hub portion of the bytecode."""
+    if raw:
+        return tuple('{:08x}'.format(__s) for __s in sorted(get_selectors(bytecode=bytecode)))
     _r = re.compile(selector_regex(raw=raw), flags=re.IGNORECASE)
     return tuple(set(_r.findall(bytecode)))
 
+def get_selectors(bytecode: str) -> frozenset:
+    """List the selectors of the dispatcher, completed by the PUSH4 + EQ constants where the hub can't be walked."""
+    return frozenset(__s for __s, _ in get_dispatch_table(bytecode=bytecode)) | get_constants(bytecode=bytecode).selectors
+
 # STORAGE #####################################################################
 
-#TODO SLOAD could use a computed address instead of a hardcoded one => fetching only the 32 bytes words is too naive
+# only the literal words: the computed slots (keccak, slot - 1) are resolved by ioseeth.parsing.interpreter
 
-def get_storage_slots(bytecode: str, raw: bool=True) -> str:
+@ioseeth.cache.memoize_by_code_hash
+def get_storage_slots(bytecode: str, raw: bool=True) -> tuple:
     """Get all the storage slots used in the bytecode."""
+    if raw:
+        return tuple(__w.hex() for __w in sorted(get_constants(bytecode=bytecode).words))
     _r = re.compile(storage_slot_regex(raw=raw), flags=re.IGNORECASE)
     return tuple(set(_r.findall(bytecode)))
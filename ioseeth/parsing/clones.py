@@ -0,0 +1,103 @@
+"""Spot the clones, minimal proxies with a fixed template, and index them by implementation.
+
+A clone has no logic of its own: the analysis of its implementation is done once, and shared by all its clones.
+"""
+
+import collections
+
+# TEMPLATES ###################################################################
+
+# the code of a clone is prefix + implementation address + suffix
+CloneTemplate = collections.namedtuple('CloneTemplate', ('prefix', 'size', 'suffix', 'exact'))
+
+def _erc1167_template(size: int) -> CloneTemplate:
+    """ERC-1167 with the implementation pushed on size bytes: the vanity addresses start with null bytes."""
+    return CloneTemplate(
+        prefix=bytes.fromhex('363d3d373d3d3d363d') + bytes([0x5f + size]), # PUSH<size>
+        size=size,
+        suffix=bytes.fromhex('5af43d82803e903d9160') + bytes([0x2b - 20 + size]) + bytes.fromhex('57fd5bf3'), # the jump destination moves with the size
+        exact=True)
+
+TEMPLATES = {
+    'erc-1167': _erc1167_template(size=20),
+    'erc-1167/vanity': _erc1167_template(size=16),
+    # the call data is forwarded with metadata appended to the code
+    'erc-3448': CloneTemplate(
+        prefix=bytes.fromhex('363d3d373d3d3d3d60368038038091363936013d73'),
+        size=20,
+        suffix=bytes.fromhex('5af43d3d93803e603457fd5bf3'),
+        exact=False),}
+
+Clone = collections.namedtuple('Clone', ('template', 'implementation'))
+
+# CLASSIFY ####################################################################
+
+def _get_head(bytecode: any, size: int) -> tuple:
+    """Convert the first bytes of the code only, and count the bytes of the whole code.
+    Raises ValueError on malformed HEX."""
+    if not isinstance(bytecode, str):
+        return (bytes(bytecode[:size]), len(bytecode))
+    __hex = bytecode[2:] if bytecode[:2].lower() == '0x' else bytecode
+    if len(__hex) % 2:
+        raise ValueError('odd-length HEX string')
+    return (bytes.fromhex(__hex[:2 * size]), len(__hex) // 2)
+
+def _match_template(head: bytes, length: int, template: CloneTemplate) -> str:
+    """Compare the head of the code to a template, and return the implementation address on a match."""
+    __end = len(template.prefix) + template.size
+    __match = (
+        head.startswith(template.prefix)
+        and head[__end:__end + len(template.suffix)] == template.suffix
+        and (length == __end + len(template.suffix) or not template.exact))
+    return '0x' + head[len(template.prefix):__end].rjust(20, b'\x00').hex() if __match else ''
+
+def classify_clone(bytecode: any, templates: dict=TEMPLATES) -> Clone:
+    """Identify the clone template of a runtime code, or return None for any other code.
+    Only the head of the code is converted and compared, whatever the size of the code."""
+    try:
+        __head, __length = _get_head(bytecode=bytecode, size=max((len(__t.prefix) + __t.size + len(__t.suffix) for __t in templates.values()), default=0))
+    except ValueError:
+        return None
+    for __name, __template in templates.items():
+        __implementation = _match_template(head=__head, length=__length, template=__template)
+        if __implementation:
+            return Clone(template=__name, implementation=__implementation)
+    return None
+
+def is_clone(bytecode: any) -> bool:
+    """Check whether the code is a minimal proxy."""
+    return classify_clone(bytecode=bytecode) is not None
+
+# INDEX #######################################################################
+
+CLONES = collections.defaultdict(set) # implementation => addresses of its clones
+IMPLEMENTATIONS = {} # implementation => code, analysed in place of its clones
+
+def index_clone(address: str, bytecode: any, index: dict=CLONES) -> Clone:
+    """Register the contract under its implementation, if it is a clone."""
+    __clone = classify_clone(bytecode=bytecode)
+    if __clone is not None:
+        index[__clone.implementation].add(address.lower())
+    return __clone
+
+def get_clones(implementation: str, index: dict=CLONES) -> frozenset:
+    """List the known clones of an implementation."""
+    return frozenset(index.get(implementation.lower(), ()))
+
+def group_clones_by_implementation(contracts: dict) -> dict:
+    """Group the clones among the given address => code mapping, the other contracts are left out."""
+    __groups = collections.defaultdict(set)
+    for __address, __code in contracts.items():
+        index_clone(address=__address, bytecode=__code, index=__groups)
+    return dict(__groups)
+
+# IMPLEMENTATIONS #############################################################
+
+def register_implementation(address: str, bytecode: any, index: dict=IMPLEMENTATIONS) -> None:
+    """Store the code of an implementation, so that its clones can be analysed offline."""
+    index[address.lower()] = bytecode
+
+def resolve_code(bytecode: any, index: dict=IMPLEMENTATIONS) -> any:
+    """Return the code of the implementation when the bytecode is a clone of a known contract, the bytecode itself otherwise."""
+    __clone = classify_clone(bytecode=bytecode)
+    return index.get(__clone.implementation, bytecode) if __clone is not None else bytecode
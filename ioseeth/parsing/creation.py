@@ -0,0 +1,114 @@
+"""Split the creation data into the code of every contract it deploys, including the contracts embedded by factories.
+
+The init code copies its runtime with CODECOPY and returns it: the layout is read from these instructions,
+resolved by the abstract interpreter, and the segments are given as offsets in the original buffer.
+"""
+
+import collections
+
+import toolblocks.parsing.common
+
+import ioseeth.cache
+import ioseeth.parsing.bytecode
+import ioseeth.parsing.interpreter
+
+# CONSTANTS ###################################################################
+
+MAX_DEPTH = 4
+MAX_CONTRACTS = 64 # layouts per creation data, across all the depths
+MAX_RUNS = 128 # runs of the interpreter per creation data
+
+# each segment is a (start, end) pair of byte offsets in the creation data, empty when start == end
+Layout = collections.namedtuple('Layout', ('creation', 'runtime', 'metadata', 'args', 'depth'))
+
+# STRUCTURE ###################################################################
+
+class _Budget:
+    """Bound the work of a split, whatever the nesting of the copies."""
+
+    def __init__(self) -> None:
+        self.runs = MAX_RUNS
+        self.visited = set()
+
+    def interpret(self, code: bytes) -> ioseeth.parsing.interpreter.Effects:
+        """Run the interpreter if the budget allows it, None otherwise."""
+        if self.runs <= 0:
+            return None
+        self.runs -= 1
+        return ioseeth.parsing.interpreter.interpret(bytecode=code)
+
+def _get_runtime_copy(effects: ioseeth.parsing.interpreter.Effects) -> tuple:
+    """Find the code segment that is copied to memory and then returned, as (code offset, size)."""
+    return next(
+        ((__offset, __size) for __destination, __offset, __size in sorted(effects.copies, key=lambda __c: __c[1:]) if (__destination, __size) in effects.returns),
+        None)
+
+def _get_created_copies(effects: ioseeth.parsing.interpreter.Effects) -> set:
+    """Find the code segments copied where CREATE / CREATE2 read their init code, as (code offset, size).
+    The constructor arguments may be appended after the copy."""
+    return {
+        (__offset, __size) for __destination, __offset, __size in effects.copies
+        if any(__destination == __o and 0 < __size <= __s for __o, __s in effects.creates)}
+
+def _walk(code: bytes, start: int, end: int, depth: int, layouts: list, budget: _Budget) -> None:
+    """Split the init code occupying code[start:end], then recurse into the init codes it deploys."""
+    __effects = budget.interpret(code=code[start:end])
+    __runtime = _get_runtime_copy(effects=__effects) if __effects is not None else None
+    if __runtime is None or __runtime[1] <= 0 or start + __runtime[0] + __runtime[1] > end: # no constant layout, the whole segment is init code
+        layouts.append(Layout(creation=(start, end), runtime=(end, end), metadata=(end, end), args=(end, end), depth=depth))
+        return
+    __runtime_start = start + __runtime[0]
+    __runtime_end = __runtime_start + __runtime[1]
+    __metadata = ioseeth.parsing.bytecode.parse_metadata(bytecode=get_segment(code=code, segment=(__runtime_start, __runtime_end)))
+    __metadata_start = __runtime_end - __metadata.size if __metadata is not None else __runtime_end
+    layouts.append(Layout(
+        creation=(start, __runtime_start),
+        runtime=(__runtime_start, __metadata_start),
+        metadata=(__metadata_start, __runtime_end),
+        args=(__runtime_end, end),
+        depth=depth))
+    if depth >= MAX_DEPTH:
+        return
+    # the children are the init codes deployed by the constructor or the runtime with CREATE / CREATE2
+    __children = {(start + __o, start + __o + __s) for __o, __s in _get_created_copies(effects=__effects)}
+    __runtime_effects = budget.interpret(code=code[__runtime_start:__runtime_end])
+    if __runtime_effects is not None:
+        __children.update((__runtime_start + __o, __runtime_start + __o + __s) for __o, __s in _get_created_copies(effects=__runtime_effects))
+    for __start, __end in sorted(__children):
+        if len(layouts) >= MAX_CONTRACTS:
+            return
+        if start <= __start < __end <= end and (__start, __end) != (start, end) and (__start, __end) not in budget.visited:
+            budget.visited.add((__start, __end))
+            _walk(code=code, start=__start, end=__end, depth=depth + 1, layouts=layouts, budget=budget)
+
+def _split_with_regex(data: str) -> Layout:
+    """Fall back on the regex split, when the layout of the init code can't be resolved."""
+    __lengths = [len(toolblocks.parsing.common.to_bytes(__p)) for __p in ioseeth.parsing.bytecode.parse_creation_data(data=data)]
+    __bounds = [sum(__lengths[:__i]) for __i in range(5)]
+    return Layout(*zip(__bounds[:-1], __bounds[1:]), depth=0)
+
+@ioseeth.cache.memoize_by_code_hash
+def split_creation_data(bytecode: str) -> tuple:
+    """List the layout of every contract deployed by the creation data, the top level contract first."""
+    __code = toolblocks.parsing.common.to_bytes(bytecode)
+    __layouts = []
+    if __code:
+        _walk(code=__code, start=0, end=len(__code), depth=0, layouts=__layouts, budget=_Budget())
+    if __layouts and __layouts[0].runtime[0] == __layouts[0].runtime[1]: # the top level layout was not resolved
+        __layouts[0] = _split_with_regex(data=bytecode)
+    return tuple(__layouts)
+
+# SEGMENTS ####################################################################
+
+def get_segment(code: bytes, segment: tuple) -> memoryview:
+    """View a segment of the creation data, without copying it."""
+    return memoryview(code)[segment[0]:segment[1]]
+
+def iterate_over_contracts(bytecode: str) -> iter:
+    """Iterate over the (init, runtime) code of every contract deployed by the creation data, as HEX strings.
+    The init code spans the whole contract, from the creation code to the constructor arguments."""
+    __code = toolblocks.parsing.common.to_bytes(bytecode)
+    for __layout in split_creation_data(bytecode=bytecode):
+        yield (
+            get_segment(code=__code, segment=(__layout.creation[0], __layout.args[1])).hex(),
+            get_segment(code=__code, segment=__layout.runtime).hex())
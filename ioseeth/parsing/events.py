@@ -1,13 +1,19 @@
 """Filter the logs for relevant ERC20 / ERC721 events."""
 
+import collections
+import collections.abc
 import copy
 import functools
 import itertools
 import json
 
 import eth_abi.abi
+import eth_abi.exceptions
+import eth_utils.address
 import web3._utils.abi
 import web3._utils.events
+import web3._utils.normalizers
+import web3.exceptions
 
 import toolblocks.parsing.common
 import ioseeth.parsing.abi
@@ -97,12 +103,76 @@ def _parse_event(event: dict, names: tuple) -> dict:
         'to': _get_arg_value(event=event, name=names[1]),
         'value': _get_arg_value(event=event, name=names[2])}
 
+# DECODERS ####################################################################
+
+EVENT_DECODERS_SIZE = 1024
+
+# everything needed to decode a log, computed once per ABI variant
+EventDecoder = collections.namedtuple('EventDecoder', ('abi', 'topic_types', 'topic_names', 'topic_normalizers', 'data_inputs', 'data_types', 'data_names', 'data_normalizers'))
+
+EVENT_DECODERS = {} # (topic hash, topic count, input names) => decoder
+
+def _get_value_normalizer(abi_type: str) -> callable:
+    """Checksum the addresses like web3, without walking the data tree for the other types."""
+    if abi_type == 'address':
+        return eth_utils.address.to_checksum_address
+    if 'address' in abi_type or abi_type.startswith('('): # arrays & tuples
+        return lambda __v: web3._utils.abi.map_abi_data(web3._utils.normalizers.BASE_RETURN_NORMALIZERS, (abi_type,), (__v,))[0]
+    return toolblocks.parsing.common.identity
+
+def _prepare_event_decoder(abi: dict, indexed: int) -> EventDecoder:
+    """Split the inputs of the most probable ABI variant into topics and data, with their decoding types."""
+    __abi = _generate_the_most_probable_abi_indexation_variant(abi=abi, indexed=indexed)
+    __topic_inputs = web3._utils.events.normalize_event_input_types(web3._utils.abi.get_indexed_event_inputs(__abi))
+    __data_inputs = web3._utils.events.normalize_event_input_types(web3._utils.abi.exclude_indexed_event_inputs(__abi))
+    __topic_types = tuple(web3._utils.events.get_event_abi_types_for_decoding(__topic_inputs))
+    __data_types = tuple(web3._utils.events.get_event_abi_types_for_decoding(__data_inputs))
+    return EventDecoder(
+        abi=__abi,
+        topic_types=__topic_types,
+        topic_names=tuple(__i['name'] for __i in __topic_inputs),
+        topic_normalizers=tuple(_get_value_normalizer(__t) for __t in __topic_types),
+        data_inputs=__data_inputs,
+        data_types=__data_types,
+        data_names=tuple(__i['name'] for __i in __data_inputs),
+        data_normalizers=tuple(_get_value_normalizer(__t) for __t in __data_types))
+
+def get_event_decoder(abi: dict, topics: list, index: dict=EVENT_DECODERS) -> EventDecoder:
+    """Return the prepared decoder for the event ABI and the count of topics, built on the first call."""
+    __key = (topics[0] if topics else b'', len(topics), _get_input_names(abi)) # the names differentiate events with the same signature
+    if __key not in index:
+        if len(index) >= EVENT_DECODERS_SIZE:
+            index.clear()
+        index[__key] = _prepare_event_decoder(abi=abi, indexed=len(topics) - 1)
+    return index[__key]
+
 # DECODE LOGS #################################################################
 
+def decode_event_log(log: dict, decoder: EventDecoder, codec: eth_abi.abi.ABICodec=_abi_codec(), topics: list=None) -> dict:
+    """Decode the log with a prepared decoder, the output is formatted like web3 events."""
+    __topics = (_parse_log_topics(log=log) if topics is None else topics)[1:]
+    if len(__topics) != len(decoder.topic_types):
+        raise web3.exceptions.LogTopicError('Expected {expected} log topics. Got {actual}'.format(expected=len(decoder.topic_types), actual=len(__topics)))
+    # indexed inputs
+    __topic_values = [__n(codec.decode((__t,), __d)[0]) for __t, __n, __d in zip(decoder.topic_types, decoder.topic_normalizers, __topics)]
+    # the other inputs are ABI encoded in the data
+    __data_values = [__n(__v) for __n, __v in zip(decoder.data_normalizers, codec.decode(decoder.data_types, toolblocks.parsing.common.to_bytes(log.get('data', b''))))]
+    __args = dict(zip(decoder.topic_names, __topic_values))
+    __args.update(web3._utils.abi.named_tree(decoder.data_inputs, __data_values))
+    return {
+        'args': __args,
+        'event': decoder.abi.get('name', ''),
+        'logIndex': log.get('logIndex', None),
+        'transactionIndex': log.get('transactionIndex', None),
+        'transactionHash': log.get('transactionHash', None),
+        'address': log.get('address', ''),
+        'blockHash': log.get('blockHash', None),
+        'blockNumber': log.get('blockNumber', None),}
+
 def get_event_data(log: dict, abi: dict, codec: eth_abi.abi.ABICodec=_abi_codec()) -> dict:
     """Extract event data from the hex data & log topics."""
-    __abi = _generate_the_most_probable_abi_indexation_variant(abi=abi, indexed=len(log.get('topics', [])) - 1)
-    return web3._utils.events.get_event_data(codec, __abi, log)
+    __topics = _parse_log_topics(log=log)
+    return decode_event_log(log=log, decoder=get_event_decoder(abi=abi, topics=__topics), codec=codec, topics=__topics)
 
 def get_event_inputs(log: dict, abi: dict, codec: eth_abi.abi.ABICodec=_abi_codec()) -> dict:
     """Extract & index the event inputs from the hex data & log topics."""
@@ -123,11 +193,12 @@ def parse_event_log(log: dict, abi: dict={}, index: dict=EVENT_ABIS, codec: eth_
 def parse_event_logs_factory(abi: dict, codec: eth_abi.abi.ABICodec=_abi_codec()) -> callable:
     """Adapt the parsing logic to a given event."""
     __inputs = _get_input_names(abi)
+    __hash = toolblocks.parsing.common.to_hexstr(ioseeth.parsing.abi.calculate_hash(abi=abi))
 
     def __parse_logs(logs: tuple) -> tuple:
         """Extract all the event matching a given ABI."""
         # parse
-        _events = (get_event_data(log=__log, abi=abi, codec=codec) for __log in logs if _compare_abi_to_log(abi=abi, log=__log))
+        _events = (get_event_data(log=__log, abi=abi, codec=codec) for __log in logs if _get_log_topics_hash(log=__log) == __hash)
         # return the args of each event in a dict
         return tuple(_parse_event(event=_e, names=__inputs) for _e in _events)
 
@@ -135,6 +206,86 @@ def parse_event_logs_factory(abi: dict, codec: eth_abi.abi.ABICodec=_abi_codec()
 
 # SHORTHANDS ##################################################################
 
-filter_logs_for_erc20_transfer_events = parse_event_logs_factory(abi=EVENT_ABIS.get('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef', EVENT_EMPTY_ABI), codec=_abi_codec())
-
-filter_logs_for_erc721_transfer_events = parse_event_logs_factory(abi=EVENT_ABIS.get('0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef', EVENT_EMPTY_ABI), codec=_abi_codec()) # ERC-20 and ERC-712 "Transfer" events have the same signature
+filter_logs_for_erc20_transfer_events = parse_event_logs_factory(abi=EVENT_ABIS.get('ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef', EVENT_EMPTY_ABI), codec=_abi_codec())
+
+filter_logs_for_erc721_transfer_events = parse_event_logs_factory(abi=EVENT_ABIS.get('ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef', EVENT_EMPTY_ABI), codec=_abi_codec()) # ERC-20 and ERC-712 "Transfer" events have the same signature
+
+# STANDARD EVENTS #############################################################
+
+TRANSFER_TOPIC = bytes.fromhex('ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef')
+APPROVAL_TOPIC = bytes.fromhex('8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925')
+
+_ADDRESS_PADDING = 12 * b'\x00'
+
+def _parse_address(address: str) -> str:
+    """Normalize the addresses so that they can be compared."""
+    return toolblocks.parsing.common.to_hexstr(address, prefix=True)
+
+def _slice_address(word: bytes) -> str:
+    """Read the address in a 32 bytes word, or None if the padding is dirty."""
+    return '0x' + word[12:].hex() if len(word) == 32 and word[:12] == _ADDRESS_PADDING else None
+
+def decode_standard_log(log: dict, topics: list=None) -> tuple:
+    """Slice the emitter, the 2 addresses and the amount of a Transfer / Approval event straight from its bytes.
+
+    Both the ERC-20 (amount in data) and the ERC-721 (amount indexed) layouts are supported,
+    None is returned for any other layout so that the log can go through the generic decoder."""
+    __topics = _parse_log_topics(log=log) if topics is None else topics
+    __data = toolblocks.parsing.common.to_bytes(log.get('data', b''))
+    # locate the amount
+    __amount = b''
+    if len(__topics) == 3 and len(__data) == 32:
+        __amount = __data
+    elif len(__topics) == 4 and not __data:
+        __amount = __topics[3]
+    # parse the addresses
+    __from = _slice_address(__topics[1]) if len(__amount) == 32 else None
+    __to = _slice_address(__topics[2]) if __from else None
+    return (_parse_address(log.get('address', '')), __from, __to, int.from_bytes(__amount, 'big')) if __to else None
+
+def _decode_standard_log_with_web3(log: dict, abi: dict, topics: list) -> tuple:
+    """Fallback on the generic decoder, with the same output format as the fast path.
+    Returns None for the logs that can't be decoded (wrong layout, dirty padding, truncated data)."""
+    try:
+        __event = decode_event_log(log=log, decoder=get_event_decoder(abi=abi, topics=topics), topics=topics)
+    except (eth_abi.exceptions.DecodingError, web3.exceptions.LogTopicError, ValueError):
+        return None
+    __args = [__event['args'].get(__n, '') for __n in _get_input_names(abi)]
+    return (_parse_address(log.get('address', '')), _parse_address(__args[0]), _parse_address(__args[1]), int(__args[2]))
+
+def _parse_standard_events(logs: collections.abc.Iterable, topic: bytes) -> tuple:
+    """Decode all the logs of a Transfer / Approval event into rows (emitter, from, to, amount)."""
+    __abi = EVENT_ABIS.get(topic.hex(), EVENT_EMPTY_ABI)
+    __rows = []
+    for __log in logs:
+        __topics = _parse_log_topics(log=__log)
+        if __topics and __topics[0] == topic:
+            __rows.append(decode_standard_log(log=__log, topics=__topics) or _decode_standard_log_with_web3(log=__log, abi=__abi, topics=__topics))
+    return tuple(__r for __r in __rows if __r is not None) # skip the malformed logs
+
+# TRANSFER VIEW ###############################################################
+
+# one column per field, the i-th transfer is described by the i-th item of each column
+Transfers = collections.namedtuple('Transfers', ('token', 'sender', 'recipient', 'value', 'is_mint'))
+
+def parse_transfer_events(logs: collections.abc.Iterable) -> Transfers:
+    """Decode the Transfer events of a transaction once, into columns shared by all the indicators."""
+    if isinstance(logs, Transfers):
+        return logs # already parsed
+    __columns = tuple(zip(*_parse_standard_events(logs=logs, topic=TRANSFER_TOPIC))) or ((), (), (), ())
+    return Transfers(
+        token=__columns[0],
+        sender=__columns[1],
+        recipient=__columns[2],
+        value=__columns[3],
+        is_mint=tuple(int(__s, 16) == 0 for __s in __columns[1])) # creation / minting of tokens
+
+# APPROVAL VIEW ###############################################################
+
+Approvals = collections.namedtuple('Approvals', ('token', 'owner', 'spender', 'value'))
+
+def parse_approval_events(logs: collections.abc.Iterable) -> Approvals:
+    """Decode the Approval events of a transaction once, in columns like the transfers."""
+    if isinstance(logs, Approvals):
+        return logs # already parsed
+    return Approvals(*(tuple(zip(*_parse_standard_events(logs=logs, topic=APPROVAL_TOPIC))) or ((), (), (), ())))
@@ -2,7 +2,7 @@
 
 In particular, look for arrays of addresses and amounts.
 
-Address and value regex are designed to be exclusive.
+Address and value regex / word classes are designed to be exclusive.
 This avoids matching the address when searching for values and vice-versa.
 
 All array functions are generic:
@@ -11,6 +11,10 @@ The result depends on the functions given as argument to process each element.
 
 import re
 
+import numpy
+
+import toolblocks.parsing.common
+
 # GENERIC #####################################################################
 
 def chunk(l, n):
@@ -79,6 +83,36 @@ def array_regex(length: int, element_regex: str) -> str:
     _elements_re = '(?:' + element_regex + f'){{{length}}}' # do not capture elements individually
     return '(' + _length_re + _elements_re + ')' # only capture the whole array as a group
 
+# WORDS #######################################################################
+
+def to_words(data: str) -> numpy.ndarray:
+    """View the arguments in the input data as a matrix of 32 bytes words, without copy."""
+    __bytes = toolblocks.parsing.common.to_bytes(data)[4:] # ignore the selector
+    __count = len(__bytes) // 32 # ignore the trailing partial word
+    return numpy.frombuffer(__bytes, dtype=numpy.uint8, count=32 * __count).reshape(__count, 32)
+
+def is_address_word(words: numpy.ndarray) -> numpy.ndarray:
+    """Flag the words that look like addresses: 12 null bytes of padding and mostly non-zero."""
+    __zeros = (words == 0)
+    return __zeros[:, :12].all(axis=1) & ~__zeros[:, 12:17].all(axis=1) # same as address_regex + is_valid_address
+
+def is_value_word(words: numpy.ndarray) -> numpy.ndarray:
+    """Flag the words that look like amounts: at least 17 null bytes of padding."""
+    return (words[:, :17] == 0).all(axis=1) # same as value_regex + is_valid_value
+
+def get_small_word_values(words: numpy.ndarray, limit: int) -> numpy.ndarray:
+    """Return the value of each word, or -1 when it is above the limit (and can't be an array length)."""
+    __small = (words[:, :24] == 0).all(axis=1)
+    __values = numpy.ascontiguousarray(words[:, 24:]).view('>u8').ravel()
+    return numpy.where(__small & (__values <= max(0, limit)), __values.astype(numpy.int64), -1)
+
+def get_run_lengths(mask: numpy.ndarray) -> numpy.ndarray:
+    """Count the consecutive True values starting at each index."""
+    __indexes = numpy.arange(len(mask))
+    __falses = numpy.where(mask, len(mask), __indexes) # position of the False values
+    __next = numpy.minimum.accumulate(__falses[::-1])[::-1] # position of the next False value, at or after each index
+    return __next - __indexes
+
 # PARSING #####################################################################
 
 def get_function_selector(data: str) -> str:
@@ -91,16 +125,22 @@ def get_array_length_candidates(data: str) -> list:
     _chunks = [int(_c, 16) for _c in chunk(data[10:], 64)] # ignore the prefix and selector
     return list(set([_c for _c in _chunks if _c <= _limit])) # remove repeats
 
-def get_array_candidates(data: str, element_regex: str, element_check: callable, parse_element: callable, min_length: int=4) -> list:
-    """Extract the address & value arrays from the hex input."""
+def get_array_candidates(data: str, element_check: callable, parse_element: callable, min_length: int=4) -> list:
+    """Extract the address & value arrays from the input, in a single pass over its words."""
     _arrays = []
-    _length_candidates = get_array_length_candidates(data)
-    for _l in _length_candidates:
-        _array_re = re.compile(array_regex(length=_l, element_regex=element_regex))
-        _array_candidates = _array_re.findall(data.lower())
-        for _a in _array_candidates:
-            if is_valid_array(data=_a, check=element_check, length=min_length):
-                _arrays.append(parse_array(_a, parse_element))
+    _words = to_words(data)
+    _hex = _words.tobytes().hex()
+    _checks = element_check(_words)
+    _lengths = get_small_word_values(words=_words, limit=len(_words) - 1)
+    _runs = numpy.append(get_run_lengths(_checks), 0) # the array elements start on the next word
+    _starts = numpy.flatnonzero((_lengths >= max(1, min_length)) & (_runs[1:] >= _lengths)) # the array elements all pass the check
+    _elements = [parse_element(_hex[64 * _i:64 * _i + 64]) if _c else None for _i, _c in enumerate(_checks.tolist())] # parse each word once, even when it belongs to several candidates
+    _ends = {} # arrays of the same length can't overlap, like the matches of a regex
+    for _i in _starts.tolist():
+        _l = int(_lengths[_i])
+        if _i >= _ends.get(_l, 0):
+            _ends[_l] = _i + _l + 1
+            _arrays.append(_elements[_i + 1:_i + _l + 1])
     return _arrays
 
 # HELPERS #####################################################################
@@ -109,8 +149,7 @@ def get_array_of_address_candidates(data: str, min_length: int=4) -> list:
     """Extract the address arrays from the hex input."""
     return get_array_candidates(
         data=data,
-        element_regex=address_regex(),
-        element_check=is_valid_address,
+        element_check=is_address_word,
         parse_element=parse_address,
         min_length=min_length)
 
@@ -118,8 +157,7 @@ def get_array_of_value_candidates(data: str, min_length: int=4) -> list:
     """Extract the value arrays from the hex input."""
     return get_array_candidates(
         data=data,
-        element_regex=value_regex(),
-        element_check=is_valid_value,
+        element_check=is_value_word,
         parse_element=parse_value,
         min_length=min_length)
 
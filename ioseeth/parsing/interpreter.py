@@ -0,0 +1,218 @@
+"""Interpret the bytecode abstractly, to resolve the storage slots and call targets computed from constants.
+
+The stack holds constants (integers), the content of constant storage slots (Load) or unknown values (None).
+The execution follows the jumps with known destinations, within a budget of steps per contract.
+"""
+
+import collections
+
+import ioseeth.cache
+import ioseeth.parsing.bytecode as ipb
+import ioseeth.utils
+
+# CONSTANTS ###################################################################
+
+STEP_BUDGET = 2**14
+STACK_LIMIT = 1024
+VISIT_LIMIT = 16 # entries in a block with distinct stacks, before the loops are cut
+HASH_LIMIT = 2**10 # longest memory segment hashed by SHA3, in bytes
+
+WORD = 2**256
+ADDRESS_MASK = 2**160 - 1
+
+# VALUES ######################################################################
+
+Load = collections.namedtuple('Load', ('slot',)) # the content of a constant storage slot
+
+Effects = collections.namedtuple('Effects', ('sloads', 'sstores', 'calls', 'delegatecalls', 'delegated_slots', 'copies', 'returns', 'creates', 'steps', 'complete'))
+
+# STACK #######################################################################
+
+def _get_stack_effects() -> dict:
+    """Map each opcode that does not halt to the number of items it pops from and pushes to the stack."""
+    __effects = {0x08: (3, 1), 0x09: (3, 1)} # ADDMOD, MULMOD
+    __effects.update({__o: (2, 1) for __o in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x0a, 0x0b)}) # arithmetic
+    __effects.update({__o: (2, 1) for __o in (0x10, 0x11, 0x12, 0x13, 0x14, 0x16, 0x17, 0x18, 0x1a, 0x1b, 0x1c, 0x1d)}) # comparison & bitwise
+    __effects.update({0x15: (1, 1), 0x19: (1, 1), 0x20: (2, 1)}) # ISZERO, NOT, SHA3
+    __effects.update({__o: (0, 1) for __o in (0x30, 0x32, 0x33, 0x34, 0x36, 0x38, 0x3a, 0x3d)}) # environment
+    __effects.update({__o: (1, 1) for __o in (0x31, 0x35, 0x3b, 0x3f)}) # BALANCE, CALLDATALOAD, EXTCODESIZE, EXTCODEHASH
+    __effects.update({0x37: (3, 0), 0x39: (3, 0), 0x3c: (4, 0), 0x3e: (3, 0)}) # copies
+    __effects.update({__o: (0, 1) for __o in range(0x41, 0x49)}) # block
+    __effects.update({0x40: (1, 1), 0x49: (1, 1), 0x4a: (0, 1)}) # BLOCKHASH, BLOBHASH, BLOBBASEFEE
+    __effects.update({
+        0x50: (1, 0), 0x51: (1, 1), 0x52: (2, 0), 0x53: (2, 0), 0x54: (1, 1), 0x55: (2, 0), 0x56: (1, 0), 0x57: (2, 0),
+        0x58: (0, 1), 0x59: (0, 1), 0x5a: (0, 1), 0x5b: (0, 0), 0x5c: (1, 1), 0x5d: (2, 0), 0x5e: (3, 0)})
+    __effects.update({__o: (0, 1) for __o in range(ipb.PUSH0, ipb.PUSH32 + 1)})
+    __effects.update({__o: (0, 0) for __o in range(ipb.DUP1, ipb.SWAP16 + 1)}) # handled separately
+    __effects.update({__o: (2 + __o - ipb.LOG0, 0) for __o in range(ipb.LOG0, ipb.LOG4 + 1)})
+    __effects.update({
+        ipb.CREATE: (3, 1), ipb.CALL: (7, 1), ipb.CALLCODE: (7, 1), ipb.DELEGATECALL: (6, 1),
+        ipb.CREATE2: (4, 1), ipb.STATICCALL: (6, 1)})
+    return __effects
+
+STACK_EFFECTS = _get_stack_effects()
+
+# FOLDING #####################################################################
+
+FOLDING = {
+    ipb.ADD: lambda __a, __b: (__a + __b) % WORD,
+    ipb.MUL: lambda __a, __b: (__a * __b) % WORD,
+    ipb.SUB: lambda __a, __b: (__a - __b) % WORD,
+    ipb.DIV: lambda __a, __b: __a // __b if __b else 0,
+    ipb.MOD: lambda __a, __b: __a % __b if __b else 0,
+    ipb.EXP: lambda __a, __b: pow(__a, __b, WORD),
+    ipb.LT: lambda __a, __b: int(__a < __b),
+    ipb.GT: lambda __a, __b: int(__a > __b),
+    ipb.EQ: lambda __a, __b: int(__a == __b),
+    ipb.ISZERO: lambda __a: int(__a == 0),
+    ipb.AND: lambda __a, __b: __a & __b,
+    ipb.OR: lambda __a, __b: __a | __b,
+    ipb.XOR: lambda __a, __b: __a ^ __b,
+    ipb.NOT: lambda __a: WORD - 1 - __a,
+    ipb.SHL: lambda __a, __b: (__b << __a) % WORD if __a < 256 else 0,
+    ipb.SHR: lambda __a, __b: __b >> __a if __a < 256 else 0,}
+
+def _fold(opcode: int, args: list) -> any:
+    """Compute the result of an instruction on constant arguments, or None when it is unknown."""
+    if opcode in FOLDING and all(isinstance(__a, int) for __a in args):
+        return FOLDING[opcode](*args)
+    if opcode == ipb.AND and ADDRESS_MASK in args and any(isinstance(__a, Load) for __a in args):
+        return next(__a for __a in args if isinstance(__a, Load)) # casting the content of a slot to an address
+    return None
+
+# MEMORY ######################################################################
+
+def _write(memory: dict, offset: any, value: any, size: int) -> None:
+    """Store the bytes of a constant, or forget them when the value is unknown. Unknown offsets forget everything."""
+    if not isinstance(offset, int) or offset > WORD - size:
+        memory.clear()
+        return
+    __bytes = value.to_bytes(size, 'big') if isinstance(value, int) and value < 256**size else None
+    for __i in range(size):
+        if __bytes is None:
+            memory.pop(offset + __i, None)
+        else:
+            memory[offset + __i] = __bytes[__i]
+
+def _read(memory: dict, offset: any, size: any) -> bytes:
+    """Load a memory segment when all its bytes are known constants, None otherwise."""
+    if not isinstance(offset, int) or not isinstance(size, int) or size > HASH_LIMIT:
+        return None
+    __bytes = [memory.get(offset + __i) for __i in range(size)]
+    return None if None in __bytes else bytes(__bytes)
+
+# INTERPRETER #################################################################
+
+@ioseeth.cache.memoize_by_code_hash
+def interpret(bytecode: str, budget: int=STEP_BUDGET) -> Effects:
+    """Run the bytecode on abstract values, and collect the constant storage slots and call targets."""
+    __d = ipb.disassemble(bytecode=bytecode)
+    __jumpdests = {__o: __i for __i, __o in enumerate(__d.offsets) if __d.opcodes[__i] == ipb.JUMPDEST}
+    __sloads, __sstores, __calls, __delegatecalls, __delegated = set(), set(), set(), set(), set()
+    __copies, __returns, __creates = set(), set(), set() # (memory offset, code offset, size) and (memory offset, size)
+    __todo = [(0, (), {})] # instruction index, stack, memory
+    __visited = set()
+    __visits = collections.Counter()
+    __steps = 0
+    while __todo and __steps < budget:
+        __i, __stack, __memory = __todo.pop()
+        __stack = list(__stack)
+        while __i < len(__d.opcodes) and __steps < budget and len(__stack) <= STACK_LIMIT:
+            __oc = __d.opcodes[__i]
+            if __oc == ipb.JUMPDEST: # blocks are entered once per stack, and a few times at most
+                __key = (__i, tuple(__stack))
+                if __key in __visited or __visits[__i] >= VISIT_LIMIT:
+                    break
+                __visited.add(__key)
+                __visits[__i] += 1
+            if __oc == ipb.RETURN and len(__stack) > 1 and isinstance(__stack[-1], int) and isinstance(__stack[-2], int):
+                __returns.add((__stack[-1], __stack[-2]))
+            if __oc not in STACK_EFFECTS: # halting or invalid
+                break
+            __steps += 1
+            __pops, __pushes = STACK_EFFECTS[__oc]
+            __args = [__stack.pop() if __stack else None for _ in range(__pops)] # the entry stack is unknown
+            __result = None
+            __next = __i + 1
+            if ipb.is_push(__oc):
+                __result = int.from_bytes(__d.code[__d.offsets[__i] + 1:__d.ends[__i]], 'big')
+            elif ipb.is_dup(__oc):
+                __n = __oc - ipb.DUP1 + 1
+                __stack.append(__stack[-__n] if len(__stack) >= __n else None)
+            elif ipb.is_swap(__oc):
+                __n = __oc - ipb.SWAP1 + 1
+                __stack[:0] = max(0, __n + 1 - len(__stack)) * [None]
+                __stack[-1], __stack[-__n - 1] = __stack[-__n - 1], __stack[-1]
+            elif __oc == ipb.PC:
+                __result = __d.offsets[__i]
+            elif __oc == ipb.CODESIZE:
+                __result = len(__d.code)
+            elif __oc == ipb.MLOAD:
+                __word = _read(memory=__memory, offset=__args[0], size=32)
+                __result = None if __word is None else int.from_bytes(__word, 'big')
+            elif __oc == ipb.MSTORE:
+                _write(memory=__memory, offset=__args[0], value=__args[1], size=32)
+            elif __oc == ipb.MSTORE8:
+                _write(memory=__memory, offset=__args[0], value=__args[1] % 256 if isinstance(__args[1], int) else None, size=1)
+            elif __oc == ipb.SHA3:
+                __data = _read(memory=__memory, offset=__args[0], size=__args[1])
+                __result = None if __data is None else int(ioseeth.utils.keccak(primitive=__data), 16)
+            elif __oc == ipb.SLOAD:
+                if isinstance(__args[0], int):
+                    __sloads.add(__args[0])
+                    __result = Load(slot=__args[0])
+            elif __oc == ipb.SSTORE:
+                if isinstance(__args[0], int):
+                    __sstores.add(__args[0])
+            elif __oc in (ipb.CALL, ipb.CALLCODE, ipb.STATICCALL, ipb.DELEGATECALL):
+                __memory.clear() # the output is written to memory
+                if isinstance(__args[1], int):
+                    (__delegatecalls if __oc == ipb.DELEGATECALL else __calls).add(__args[1] & ADDRESS_MASK)
+                elif isinstance(__args[1], Load) and __oc == ipb.DELEGATECALL:
+                    __delegated.add(__args[1].slot)
+            elif __oc in (ipb.CREATE, ipb.CREATE2):
+                if isinstance(__args[1], int) and isinstance(__args[2], int):
+                    __creates.add((__args[1], __args[2]))
+            elif __oc in (0x37, 0x39, 0x3c, 0x3e, 0x5e): # CALLDATACOPY, CODECOPY, EXTCODECOPY, RETURNDATACOPY, MCOPY
+                if __oc == ipb.CODECOPY and isinstance(__args[1], int) and isinstance(__args[2], int):
+                    __copies.add((__args[0] if isinstance(__args[0], int) else None, __args[1], __args[2]))
+                __memory.clear()
+            elif __oc == ipb.JUMP:
+                if __args[0] not in __jumpdests:
+                    break
+                __next = __jumpdests[__args[0]]
+            elif __oc == ipb.JUMPI:
+                if isinstance(__args[1], int) and __args[1]: # always taken
+                    if __args[0] not in __jumpdests:
+                        break
+                    __next = __jumpdests[__args[0]]
+                elif __args[1] is None or isinstance(__args[1], Load): # both branches
+                    if __args[0] in __jumpdests:
+                        __todo.append((__jumpdests[__args[0]], tuple(__stack), dict(__memory)))
+            else:
+                __result = _fold(opcode=__oc, args=__args)
+            if __pushes:
+                __stack.append(__result)
+            __i = __next
+    return Effects(
+        sloads=frozenset(__sloads),
+        sstores=frozenset(__sstores),
+        calls=frozenset(__calls),
+        delegatecalls=frozenset(__delegatecalls),
+        delegated_slots=frozenset(__delegated),
+        copies=frozenset(__copies),
+        returns=frozenset(__returns),
+        creates=frozenset(__creates),
+        steps=__steps,
+        complete=not __todo and __steps < budget)
+
+# STORAGE #####################################################################
+
+def get_storage_slots(bytecode: str, budget: int=STEP_BUDGET) -> tuple:
+    """List the constant slots read or written by the bytecode, formatted like ioseeth.parsing.bytecode.get_storage_slots."""
+    __effects = interpret(bytecode=bytecode, budget=budget)
+    return tuple('{:064x}'.format(__s) for __s in sorted(__effects.sloads | __effects.sstores))
+
+def get_delegated_slots(bytecode: str, budget: int=STEP_BUDGET) -> tuple:
+    """List the slots whose content is used as the target of a DELEGATECALL."""
+    return tuple('{:064x}'.format(__s) for __s in sorted(interpret(bytecode=bytecode, budget=budget).delegated_slots))
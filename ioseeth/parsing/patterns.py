@@ -0,0 +1,138 @@
+"""Match patterns written over the instructions of a bytecode.
+
+The patterns are sequences of instruction tokens with optional parts and alternatives, like regexes
+whose characters are instructions. They are compiled once into an automaton that reads the decoded
+instructions in a single pass: matches can't straddle instruction boundaries, and there's no backtracking.
+"""
+
+import collections
+
+import ioseeth.parsing.bytecode
+
+# TOKENS ######################################################################
+
+# an instruction with one of the opcodes and, for the PUSH instructions, an optional constraint on its argument
+Token = collections.namedtuple('Token', ('opcodes', 'argument'))
+
+# nodes of the pattern tree, built with the helpers below
+Sequence = collections.namedtuple('Sequence', ('items',))
+Either = collections.namedtuple('Either', ('items',))
+Optional = collections.namedtuple('Optional', ('item',))
+
+def token(*opcodes: int, argument: int=None) -> Token:
+    """Match a single instruction, among the given opcodes."""
+    return Token(opcodes=frozenset(opcodes), argument=argument)
+
+def push(*sizes: int, argument: int=None) -> Token:
+    """Match a PUSH instruction of the given sizes (0 to 32 bytes), with an optional argument value."""
+    return token(*(ioseeth.parsing.bytecode.PUSH0 + __s for __s in sizes), argument=argument)
+
+def sequence(*items: tuple) -> Sequence:
+    return Sequence(items=items)
+
+def either(*items: tuple) -> Either:
+    return Either(items=items)
+
+def optional(item: tuple) -> Optional:
+    return Optional(item=item)
+
+def _match_token(token: Token, opcode: int, argument: bytes) -> bool:
+    """Check whether an instruction satisfies a token."""
+    return opcode in token.opcodes and (token.argument is None or int.from_bytes(argument, 'big') == token.argument)
+
+# NFA #########################################################################
+
+# Thompson automaton: state i has the transitions edges[i] on tokens and epsilons[i] for free
+NFA = collections.namedtuple('NFA', ('tokens', 'edges', 'epsilons', 'accept'))
+
+def _compile_node(node: tuple, start: int, edges: list, epsilons: list, tokens: list) -> int:
+    """Add the states of a pattern node after the start state, and return its final state."""
+    def __new() -> int:
+        edges.append([])
+        epsilons.append([])
+        return len(edges) - 1
+    if isinstance(node, Token):
+        if node not in tokens:
+            tokens.append(node)
+        __end = __new()
+        edges[start].append((tokens.index(node), __end))
+        return __end
+    if isinstance(node, Sequence):
+        __state = start
+        for __item in node.items:
+            __state = _compile_node(__item, __state, edges, epsilons, tokens)
+        return __state
+    if isinstance(node, Either):
+        __end = __new()
+        for __item in node.items:
+            __branch = __new()
+            epsilons[start].append(__branch)
+            epsilons[_compile_node(__item, __branch, edges, epsilons, tokens)].append(__end)
+        return __end
+    if isinstance(node, Optional):
+        __end = _compile_node(node.item, start, edges, epsilons, tokens)
+        epsilons[start].append(__end)
+        return __end
+    raise TypeError('unknown pattern node {node}'.format(node=node))
+
+def compile_nfa(pattern: tuple) -> NFA:
+    __edges, __epsilons, __tokens = [[]], [[]], []
+    __accept = _compile_node(pattern, 0, __edges, __epsilons, __tokens)
+    return NFA(tokens=tuple(__tokens), edges=__edges, epsilons=__epsilons, accept=__accept)
+
+def _closure(nfa: NFA, states: frozenset) -> frozenset:
+    """Add all the states reachable through epsilon transitions."""
+    __stack = list(states)
+    __closure = set(states)
+    while __stack:
+        for __next in nfa.epsilons[__stack.pop()]:
+            if __next not in __closure:
+                __closure.add(__next)
+                __stack.append(__next)
+    return frozenset(__closure)
+
+# DFA #########################################################################
+
+class Matcher:
+    """Search a pattern in bytecode, with a DFA built lazily from the NFA.
+
+    The DFA states are sets of NFA states, and its alphabet is the set of tokens satisfied by each instruction:
+    most instructions satisfy none, and all the searches share the transitions computed so far."""
+
+    def __init__(self, pattern: tuple) -> None:
+        self.nfa = compile_nfa(pattern)
+        self._start = _closure(self.nfa, frozenset((0,)))
+        self._transitions = {} # (DFA state, satisfied tokens) => DFA state
+        # the tokens that can be decided on the opcode alone
+        __opcodes = frozenset().union(*(__t.opcodes for __t in self.nfa.tokens))
+        self._classes = {__o: frozenset(__i for __i, __t in enumerate(self.nfa.tokens) if __o in __t.opcodes and __t.argument is None) for __o in __opcodes}
+        self._arguments = frozenset(__o for __o in __opcodes if any(__o in __t.opcodes and __t.argument is not None for __t in self.nfa.tokens))
+
+    def _step(self, state: frozenset, satisfied: frozenset) -> frozenset:
+        """Follow the transitions on the satisfied tokens, the search can also restart at any instruction."""
+        __key = (state, satisfied)
+        if __key not in self._transitions:
+            __next = frozenset(__t for __s in state for __i, __t in self.nfa.edges[__s] if __i in satisfied)
+            self._transitions[__key] = _closure(self.nfa, __next) | self._start
+        return self._transitions[__key]
+
+    def search(self, bytecode: str, reachable: bool=True) -> bool:
+        """Check whether the pattern appears in the instructions, only the reachable ones by default."""
+        __disassembly = ioseeth.parsing.bytecode.disassemble(bytecode=bytecode)
+        __reachable = ioseeth.parsing.bytecode.get_control_flow_graph(bytecode=bytecode).reachable if reachable else None
+        __code = __disassembly.code
+        __none = frozenset()
+        __state = self._start
+        __accept = self.nfa.accept
+        for __i, __opcode in enumerate(__disassembly.opcodes):
+            if reachable and not __reachable[__i]:
+                __state = self._start # dead code breaks the sequences
+                continue
+            __satisfied = self._classes.get(__opcode, __none)
+            if __opcode in self._arguments: # compare the argument of the PUSH
+                __argument = __code[__disassembly.offsets[__i] + 1:__disassembly.ends[__i]]
+                __satisfied = __satisfied | frozenset(__j for __j, __t in enumerate(self.nfa.tokens) if __t.argument is not None and _match_token(__t, __opcode, __argument))
+            __state = self._step(__state, __satisfied)
+            if __accept in __state:
+                return True
+        return False
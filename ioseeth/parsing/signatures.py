@@ -0,0 +1,121 @@
+"""Find all the known constants in a bytecode with a single scan.
+
+The signatures (init codes, storage slots, selectors...) are registered by the indicator modules,
+and compiled together in an Aho-Corasick automaton: the bytecode is read once, whatever the number
+of signatures, and the indicators query the resulting set of hits.
+"""
+
+import collections
+
+import toolblocks.parsing.common
+
+import ioseeth.cache
+import ioseeth.utils
+
+# REGISTRY ####################################################################
+
+SIGNATURES = {} # name => pattern, as bytes
+
+def register_signature(name: str, pattern: any, index: dict=SIGNATURES) -> None:
+    """Add a constant to the registry, the automaton is rebuilt on the next scan."""
+    __pattern = toolblocks.parsing.common.to_bytes(pattern)
+    if not __pattern:
+        raise ValueError('empty signature "{name}"'.format(name=name))
+    index[name] = __pattern
+
+def register_signatures(prefix: str, patterns: dict, index: dict=SIGNATURES) -> None:
+    """Register a family of constants, named "prefix/key"."""
+    for __key, __pattern in patterns.items():
+        register_signature(name='{prefix}/{key}'.format(prefix=prefix, key=__key), pattern=__pattern, index=index)
+
+def lookup_signature(pattern: any, index: dict=SIGNATURES) -> str:
+    """Find the name under which a pattern is registered, or an empty string."""
+    __pattern = toolblocks.parsing.common.to_bytes(pattern)
+    return next((__n for __n, __p in index.items() if __p == __pattern), '')
+
+def get_family(prefix: str, index: dict=SIGNATURES) -> tuple:
+    """List the names of the signatures registered under a prefix."""
+    return tuple(__n for __n in index if __n.startswith(prefix + '/'))
+
+# AUTOMATON ###################################################################
+
+# transitions on every byte value, to avoid following the failure links during the scans
+Automaton = collections.namedtuple('Automaton', ('transitions', 'outputs'))
+
+def compile_automaton(patterns: dict) -> Automaton:
+    """Build the deterministic Aho-Corasick automaton matching all the patterns at once."""
+    __goto = [{}]
+    __outputs = [set()]
+    # trie
+    for __name, __pattern in patterns.items():
+        __state = 0
+        for __byte in __pattern:
+            if __byte not in __goto[__state]:
+                __goto.append({})
+                __outputs.append(set())
+                __goto[__state][__byte] = len(__goto) - 1
+            __state = __goto[__state][__byte]
+        __outputs[__state].add(__name)
+    # failure links, breadth first
+    __fail = [0] * len(__goto)
+    __transitions = [None] * len(__goto)
+    __transitions[0] = [__goto[0].get(__b, 0) for __b in range(256)]
+    __queue = collections.deque(__goto[0].values())
+    while __queue:
+        __state = __queue.popleft()
+        __outputs[__state] |= __outputs[__fail[__state]] # the suffixes that are patterns too
+        __transitions[__state] = list(__transitions[__fail[__state]])
+        for __byte, __next in __goto[__state].items():
+            __fail[__next] = __transitions[__fail[__state]][__byte] if __state else 0
+            __transitions[__state][__byte] = __next
+            __queue.append(__next)
+    return Automaton(transitions=tuple(__transitions), outputs=tuple(frozenset(__o) for __o in __outputs))
+
+_AUTOMATON = {} # registry version => automaton
+_VERSIONS = {} # in-process hash of the registry => stable digest
+
+def get_version(index: dict=SIGNATURES) -> str:
+    """Digest the registry into a key that is stable across processes, unlike hash() which is randomized."""
+    __key = hash(frozenset(index.items()))
+    if __key not in _VERSIONS:
+        _VERSIONS.clear()
+        _VERSIONS[__key] = ioseeth.utils.keccak(primitive=b''.join(
+            __n.encode('utf-8') + b'\x00' + __p + b'\x00' for __n, __p in sorted(index.items())))
+    return _VERSIONS[__key]
+
+def get_automaton(index: dict=SIGNATURES) -> Automaton:
+    """Compile the registry, once per set of signatures."""
+    __version = get_version(index=index)
+    if __version not in _AUTOMATON:
+        _AUTOMATON.clear()
+        _AUTOMATON[__version] = compile_automaton(patterns=index)
+    return _AUTOMATON[__version]
+
+# SCAN ########################################################################
+
+def scan(bytecode: any, automaton: Automaton) -> frozenset:
+    """List the names of all the patterns found in the bytecode, overlapping or not."""
+    __hits = set()
+    __state = 0
+    __transitions = automaton.transitions
+    __outputs = automaton.outputs
+    for __byte in toolblocks.parsing.common.to_bytes(bytecode):
+        __state = __transitions[__state][__byte]
+        if __outputs[__state]:
+            __hits |= __outputs[__state]
+    return frozenset(__hits)
+
+@ioseeth.cache.memoize_by_code_hash
+def _get_hits(bytecode: any, version: str) -> frozenset:
+    return scan(bytecode=bytecode, automaton=get_automaton())
+
+def get_signature_hits(bytecode: any) -> frozenset:
+    """List the registered signatures found in the bytecode, cached by code hash."""
+    return _get_hits(bytecode=bytecode, version=get_version()) # new signatures invalidate the cache
+
+def bytecode_has_signature(bytecode: any, name: str) -> bool:
+    return name in get_signature_hits(bytecode=bytecode)
+
+def count_signatures(bytecode: any, names: tuple) -> int:
+    """Count how many of the given signatures appear in the bytecode."""
+    return len(get_signature_hits(bytecode=bytecode).intersection(names))
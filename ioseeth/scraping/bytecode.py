@@ -1,7 +1,18 @@
-"""."""
+"""Locate the deployment of contracts on the chain."""
+
+import asyncio
+import collections.abc
 
 import web3
 
+import toolblocks.parsing.common
+
+import ioseeth.scraping.rpc
+
+# CONSTANTS ###################################################################
+
+ARITY = 8 # probes per contract and per round, the search interval shrinks by this factor each round
+
 # CREATION ####################################################################
 
 def find_deployment_block_for_contract(
@@ -20,5 +31,68 @@ def find_deployment_block_for_contract(
             __left = __next + 1
         else:
             __right = __next
-        print('{block}: {code} => {id}'.format(block=__next, code=__code.hex()[:10], id=hash(__code)))
     return __left
+
+# BOUNDS ######################################################################
+
+def get_deployment_bounds_from_traces(traces: collections.abc.Iterable) -> dict:
+    """Read the exact deployment block of the contracts created in the given traces."""
+    __bounds = {}
+    for __t in traces:
+        __address = (__t.get('result', None) or {}).get('address', '')
+        if 'create' in str(__t.get('type', '')).lower() and __address and __t.get('blockNumber', None) is not None:
+            __bounds[__address.lower()] = (int(__t['blockNumber']), int(__t['blockNumber']))
+    return __bounds
+
+def _has_code(code: str) -> bool:
+    """Check whether a getCode result is an actual contract."""
+    return len(toolblocks.parsing.common.to_bytes(code)) > 0
+
+def _get_probes(left: int, right: int, arity: int) -> list:
+    """Spread the probes evenly over [left, right), the code is known to be deployed at right."""
+    return sorted(set(left + (right - left) * __i // arity for __i in range(arity)))
+
+def _narrow(left: int, right: int, probes: list, codes: list) -> tuple:
+    """Shrink the interval around the first probe where the code exists."""
+    for __p, __c in zip(probes, codes):
+        if _has_code(__c):
+            return (left, __p)
+        left = __p + 1
+    return (left, right)
+
+# BATCH SEARCH ################################################################
+
+async def find_deployment_blocks(
+    provider: ioseeth.scraping.rpc.AsyncBatchProvider,
+    addresses: collections.abc.Iterable,
+    left: int=0,
+    right: int=-1,
+    arity: int=ARITY,
+    bounds: dict=None,
+) -> dict:
+    """Find the deployment blocks of many contracts at once, with k-ary searches run in lockstep.
+    Each round probes all the contracts in a single batch, and the known bounds (from traces, a cache...) narrow the searches.
+    The addresses without code at the right bound are mapped to None."""
+    __bounds = {__a.lower(): __b for __a, __b in (bounds or {}).items()}
+    __addresses = list(dict.fromkeys(__a.lower() for __a in addresses))
+    __right = right if right > left else int(await provider.request('eth_blockNumber'), 16)
+    # make sure the contracts exist at the right bound
+    __todo = [__a for __a in __addresses if __a not in __bounds]
+    __codes = await provider.get_codes(addresses=__todo, block=__right)
+    __intervals = {__a: (left, __right) for __a, __c in zip(__todo, __codes) if _has_code(__c)}
+    __intervals.update({__a: (max(left, __b[0]), min(__right, __b[1])) for __a, __b in __bounds.items() if __a in __addresses})
+    # k-ary search, all the contracts in the same batch
+    while any(__l < __r for __l, __r in __intervals.values()):
+        __pending = {__a: _get_probes(left=__l, right=__r, arity=max(2, arity)) for __a, (__l, __r) in __intervals.items() if __l < __r}
+        __calls = [('eth_getCode', (__a, hex(__p))) for __a, __probes in __pending.items() for __p in __probes]
+        __results = iter(await provider.batch(__calls))
+        for __a, __probes in __pending.items():
+            __intervals[__a] = _narrow(*__intervals[__a], probes=__probes, codes=[next(__results) for _ in __probes])
+    return {__a: __intervals[__a][0] if __a in __intervals else None for __a in __addresses}
+
+def find_deployment_blocks_sync(provider: ioseeth.scraping.rpc.AsyncBatchProvider, addresses: collections.abc.Iterable, **kwargs) -> dict:
+    """Run the batch search from synchronous code."""
+    async def __run() -> dict:
+        async with provider:
+            return await find_deployment_blocks(provider=provider, addresses=addresses, **kwargs)
+    return asyncio.run(__run())
@@ -0,0 +1,97 @@
+"""Cache the RPC results that can't change anymore, on disk.
+
+The state of an account at a final block is immutable: the results are indexed by the hash
+of the method and its parameters, and only cached when the block is deep enough in the chain.
+"""
+
+import json
+import threading
+import time
+
+import ioseeth.cache
+import ioseeth.utils
+
+# CONSTANTS ###################################################################
+
+FINALITY_DEPTH = 64 # blocks, 2 epochs on mainnet
+CACHE_SIZE = 2**30 # bytes
+LATEST_BLOCK_TTL = 12 # seconds, the latest block number is refreshed at this pace
+
+# position of the block identifier in the parameters of each method
+BLOCK_PARAMETER = {
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getStorageAt': 2,
+    'eth_getTransactionCount': 1,
+    'eth_call': 1,
+    'eth_getBlockByNumber': 0,}
+
+# KEYS ########################################################################
+
+def _normalize(value: any) -> any:
+    """Make the parameters comparable: HEX strings are lowercased, bytes are formatted as HEX."""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, dict):
+        return {__k: _normalize(__v) for __k, __v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(__v) for __v in value]
+    return value
+
+def request_key(method: str, params: any) -> str:
+    """Content address of a request: hash of the method and its normalized parameters."""
+    return '{method}:{hash}'.format(method=method, hash=ioseeth.utils.keccak(text=json.dumps([method, _normalize(params)], sort_keys=True, default=str)))
+
+def get_block_number(method: str, params: any) -> int:
+    """Extract the block targeted by a request, None when it is a tag like "latest"."""
+    __index = BLOCK_PARAMETER.get(method, None)
+    __block = params[__index] if __index is not None and len(params) > __index else None
+    if isinstance(__block, int):
+        return __block
+    if isinstance(__block, str) and __block.startswith('0x') and len(__block) <= 18: # block hashes are not numbers
+        return int(__block, 16)
+    return None
+
+# MIDDLEWARE ##################################################################
+
+def construct_rpc_cache_middleware(store: ioseeth.cache.DiskStore, finality: int=FINALITY_DEPTH, methods: dict=BLOCK_PARAMETER) -> callable:
+    """Create a web3 middleware that serves the results of the historic requests from the store."""
+
+    def __rpc_cache_middleware(make_request: callable, w3: any) -> callable:
+        __latest = {'number': -1, 'time': 0.}
+        __lock = threading.Lock()
+
+        def __final_block() -> int:
+            """Highest block considered final, the latest block number is fetched at most once per TTL."""
+            with __lock:
+                if time.time() - __latest['time'] > LATEST_BLOCK_TTL:
+                    __response = make_request('eth_blockNumber', [])
+                    if 'result' in __response:
+                        __latest['number'] = int(__response['result'], 16) if isinstance(__response['result'], str) else int(__response['result'])
+                        __latest['time'] = time.time()
+                return __latest['number'] - finality
+
+        def __middleware(method: str, params: any) -> dict:
+            __block = get_block_number(method=method, params=params) if method in methods else None
+            if __block is None:
+                return make_request(method, params)
+            __key = request_key(method=method, params=params)
+            __result = store.get(__key, ioseeth.cache._MISSING)
+            if __result is not ioseeth.cache._MISSING:
+                return {'jsonrpc': '2.0', 'id': -1, 'result': __result}
+            __response = make_request(method, params)
+            if __response.get('result', None) is not None and 'error' not in __response and __block <= __final_block():
+                store.set(__key, __response['result'])
+            return __response
+
+        return __middleware
+
+    return __rpc_cache_middleware
+
+def enable_rpc_cache(w3: any, path: str, finality: int=FINALITY_DEPTH, maxsize: int=CACHE_SIZE) -> ioseeth.cache.DiskStore:
+    """Put a persistent cache in front of the provider of a web3 instance."""
+    __store = ioseeth.cache.DiskStore(path=path, table='rpc', maxsize=maxsize)
+    w3.middleware_onion.add(construct_rpc_cache_middleware(store=__store, finality=finality), name='rpc_cache')
+    return __store
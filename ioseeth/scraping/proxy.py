@@ -0,0 +1,113 @@
+"""Resolve the implementations behind proxies, for many contracts at once.
+
+Each round reads the code and the standard slots of all the pending proxies in batched RPC calls:
+- the ERC-1167 clones are decoded offline
+- the ERC-1967 / ZeppelinOS / ERC-1822 logic slots hold the implementation
+- the ERC-1967 beacon slot holds a contract whose implementation() is queried
+The implementations are proxies themselves and followed, up to a fixed depth.
+"""
+
+import collections
+import collections.abc
+
+import ioseeth.cache
+import ioseeth.indicators.proxy
+import ioseeth.scraping.rpc
+
+# CONSTANTS ###################################################################
+
+MAX_DEPTH = 4 # proxies of proxies
+PROXY_CACHE_SIZE = 2**16
+
+IMPLEMENTATION_SELECTOR = '0x5c60da1b' # implementation()
+
+# a single redirection, from a proxy to its implementation
+ProxyLink = collections.namedtuple('ProxyLink', ('proxy', 'implementation', 'standard'))
+
+PROXY_CACHE = ioseeth.cache.LRUCache(maxsize=PROXY_CACHE_SIZE) # (address, block) => link or None
+
+# SLOTS #######################################################################
+
+def _get_slot_calls(addresses: list, block: str) -> list:
+    """List the storage reads for all the standard slots of all the addresses."""
+    return [
+        ('eth_getStorageAt', (__a, '0x' + __s, block))
+        for __a in addresses
+        for __s in list(ioseeth.indicators.proxy.LOGIC_SLOTS.values()) + list(ioseeth.indicators.proxy.BEACON_SLOTS.values())]
+
+def _parse_slots(values: list) -> tuple:
+    """Split the values read from the slots of an address into (standard, implementation) and (standard, beacon)."""
+    __logic = [('slot/' + __n, ioseeth.indicators.proxy.parse_slot_address(__v or '0x')) for __n, __v in zip(ioseeth.indicators.proxy.LOGIC_SLOTS, values)]
+    __beacon = [('beacon/' + __n, ioseeth.indicators.proxy.parse_slot_address(__v or '0x')) for __n, __v in zip(ioseeth.indicators.proxy.BEACON_SLOTS, values[len(ioseeth.indicators.proxy.LOGIC_SLOTS):])]
+    return (
+        next(((__n, __a) for __n, __a in __logic if __a), None),
+        next(((__n, __a) for __n, __a in __beacon if __a), None))
+
+# RESOLVE #####################################################################
+
+async def _resolve_links(provider: ioseeth.scraping.rpc.AsyncBatchProvider, addresses: list, block: str) -> dict:
+    """Find the direct implementation of each address, with at most 3 batches of RPC calls."""
+    __links = {}
+    # the clones hardcode their implementation
+    __codes = await provider.get_codes(addresses=addresses, block=block)
+    for __a, __c in zip(addresses, __codes):
+        __implementation = ioseeth.indicators.proxy.get_minimal_proxy_implementation(bytecode=__c)
+        __links[__a] = ProxyLink(proxy=__a, implementation=__implementation, standard='erc-1167') if __implementation else None
+    # read all the standard slots at once
+    __pending = [__a for __a, __c in zip(addresses, __codes) if __links[__a] is None and len(__c) > 2] # skip EOAs
+    __count = len(ioseeth.indicators.proxy.LOGIC_SLOTS) + len(ioseeth.indicators.proxy.BEACON_SLOTS)
+    __values = await provider.batch(_get_slot_calls(addresses=__pending, block=block), errors=False) # a failed read is an empty slot
+    __beacons = {}
+    for __i, __a in enumerate(__pending):
+        __logic, __beacon = _parse_slots(__values[__i * __count:(__i + 1) * __count])
+        if __logic:
+            __links[__a] = ProxyLink(proxy=__a, implementation=__logic[1], standard=__logic[0])
+        elif __beacon:
+            __beacons[__a] = __beacon
+    # ask the beacons for the implementation
+    # the call reverts on contracts that are not beacons: the proxy is left without link
+    __results = await provider.batch((('eth_call', ({'to': __b[1], 'data': IMPLEMENTATION_SELECTOR}, block)) for __b in __beacons.values()), errors=False)
+    for (__a, __b), __r in zip(__beacons.items(), __results):
+        __implementation = ioseeth.indicators.proxy.parse_slot_address(__r or '0x')
+        __links[__a] = ProxyLink(proxy=__a, implementation=__implementation, standard=__b[0]) if __implementation else None
+    return __links
+
+async def resolve_implementations(
+    provider: ioseeth.scraping.rpc.AsyncBatchProvider,
+    addresses: collections.abc.Iterable,
+    block: any='latest',
+    depth: int=MAX_DEPTH,
+    cache: ioseeth.cache.LRUCache=PROXY_CACHE,
+) -> dict:
+    """Follow the chain of implementations behind each address, all the addresses are resolved together.
+    Each address is mapped to its list of links, empty when it is not a proxy.
+    The links are cached per block, except for block tags like "latest"."""
+    __block = ioseeth.scraping.rpc._to_block_identifier(block)
+    __cacheable = isinstance(block, int)
+    __chains = {__a.lower(): [] for __a in addresses}
+    __heads = {__a: __a for __a in __chains} # the last address reached in each chain
+    for _ in range(max(0, depth)):
+        # resolve each address once, whatever the number of chains going through it
+        __targets = list(dict.fromkeys(__h for __h in __heads.values() if __h))
+        __links = {__t: cache.get((__t, block), ioseeth.cache._MISSING) if __cacheable else ioseeth.cache._MISSING for __t in __targets}
+        __unknown = [__t for __t, __l in __links.items() if __l is ioseeth.cache._MISSING]
+        if __unknown:
+            __links.update(await _resolve_links(provider=provider, addresses=__unknown, block=__block))
+            if __cacheable:
+                for __t in __unknown:
+                    cache.set((__t, block), __links[__t])
+        # extend the chains
+        for __a, __h in __heads.items():
+            __link = __links.get(__h, None) if __h else None
+            if __link is not None and __link.implementation not in (__l.proxy for __l in __chains[__a]): # stop on cycles
+                __chains[__a].append(__link)
+                __heads[__a] = __link.implementation
+            else:
+                __heads[__a] = ''
+        if not any(__heads.values()):
+            break
+    return __chains
+
+def get_final_implementation(chain: list) -> str:
+    """Return the contract that actually holds the logic, at the end of the chain."""
+    return chain[-1].implementation if chain else ''
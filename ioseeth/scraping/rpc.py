@@ -0,0 +1,114 @@
+"""Query a node with batches of JSON-RPC requests, asynchronously.
+
+The calls are packed in JSON-RPC batches, sent concurrently over a pool of connections:
+looking up the balances of hundreds of addresses costs a few round trips.
+"""
+
+import asyncio
+import collections.abc
+import itertools
+
+import aiohttp
+
+import toolblocks.parsing.common
+
+# CONSTANTS ###################################################################
+
+BATCH_SIZE = 256 # calls per HTTP request, most nodes cap the batches between 100 and 1000
+CONCURRENCY = 4 # HTTP requests in flight
+TIMEOUT = 30 # seconds
+
+# FORMAT ######################################################################
+
+def _to_block_identifier(block: any) -> str:
+    """Format the block numbers as HEX quantities, and let the tags like "latest" through."""
+    return hex(block) if isinstance(block, int) else str(block)
+
+def _to_quantity(value: any) -> str:
+    """Format an integer as a HEX quantity, without leading zeros."""
+    return hex(value if isinstance(value, int) else toolblocks.parsing.common.to_int(value))
+
+# PROVIDER ####################################################################
+
+class AsyncBatchProvider:
+    """Send JSON-RPC calls in batches, over a pool of HTTP connections."""
+
+    def __init__(self, url: str, batch_size: int=BATCH_SIZE, concurrency: int=CONCURRENCY, timeout: float=TIMEOUT) -> None:
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._ids = itertools.count()
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self) -> 'AsyncBatchProvider':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _connect(self) -> aiohttp.ClientSession:
+        """Open the session lazily, inside the running event loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        """Release the connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _post(self, payload: list) -> list:
+        """Send a single batch and return the raw responses."""
+        __session = self._connect()
+        async with self._semaphore:
+            async with __session.post(self.url, json=payload) as __response:
+                __response.raise_for_status()
+                __data = await __response.json(content_type=None)
+        return __data if isinstance(__data, list) else [__data] # some nodes answer a batch of 1 with a single object
+
+    async def _send(self, calls: list, errors: bool=True) -> list:
+        """Send a batch of calls, and order the results like the calls.
+        The failed calls raise, or are answered with None when errors is False."""
+        __ids = [next(self._ids) for _ in calls]
+        __responses = await self._post([{'jsonrpc': '2.0', 'id': __i, 'method': __m, 'params': list(__p)} for __i, (__m, __p) in zip(__ids, calls)])
+        __results = {__r.get('id'): __r for __r in __responses}
+        __ordered = []
+        for __i in __ids:
+            __r = __results.get(__i, {'error': {'code': -32603, 'message': 'missing response'}})
+            if 'error' in __r and errors:
+                raise ValueError(__r['error']) # like web3
+            __ordered.append(None if 'error' in __r else __r.get('result'))
+        return __ordered
+
+    async def batch(self, calls: collections.abc.Iterable, errors: bool=True) -> list:
+        """Run (method, params) calls in as few HTTP requests as possible, and return the results in order.
+        By default, a single failed call raises for the whole batch: with errors=False, it is answered with None."""
+        __calls = list(calls)
+        __chunks = [__calls[__i:__i + self.batch_size] for __i in range(0, len(__calls), self.batch_size)]
+        __results = await asyncio.gather(*(self._send(__c, errors=errors) for __c in __chunks))
+        return list(itertools.chain.from_iterable(__results))
+
+    async def request(self, method: str, params: collections.abc.Iterable=()) -> any:
+        """Run a single call."""
+        return (await self.batch([(method, params)]))[0]
+
+    # SHORTHANDS ##############################################################
+
+    async def get_balances(self, addresses: collections.abc.Iterable, block: any='latest') -> list:
+        """Fetch the balances of several addresses at a given block, as integers."""
+        __results = await self.batch(('eth_getBalance', (__a, _to_block_identifier(block))) for __a in addresses)
+        return [int(__r, 16) for __r in __results]
+
+    async def get_codes(self, addresses: collections.abc.Iterable, block: any='latest') -> list:
+        """Fetch the bytecode of several addresses at a given block, as HEX strings."""
+        return await self.batch(('eth_getCode', (__a, _to_block_identifier(block))) for __a in addresses)
+
+    async def get_storages_at(self, slots: collections.abc.Iterable, block: any='latest') -> list:
+        """Fetch several (address, slot) storage words at a given block, as HEX strings."""
+        return await self.batch(('eth_getStorageAt', (__a, _to_quantity(__s), _to_block_identifier(block))) for __a, __s in slots)
@@ -0,0 +1,14 @@
+"""Fixtures shared by the test modules."""
+
+import pytest
+
+import tests.test_data as td
+
+# RPC #########################################################################
+
+@pytest.fixture(scope='module')
+def url():
+    """Serve the stub node on localhost for the tests of a module."""
+    __server = td.serve(td.StubNode)
+    yield 'http://127.0.0.1:{port}'.format(port=__server.server_address[1])
+    __server.shutdown()
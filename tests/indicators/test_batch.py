@@ -3,6 +3,8 @@
 import pytest
 
 import ioseeth.indicators.batch as iib
+import ioseeth.indicators.events as iie
+import ioseeth.parsing.events as ipe
 import tests.test_data as td
 
 # FIXTURES ####################################################################
@@ -32,3 +34,13 @@ def test_indicators_ignore_other_data_types():
 # EVENTS ######################################################################
 
 # TRANSFERS ###################################################################
+
+def test_indicators_read_the_parsed_transfers():
+    __transfers = ipe.parse_transfer_events(logs=td.TRANSFER_LOGS)
+    for __logs in (td.TRANSFER_LOGS, __transfers):
+        assert iib.log_has_multiple_erc20_transfer_events(logs=__logs, min_count=8, min_total=280)
+        assert iib.log_has_multiple_erc20_mint_events(logs=__logs, min_count=8, min_total=0)
+        assert iib.log_has_erc20_transfer_of_null_amount(logs=__logs)
+        assert iib.log_has_multiple_erc721_mint_events(logs=__logs, min_count=8)
+        assert not iib.log_has_multiple_erc721_transfer_events(logs=__logs, min_count=9)
+        assert iie.check_transfer_events_constraints(logs=__logs)[:2] == (iie.EventIssue.ERC20_TransferNullAmount, iie.EventIssue.Null)
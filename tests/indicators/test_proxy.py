@@ -1,3 +1,23 @@
 import pytest
 
 import ioseeth.indicators.proxy as iip
+import tests.test_data as td
+
+# STANDARDS ###################################################################
+
+def test_computed_standard_slots_are_detected():
+    assert iip.LOGIC_SLOTS['erc-1967'] not in td.COMPUTED_PROXY
+    assert iip.bytecode_uses_standard_proxy_slots(bytecode=td.COMPUTED_PROXY)
+    assert not iip.bytecode_has_proxy_slots_from_several_standards(bytecode=td.COMPUTED_PROXY)
+    assert not iip.bytecode_uses_standard_proxy_slots(bytecode=td.HASHED_SLOT)
+
+def test_literal_slots_skip_the_interpreter(monkeypatch):
+    monkeypatch.setattr(iip.ioseeth.parsing.interpreter, 'get_storage_slots', lambda bytecode: pytest.fail('the interpreter should not run'))
+    assert iip.bytecode_uses_standard_proxy_slots(bytecode='0x7f' + iip.LOGIC_SLOTS['erc-1967'] + '54')
+
+# INTERFACES ##################################################################
+
+def test_registration_does_not_leak_names():
+    assert not [__n for __n in vars(iip) if __n.startswith('__') and not __n.endswith('__')]
+    assert set(iip.INTERFACES) <= set(iip.ioseeth.indicators.interfaces.INTERFACES)
+    assert {'erc-1167', 'erc-1167/child'} <= set(iip.INTERFACES)
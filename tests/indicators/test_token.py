@@ -1,3 +1,22 @@
 import pytest
 
 import ioseeth.indicators.token as iit
+
+import ioseeth.indicators.generic as iig
+import ioseeth.indicators.interfaces as iii
+import tests.test_data as td
+
+# INTERFACES ##################################################################
+
+def test_registry_matches_the_generic_interface_check():
+    for __name, __abi in iit.INTERFACES.items():
+        for __threshold in (0.5, 0.8, 1.):
+            assert iii.bytecode_has_known_interface(bytecode=td.ERC20_HUB, name=__name, threshold=__threshold) == iig.bytecode_has_specific_interface(bytecode=td.ERC20_HUB, abi=__abi, threshold=__threshold)
+
+def test_token_interfaces_are_detected():
+    assert iit.bytecode_has_erc20_interface(bytecode=td.ERC20_HUB)
+    assert iit.bytecode_has_any_token_interface(bytecode=td.ERC20_HUB)
+    assert not iit.bytecode_has_any_token_interface(bytecode=td.ERC20_HUB[:40])
+
+def test_registration_does_not_leak_names():
+    assert not [__n for __n in vars(iit) if __n.startswith('__') and not __n.endswith('__')]
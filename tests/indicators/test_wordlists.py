@@ -38,3 +38,42 @@ def test_known_signatures_included_in_wordlist(signature_wordlist):
 
 def test_known_selectors_included_in_wordlist(selector_wordlist):
     assert all([_s in selector_wordlist for _s in KNOWN_SELECTORS])
+
+# TABLE #######################################################################
+
+def test_known_selectors_included_in_table():
+    assert all([iiw.table_has_selector(int(_s, 16)) for _s in KNOWN_SELECTORS])
+    assert not iiw.table_has_selector(int('a9059cbb', 16)) # transfer(address,uint256)
+
+def test_table_matches_the_wordlist(selector_wordlist):
+    assert list(iiw.get_selector_table()) == sorted(set(int(_s, 16) for _s in selector_wordlist))
+
+def test_table_is_regenerated_when_outdated(tmp_path):
+    _path = str(tmp_path / 'batching.bin')
+    assert iiw.load_selector_table(path=_path) is None # missing
+    iiw.save_selector_table(table=iiw.generate_selector_table(signatures=KNOWN_SIGNATURES), path=_path)
+    assert list(iiw.load_selector_table(path=_path)) == sorted(int(_s, 16) for _s in KNOWN_SELECTORS)
+    with open(_path, 'r+b') as _f:
+        _f.seek(len(iiw.TABLE_MAGIC))
+        _f.write(32 * b'\x00') # fingerprint of other wordlists
+    assert iiw.load_selector_table(path=_path) is None
+
+def test_truncated_table_is_treated_as_missing(tmp_path):
+    _path = str(tmp_path / 'batching.bin')
+    iiw.save_selector_table(table=iiw.generate_selector_table(signatures=KNOWN_SIGNATURES), path=_path)
+    with open(_path, 'r+b') as _f:
+        _f.truncate(len(iiw.TABLE_MAGIC) + 32 + 6) # half written selector
+    assert iiw.load_selector_table(path=_path) is None
+    assert [_p.name for _p in tmp_path.iterdir()] == ['batching.bin'] # no temporary file left behind
+
+def test_table_is_little_endian(tmp_path):
+    _path = str(tmp_path / 'batching.bin')
+    iiw.save_selector_table(table=iiw.generate_selector_table(signatures=KNOWN_SIGNATURES[:1]), path=_path)
+    with open(_path, 'rb') as _f:
+        assert _f.read()[len(iiw.TABLE_MAGIC) + 32:] == bytes.fromhex(ipa.calculate_selector(KNOWN_SIGNATURES[0]))[::-1]
+
+def test_outdated_table_is_regenerated_in_memory(tmp_path):
+    _path = tmp_path / 'batching.bin'
+    _path.write_bytes(iiw.TABLE_MAGIC + 32 * b'\x00') # fingerprint of other wordlists
+    assert iiw.table_has_selector(int(KNOWN_SELECTORS[0], 16), table=iiw.get_selector_table(path=str(_path)))
+    assert _path.read_bytes() == iiw.TABLE_MAGIC + 32 * b'\x00' # left untouched
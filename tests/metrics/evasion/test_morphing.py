@@ -1,3 +1,22 @@
 import pytest
 
 import ioseeth.metrics.evasion.morphing.metamorphism as imemm
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+def embed(child: str) -> str:
+    """Deploy a contract whose runtime deploys the child with CREATE."""
+    __size = len(child) // 2
+    return td.deploy(runtime='61{size:04x}6011600039' '61{size:04x}60006000f0' '00'.format(size=__size) + child)
+
+MUTANT_FACTORY = td.deploy(runtime='6000600060006000f500') # CREATE2
+PLAIN = td.deploy(runtime='600000')
+
+# FACTORY #####################################################################
+
+def test_embedded_contracts_are_analysed():
+    __embedded = imemm.is_transaction_factory_contract_deployment(to='', data=embed(child=MUTANT_FACTORY))
+    __plain = imemm.is_transaction_factory_contract_deployment(to='', data=embed(child=PLAIN))
+    assert __embedded > __plain
+    assert imemm.is_transaction_factory_contract_deployment(to='', data=MUTANT_FACTORY) == __embedded
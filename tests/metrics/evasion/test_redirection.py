@@ -0,0 +1,23 @@
+import pytest
+
+import ioseeth.indicators.proxy as iip
+import ioseeth.metrics.evasion.redirection as imer
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+CUSTOM_PROXY = '0x' + '6000' '6000' '6000' '6000' '73' + 20 * 'cd' + '5a' 'f4' '00' # args, PUSH20 logic, GAS DELEGATECALL STOP
+STANDARD_PROXY = '0x' + '7f' + iip.LOGIC_SLOTS['erc-1967'] + '54' '6000' '6000' '6000' '6000' '94' '5a' 'f4' '00' # SLOAD the ERC-1967 slot
+
+TRANSFER = '0xa9059cbb' + 64 * '0'
+
+# IMPLEMENTATION ##############################################################
+
+def test_implementation_is_scored():
+    __unknown = imer.is_hidden_proxy(data=TRANSFER, bytecode=CUSTOM_PROXY)
+    assert imer.is_hidden_proxy(data=TRANSFER, bytecode=CUSTOM_PROXY, implementation='0x') > __unknown
+    assert imer.is_hidden_proxy(data=TRANSFER, bytecode=CUSTOM_PROXY, implementation=td.ERC20_HUB) > __unknown
+    assert imer.is_hidden_proxy(data=TRANSFER, bytecode=CUSTOM_PROXY, implementation='0x6001') == pytest.approx(__unknown)
+
+def test_standard_proxies_may_serve_tokens():
+    assert imer.is_hidden_proxy(data=TRANSFER, bytecode=STANDARD_PROXY, implementation=td.ERC20_HUB) == pytest.approx(imer.is_hidden_proxy(data=TRANSFER, bytecode=STANDARD_PROXY))
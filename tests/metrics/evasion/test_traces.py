@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import pytest
+
+import ioseeth.cache as ic
+import ioseeth.metrics.evasion.morphing.logic_bomb as imeml
+import ioseeth.metrics.evasion.morphing.metamorphism as imemm
+import ioseeth.metrics.evasion.traces as imet
+
+# FIXTURES ####################################################################
+
+FACTORY_INIT_CODE = '0x' + '600a600c600039600a6000f3' + '5860208158601c335a63aaf10f428752fa158151803b80938091923cf3'
+
+TRACES = [
+    {'type': 'call', 'input': '0x', 'output': '0x'},
+    {'type': 'create', 'input': FACTORY_INIT_CODE, 'output': '0x6001600055'},
+    {'type': 'suicide', 'input': '0x', 'output': '0x'},]
+
+# EMPTY #######################################################################
+
+def test_empty_traces_have_neutral_scores():
+    assert imet.analyze_traces(traces=[]) == imet.EMPTY_SCORES
+    assert imeml.is_traces_red_pill_contract_creation(traces=[]) == 0.5
+    assert imemm.is_traces_factory_contract_creation(traces=[]) == 0.5
+    assert imemm.is_traces_mutant_contract_creation(traces=[]) == 0.5
+
+# SCORES ######################################################################
+
+def test_analyzer_matches_the_individual_metrics():
+    __scores = imet.analyze_traces(traces=TRACES)
+    assert __scores.factory == max(imemm.is_trace_factory_contract_creation(action=__t['type'], creation_bytecode=__t['input'], runtime_bytecode=__t['output']) for __t in TRACES)
+    assert __scores.mutant == max(imemm.is_trace_mutant_contract_creation(action=__t['type'], creation_bytecode=__t['input'], runtime_bytecode=__t['output']) for __t in TRACES)
+    assert __scores.red_pill == imeml.is_traces_red_pill_contract_creation(traces=TRACES)
+    assert __scores.self_destruct == 0.9
+
+def test_duplicate_traces_are_analyzed_once(monkeypatch):
+    __calls = []
+    __metric = imemm.is_trace_mutant_contract_creation.__wrapped__
+    monkeypatch.setattr(imemm, 'is_trace_mutant_contract_creation', ic.memoize_by_code_hash(lambda **__k: __calls.append(__k) or __metric(**__k)))
+    monkeypatch.setattr(ic, 'BYTECODE_CACHE', ic.LRUCache(maxsize=64))
+    imet.analyze_traces(traces=40 * TRACES[1:2])
+    imet.analyze_traces(traces=[dict(TRACES[1], input=TRACES[1]['input'].upper().replace('0X', '0x'))]) # same code, other encoding
+    imemm.is_traces_mutant_contract_creation(traces=TRACES[1:2])
+    assert len(__calls) == 1
+
+# IMPORTS #####################################################################
+
+def test_metrics_do_not_import_the_analyzer():
+    __code = 'import sys, ioseeth.metrics.evasion.morphing.logic_bomb, ioseeth.metrics.evasion.morphing.metamorphism; assert "ioseeth.metrics.evasion.traces" not in sys.modules'
+    assert subprocess.run([sys.executable, '-c', __code]).returncode == 0
@@ -0,0 +1,79 @@
+import itertools
+import json
+import pickle
+import threading
+import time
+
+import pytest
+
+import ioseeth.metrics.pipeline as imp
+import ioseeth.metrics.scoring as ims
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+TRANSACTIONS = [dict(__t, hash='0x{:064x}'.format(__i)) for __i, __t in enumerate(td.SYNTHETIC_TRANSACTIONS)]
+
+@pytest.fixture
+def dumps(tmp_path):
+    __jsonl = tmp_path / 'transactions.jsonl'
+    __pickle = tmp_path / 'transactions.pkl'
+    __jsonl.write_text(''.join(json.dumps(__t) + '\n' for __t in TRANSACTIONS[:6]))
+    with open(__pickle, 'wb') as __f:
+        for __t in TRANSACTIONS[6:]:
+            pickle.dump(__t, __f)
+    return tmp_path
+
+# READ ########################################################################
+
+def test_readers_yield_the_transactions_in_order(dumps):
+    assert list(imp.read_transactions(paths=[str(dumps / 'transactions.jsonl'), str(dumps / 'transactions.pkl')])) == TRANSACTIONS
+
+def test_directories_are_walked(dumps):
+    assert len(list(imp.read_transactions(paths=str(dumps)))) == len(TRANSACTIONS)
+
+def test_web3_dumps_can_be_scored():
+    __records = list(imp.stream_scores(transactions=imp.read_transactions(paths='tests/.data/transactions/'), maxsize=4))
+    assert __records and all(__r['hash'].startswith('0x') for __r in __records)
+
+# BACKPRESSURE ################################################################
+
+def test_buffer_reads_a_bounded_number_of_items_ahead():
+    __read = itertools.count()
+    __stream = imp.buffer((next(__read) for _ in range(1000)), maxsize=8)
+    assert next(__stream) == 0
+    __ahead = next(__read) # items consumed by the background thread
+    assert 1 <= __ahead <= 8 + 2
+    __stream.close()
+
+def test_buffer_releases_the_producer_when_the_consumer_stops():
+    __threads = threading.active_count()
+    __stream = imp.buffer(iter(range(2)), maxsize=1)
+    assert next(__stream) == 0
+    time.sleep(0.2) # the producer fills the queue and waits to put the end marker
+    __stream.close()
+    __deadline = time.time() + 2
+    while threading.active_count() > __threads and time.time() < __deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == __threads
+
+def test_buffer_forwards_the_errors():
+    def __fail():
+        yield 1
+        raise ValueError('broken input')
+    with pytest.raises(ValueError):
+        list(imp.buffer(__fail(), maxsize=2))
+
+# PIPELINE ####################################################################
+
+def test_stream_matches_the_batch_scoring():
+    __expected = ims.score_transactions(transactions=TRANSACTIONS, workers=1)
+    for __workers in (1, 2):
+        __records = list(imp.stream_scores(transactions=iter(TRANSACTIONS), workers=__workers, maxsize=4))
+        assert [__r.pop('hash') for __r in __records] == [__t['hash'] for __t in TRANSACTIONS]
+        assert __records == __expected
+
+def test_records_are_written_as_jsonl(dumps):
+    __output = dumps / 'scores.jsonl'
+    assert imp.run(inputs=[str(dumps / 'transactions.jsonl')], output=str(__output)) == 6
+    assert [json.loads(__l)['hash'] for __l in __output.read_text().splitlines()] == [__t['hash'] for __t in TRANSACTIONS[:6]]
@@ -3,6 +3,8 @@
 import pytest
 import random
 
+import numpy
+
 import ioseeth.metrics.probabilities as probabilities
 
 # FIXTURES ####################################################################
@@ -29,3 +31,21 @@ def test_conflation_score_remains_the_same_when_adding_a_probability_of_50_perce
 
 def test_conflation_score_dcreases_when_adding_a_probability_below_50_percent():
     assert all([probabilities.conflation(_s +[ random.uniform(0.01, 0.49)]) < probabilities.conflation(_s) for _s in SAMPLES])
+
+# BATCH #######################################################################
+
+def test_batch_casting_matches_the_scalar_function():
+    __indicators = numpy.random.randint(0, 2, size=(len(SCORES), 3)).astype(bool)
+    __true, __false = numpy.array(SCORES[:3]), 1. - numpy.array(SCORES[:3])
+    __expected = [[probabilities.indicator_to_probability(__i, __t, __f) for __i, __t, __f in zip(__r, __true, __false)] for __r in __indicators]
+    assert numpy.array_equal(probabilities.indicators_to_probabilities(__indicators, __true, __false), __expected)
+
+def test_batch_conflation_matches_the_scalar_function():
+    __scores = numpy.random.uniform(0.01, 0.99, size=(100, 8))
+    assert numpy.allclose(probabilities.batch_conflation(__scores), [probabilities.conflation(list(__r)) for __r in __scores], rtol=1e-12, atol=0.)
+
+def test_batch_conflation_does_not_underflow():
+    __scores = numpy.array([200 * [1e-3] + 200 * [1. - 1e-3]]) # both products underflow to 0
+    with pytest.raises(ZeroDivisionError):
+        probabilities.conflation(__scores[0].tolist())
+    assert probabilities.batch_conflation(__scores)[0] == pytest.approx(0.5)
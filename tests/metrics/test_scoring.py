@@ -0,0 +1,24 @@
+import pytest
+
+import ioseeth.metrics.scoring as ims
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+# SEQUENTIAL ##################################################################
+
+def test_all_the_metrics_are_evaluated():
+    assert all(set(__s) == set(ims.METRICS) for __s in ims.score_transactions(transactions=td.SYNTHETIC_TRANSACTIONS, workers=1))
+
+def test_missing_fields_have_default_values():
+    assert ims.score_transaction(transaction={})['evasion/factory'] == 0.5
+
+# PARALLEL ####################################################################
+
+def test_parallel_scores_are_in_the_original_order():
+    assert ims.score_transactions(transactions=td.SYNTHETIC_TRANSACTIONS, workers=2, chunksize=5) == ims.score_transactions(transactions=td.SYNTHETIC_TRANSACTIONS, workers=1)
+
+def test_blocks_keep_their_transactions_grouped():
+    __scores = ims.score_blocks(blocks=[td.SYNTHETIC_TRANSACTIONS[:5], [], td.SYNTHETIC_TRANSACTIONS[5:]], workers=2, chunksize=3)
+    assert [len(__b) for __b in __scores] == [5, 0, 7]
+    assert __scores[0] + __scores[2] == ims.score_transactions(transactions=td.SYNTHETIC_TRANSACTIONS, workers=1)
@@ -1,3 +1,30 @@
+import subprocess
+import sys
+
 import pytest
 
 import ioseeth.parsing.balances as ipb
+
+# FIXTURES ####################################################################
+
+class StubEth:
+    def get_balance(self, address, block):
+        return 3 * block
+
+class StubWeb3:
+    eth = StubEth()
+
+ADDRESS = '0x' + 20 * 'ab'
+
+# DELTA #######################################################################
+
+def test_provider_argument_is_deprecated():
+    __w3 = StubWeb3()
+    with pytest.warns(DeprecationWarning):
+        assert ipb.get_balance_delta(provider=__w3, address=ADDRESS, block=10) == ipb.get_balance_delta(w3=__w3, address=ADDRESS, block=10) == 3
+    with pytest.warns(DeprecationWarning):
+        assert ipb.get_balance_deltas(provider=__w3, addresses=[ADDRESS, ''], block=10) == {ADDRESS: 3}
+
+def test_sync_indicators_do_not_load_the_async_provider():
+    __code = 'import sys, ioseeth.indicators.batch; assert "ioseeth.scraping.rpc" not in sys.modules'
+    assert subprocess.run([sys.executable, '-c', __code]).returncode == 0
@@ -0,0 +1,49 @@
+import pytest
+
+import ioseeth.indicators.token as iit
+import ioseeth.parsing.clones as ipc
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+IMPLEMENTATION = '0x' + 20 * 'bc'
+
+ERC1167 = '0x363d3d373d3d3d363d73' + IMPLEMENTATION[2:] + '5af43d82803e903d91602b57fd5bf3'
+VANITY = '0x363d3d373d3d3d363d6f' + 16 * 'bc' + '5af43d82803e903d91602757fd5bf3'
+METAPROXY = '0x363d3d373d3d3d3d60368038038091363936013d73' + IMPLEMENTATION[2:] + '5af43d3d93803e603457fd5bf3' + 64 * 'ff'
+
+# CLASSIFY ####################################################################
+
+def test_templates_are_recognized():
+    assert ipc.classify_clone(ERC1167) == ipc.Clone(template='erc-1167', implementation=IMPLEMENTATION)
+    assert ipc.classify_clone(bytes.fromhex(METAPROXY[2:])) == ipc.Clone(template='erc-3448', implementation=IMPLEMENTATION)
+    assert ipc.classify_clone(VANITY) == ipc.Clone(template='erc-1167/vanity', implementation='0x' + 4 * '00' + 16 * 'bc')
+
+def test_other_code_is_not_a_clone():
+    assert ipc.classify_clone(ERC1167 + '00') is None # exact template
+    assert ipc.classify_clone(td.ERC20_HUB) is None
+    assert ipc.classify_clone('0x') is None
+    assert ipc.classify_clone(ERC1167 + '0') is None # malformed
+
+def test_only_the_head_is_converted():
+    assert ipc.classify_clone(METAPROXY + 'zz') == ipc.classify_clone(METAPROXY) # the tail is not even read
+
+# INDEX #######################################################################
+
+def test_clones_are_grouped_by_implementation():
+    __groups = ipc.group_clones_by_implementation(dict([('0x' + 40 * str(__i), ERC1167) for __i in range(4)] + [('0x' + 40 * 'a', td.ERC20_HUB)]))
+    assert list(__groups) == [IMPLEMENTATION]
+    assert len(__groups[IMPLEMENTATION]) == 4
+
+def test_clones_are_analysed_through_their_implementation():
+    __index = {}
+    assert ipc.resolve_code(ERC1167, index=__index) == ERC1167
+    ipc.register_implementation(address=IMPLEMENTATION, bytecode=td.ERC20_HUB, index=__index)
+    assert ipc.resolve_code(ERC1167, index=__index) == td.ERC20_HUB
+
+def test_clones_have_no_token_interface_of_their_own():
+    __index = {}
+    assert not iit.bytecode_has_any_token_interface(ERC1167, implementations=__index)
+    ipc.register_implementation(address=IMPLEMENTATION, bytecode=td.ERC20_HUB, index=__index)
+    assert iit.bytecode_has_erc20_interface(ERC1167, implementations=__index)
+    assert not iit.bytecode_has_erc20_interface(ERC1167) # the global index is left untouched
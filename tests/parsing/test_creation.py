@@ -0,0 +1,61 @@
+"""Test the split of the creation data."""
+
+import toolblocks.parsing.common as fpc
+import ioseeth.parsing.bytecode as ipb
+import ioseeth.parsing.creation as ipc
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+RUNTIME = fpc.to_hexstr(td.RAW)
+ARGS = 32 * '00' + 31 * '00' + '01'
+CREATION = td.deploy(runtime=RUNTIME) + ARGS
+
+CHILD = td.deploy(runtime=RUNTIME)
+CHILD_SIZE = len(fpc.to_bytes(CHILD))
+FACTORY_METADATA = 'a165767970657283000304000b'
+FACTORY_RUNTIME = '61{size:04x}6011600039' '61{size:04x}60006000f0' '00'.format(size=CHILD_SIZE) + CHILD + FACTORY_METADATA # CODECOPY the child at 17, CREATE it
+FACTORY = td.deploy(runtime=FACTORY_RUNTIME)
+
+# SPLIT #######################################################################
+
+def test_creation_data_is_split_into_offsets():
+    __layouts = ipc.split_creation_data(bytecode=CREATION)
+    __metadata = ipb.parse_metadata(bytecode=RUNTIME).size
+    __end = 14 + len(fpc.to_bytes(RUNTIME))
+    assert __layouts == (ipc.Layout(creation=(0, 14), runtime=(14, __end - __metadata), metadata=(__end - __metadata, __end), args=(__end, __end + 64), depth=0),)
+
+def test_segments_are_views_on_the_original_buffer():
+    __code = fpc.to_bytes(CREATION)
+    __layout = ipc.split_creation_data(bytecode=CREATION)[0]
+    __view = ipc.get_segment(code=__code, segment=__layout.args)
+    assert isinstance(__view, memoryview) and __view.obj is __code
+    assert __view.hex() == ARGS
+    assert ipc.get_segment(code=__code, segment=__layout.metadata).hex() == ipb.split_metadata(bytecode=RUNTIME)[1]
+
+def test_embedded_contracts_are_split_recursively():
+    __layouts = ipc.split_creation_data(bytecode=FACTORY)
+    assert [__l.depth for __l in __layouts] == [0, 1]
+    assert __layouts[1].creation == (14 + 17, 14 + 17 + 14)
+    assert [__r for _, __r in ipc.iterate_over_contracts(bytecode=FACTORY)] == [FACTORY_RUNTIME[:-len(FACTORY_METADATA)], ipb.split_metadata(bytecode=RUNTIME)[0]]
+    assert [__i for __i, _ in ipc.iterate_over_contracts(bytecode=FACTORY)] == [FACTORY, CHILD]
+
+def test_unresolved_layouts_fall_back_on_the_regex():
+    __data = '6080604052' + 'f3' + RUNTIME # the init code has no constant CODECOPY
+    __layout = ipc.split_creation_data(bytecode=__data)[0]
+    assert __layout.creation == (0, 6) and __layout.runtime[0] == 6 # the regex keeps RETURN in the creation code
+    assert ipc.split_creation_data(bytecode='0x') == ()
+
+def nest(count: int, create: bool) -> str:
+    """Copy nested prefixes of the code itself, optionally deploying each of them with CREATE."""
+    __size = count * (17 if create else 8) + 25
+    __code = ''.join(
+        '61{size:04x}60006000' '39'.format(size=__size - __j) + ('61{size:04x}60006000' 'f0' '50'.format(size=__size - __j) if create else '')
+        for __j in range(count))
+    return __code + '600a' '80' '61{offset:04x}' '6000' '39' '6000' 'f3' 'fe'.format(offset=len(__code) // 2 + 10) + '6000600060006000f500'
+
+def test_copies_that_are_not_deployed_are_ignored():
+    assert len(ipc.split_creation_data(bytecode=nest(count=70, create=False))) == 1
+
+def test_nested_deployments_are_bounded():
+    assert len(ipc.split_creation_data(bytecode=nest(count=200, create=True))) <= ipc.MAX_CONTRACTS
@@ -0,0 +1,53 @@
+"""Test the decoding of the function dispatcher."""
+
+import ioseeth.indicators.interfaces as iii
+import ioseeth.parsing.bytecode as ipc
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+SPLIT_HUB = (
+    '0x600035' '60e01c' # PUSH1 0 CALLDATALOAD PUSH1 0xe0 SHR
+    '806350000000' '11' '610020' '57' # DUP1 PUSH4 GT PUSH2 JUMPI => split
+    '806311111111' '14' '610037' '57' # DUP1 PUSH4 EQ PUSH2 JUMPI
+    '00000000' # fallback + padding
+    '5b' '806366666666' '14' '610038' '57' # JUMPDEST DUP1 PUSH4 EQ PUSH2 JUMPI
+    '80' '62abcdef' '14' '610039' '57' # DUP1 PUSH3 EQ PUSH2 JUMPI => selector 0x00abcdef
+    '00' '5b5b5b')
+
+VYPER_HUB = (
+    '0x600035' '7c0100000000000000000000000000000000000000000000000000000000' '90' '04' '600052' # CALLDATALOAD PUSH29 SWAP1 DIV PUSH1 0 MSTORE
+    '6322222222' '600051' '18' '610035' '57' # PUSH4 PUSH1 0 MLOAD XOR PUSH2 JUMPI => falls through when equal
+    '5b00' # function entry
+    '5b' '6333333333' '600051' '14' '15' '610046' '57' # JUMPDEST PUSH4 PUSH1 0 MLOAD EQ ISZERO PUSH2 JUMPI
+    '5b00' '5b00')
+
+# DISPATCHER ##################################################################
+
+def test_linear_hub_maps_selectors_to_entry_points():
+    assert dict(ipc.get_dispatch_table(bytecode=td.RAW)) == {0x1c4695f4: 0x46, 0x3d7403a3: 0x64, 0x6d4ce63c: 0x80}
+
+def test_binary_search_hub_is_walked_on_both_sides():
+    assert dict(ipc.get_dispatch_table(bytecode=SPLIT_HUB)) == {0x11111111: 0x37, 0x66666666: 0x38, 0x00abcdef: 0x39}
+    assert 0x50000000 not in ipc.get_selectors(bytecode=SPLIT_HUB) # the pivot is compared with GT, not EQ
+
+def test_negated_comparisons_enter_on_fall_through():
+    assert dict(ipc.get_dispatch_table(bytecode=VYPER_HUB)) == {0x22222222: 0x33, 0x33333333: 0x44}
+
+def test_bytecode_without_hub_has_empty_table():
+    assert ipc.get_dispatch_table(bytecode='0x6080604052') == ()
+    assert ipc.get_selectors(bytecode='0x') == frozenset()
+
+# SELECTORS ###################################################################
+
+def test_constants_complete_the_hub():
+    __stray = SPLIT_HUB + '6344444444' '14' # PUSH4 EQ past the hub, like a partly walked dispatcher
+    assert ipc.get_selectors(bytecode=__stray) == ipc.get_selectors(bytecode=SPLIT_HUB) | frozenset({0x44444444})
+    assert ipc.get_selectors(bytecode='0x' + '6344444444' '14') == frozenset({0x44444444})
+
+def test_function_selectors_include_the_dispatcher():
+    assert ipc.get_function_selectors(bytecode=SPLIT_HUB) == ('00abcdef', '11111111', '66666666')
+
+def test_interface_coverage_uses_the_dispatcher():
+    __index = {'split': frozenset({0x00abcdef, 0x11111111})}
+    assert iii.get_interface_coverage(bytecode=SPLIT_HUB, index=__index) == {'split': 1.}
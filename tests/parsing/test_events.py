@@ -1,3 +1,61 @@
 import pytest
 
 import ioseeth.parsing.events as ipe
+import tests.test_data as td
+
+# TRANSFER VIEW ###############################################################
+
+def test_transfer_view_has_one_row_per_event():
+    __transfers = ipe.parse_transfer_events(logs=td.TRANSFER_LOGS)
+    assert all(len(__c) == len(td.TRANSFER_LOGS) for __c in __transfers)
+    assert __transfers.value == tuple(10 * __i for __i in range(8))
+    assert all(__transfers.is_mint)
+    assert __transfers.recipient[1] == '0x' + 39 * '0' + '2'
+
+def test_transfer_view_is_built_once():
+    __transfers = ipe.parse_transfer_events(logs=td.TRANSFER_LOGS)
+    assert ipe.parse_transfer_events(logs=__transfers) is __transfers
+
+def test_transfer_view_ignores_other_events():
+    assert not ipe.parse_transfer_events(logs=[dict(td.TRANSFER_LOGS[0], topics=['0x' + 64 * '1'] + td.TRANSFER_LOGS[0]['topics'][1:])]).value
+
+# DECODERS ####################################################################
+
+def test_event_decoders_are_shared_by_logs_with_the_same_topics():
+    __abi = ipe.EVENT_ABIS[td.TRANSFER_TOPIC[2:]]
+    __first = ipe.get_event_decoder(abi=__abi, topics=ipe._parse_log_topics(td.TRANSFER_LOGS[0]))
+    assert ipe.get_event_decoder(abi=__abi, topics=ipe._parse_log_topics(td.TRANSFER_LOGS[2])) is __first
+    assert ipe.get_event_decoder(abi=__abi, topics=ipe._parse_log_topics(td.TRANSFER_LOGS[1])) is not __first # value indexed
+
+def test_event_decoders_match_web3():
+    import web3._utils.events
+    __abi = ipe.EVENT_ABIS[td.TRANSFER_TOPIC[2:]]
+    for __log in td.TRANSFER_LOGS[:2]:
+        __expected = web3._utils.events.get_event_data(ipe._abi_codec(), ipe._generate_the_most_probable_abi_indexation_variant(abi=__abi, indexed=len(__log['topics']) - 1), __log)
+        assert ipe.get_event_data(log=__log, abi=__abi)['args'] == dict(__expected['args'])
+
+# FAST PATH ###################################################################
+
+def test_fast_path_handles_both_indexation_variants():
+    assert ipe.decode_standard_log(log=td.TRANSFER_LOGS[2]) == ('0x' + 20 * 'ab', '0x' + 40 * '0', '0x' + 39 * '0' + '3', 20)
+    assert ipe.decode_standard_log(log=td.TRANSFER_LOGS[3]) == ('0x' + 20 * 'ab', '0x' + 40 * '0', '0x' + 39 * '0' + '4', 30)
+
+def test_fast_path_rejects_unusual_layouts():
+    assert ipe.decode_standard_log(log=dict(td.TRANSFER_LOGS[0], data=td.TRANSFER_LOGS[0]['data'] + 64 * '0')) is None # extra data
+    assert ipe.decode_standard_log(log=dict(td.TRANSFER_LOGS[0], topics=td.TRANSFER_LOGS[0]['topics'][:1] + ['0x' + 64 * 'f'] + td.TRANSFER_LOGS[0]['topics'][2:])) is None # dirty padding
+
+def test_unusual_layouts_fall_back_on_the_generic_decoder():
+    __log = td.transfer_log(sender=1, recipient=2, value=0)
+    __log['topics'] = __log['topics'][:2]
+    __log['data'] = '0x{:064x}{:064x}'.format(2, 42) # only the sender is indexed
+    assert ipe.parse_transfer_events(logs=[__log]).value == (42,)
+
+def test_malformed_logs_are_skipped():
+    __empty = dict(td.TRANSFER_LOGS[0], data='0x') # 3 topics without data
+    __dirty = dict(td.TRANSFER_LOGS[0], topics=td.TRANSFER_LOGS[0]['topics'][:1] + ['0x' + 64 * 'f'] + td.TRANSFER_LOGS[0]['topics'][2:])
+    assert ipe.parse_transfer_events(logs=[__empty, __dirty]).value == ()
+    assert ipe.parse_transfer_events(logs=[__empty, td.TRANSFER_LOGS[1], __dirty]).value == (10,)
+
+def test_approval_view_has_the_same_layout():
+    __logs = [dict(__l, topics=['0x' + ipe.APPROVAL_TOPIC.hex()] + __l['topics'][1:]) for __l in td.TRANSFER_LOGS]
+    assert ipe.parse_approval_events(logs=__logs).value == ipe.parse_transfer_events(logs=td.TRANSFER_LOGS).value
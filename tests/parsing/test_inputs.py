@@ -83,3 +83,20 @@ def test_find_array_length_in_batch_data():
 def test_find_arrays_in_batch_data():
     assert any([inputs.get_array_of_address_candidates(data=_d) for _d in DATA]) # not all batch transactions have array inputs
     assert any([inputs.get_array_of_value_candidates(data=_d) for _d in DATA]) # not all batch transactions have array inputs
+
+# WORDS #######################################################################
+
+def test_word_classes_match_the_regex_checks():
+    for _d in DATA:
+        _words = inputs.to_words(_d)
+        _chunks = list(inputs.chunk(_d[10:10 + 64 * len(_words)], 64))
+        assert list(inputs.is_address_word(_words)) == [bool(re.fullmatch(inputs.address_regex(), _c)) and inputs.is_valid_address(_c) for _c in _chunks]
+        assert list(inputs.is_value_word(_words)) == [bool(re.fullmatch(inputs.value_regex(), _c)) and inputs.is_valid_value(_c) for _c in _chunks]
+
+def test_run_lengths():
+    assert list(inputs.get_run_lengths(inputs.numpy.array([True, True, False, True, False, False]))) == [2, 1, 0, 1, 0, 0]
+
+def test_arrays_are_aligned_on_words():
+    _array = '{:064x}'.format(4) + 4 * ('0' * 24 + 'ab' * 20)
+    assert inputs.get_array_of_address_candidates(data='0x12345678' + _array) == [4 * ['0x' + 'ab' * 20]]
+    assert not inputs.get_array_of_address_candidates(data='0x12345678' + '00' + _array + 62 * '0') # shifted by a byte
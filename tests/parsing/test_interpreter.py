@@ -0,0 +1,35 @@
+"""Test the abstract interpretation of the bytecode."""
+
+import ioseeth.parsing.interpreter as ipi
+import ioseeth.utils
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+LOOP = '0x5b6001600055600056' # JUMPDEST SSTORE 1 at 0, JUMP to 0
+
+# INTERPRETER #################################################################
+
+def test_constants_are_folded_through_arithmetic():
+    __effects = ipi.interpret(bytecode=td.COMPUTED_PROXY)
+    assert ipi.get_storage_slots(bytecode=td.COMPUTED_PROXY) == (td.IMPLEMENTATION_SLOT,)
+    assert ipi.get_delegated_slots(bytecode=td.COMPUTED_PROXY) == (td.IMPLEMENTATION_SLOT,)
+    assert __effects.complete
+
+def test_constant_memory_is_hashed():
+    assert ipi.interpret(bytecode=td.HASHED_SLOT).sstores == frozenset({int(ioseeth.utils.keccak(primitive=(0x42).to_bytes(32, 'big')), 16)})
+
+def test_constant_call_targets_are_reported():
+    __bytecode = '0x' + 4 * '6000' + '73' + 19 * '00' + '01' + '5a' + 'fa' + '00' # STATICCALL to 0x..01
+    assert ipi.interpret(bytecode=__bytecode).calls == frozenset({1})
+
+def test_loops_are_cut():
+    __effects = ipi.interpret(bytecode=LOOP)
+    assert __effects.sstores == frozenset({0})
+    assert __effects.complete
+
+def test_the_budget_bounds_the_execution():
+    __effects = ipi.interpret(bytecode=td.RAW, budget=64)
+    assert __effects.steps == 64
+    assert not __effects.complete
+    assert ipi.interpret(bytecode=td.RAW).complete
@@ -0,0 +1,43 @@
+import pytest
+
+import ioseeth.indicators.redpill as iir
+import ioseeth.parsing.bytecode as ipb
+import ioseeth.parsing.patterns as ipp
+
+# FIXTURES ####################################################################
+
+PATTERN = ipp.sequence(
+    ipp.token(ipb.COINBASE),
+    ipp.optional(ipp.push(1, argument=0)),
+    ipp.either(ipp.token(ipb.SUB), ipp.sequence(ipp.token(ipb.EQ), ipp.token(ipb.ISZERO))),
+    ipp.push(1, 2),
+    ipp.token(ipb.JUMPI))
+
+MATCHER = ipp.Matcher(pattern=PATTERN)
+
+# TOKENS ######################################################################
+
+def test_optional_and_alternative_tokens():
+    assert MATCHER.search('41036010575b') # COINBASE SUB PUSH1 JUMPI
+    assert MATCHER.search('416000141561001057') # COINBASE PUSH1 0 EQ ISZERO PUSH2 JUMPI
+    assert not MATCHER.search('416001036010575b') # PUSH1 1 instead of 0
+
+def test_matches_can_start_anywhere():
+    assert MATCHER.search('6080604052' + '41036010575b')
+    assert MATCHER.search('4141036010575b') # restart on the second COINBASE
+
+# BOUNDARIES ##################################################################
+
+def test_push_data_is_not_matched():
+    assert not MATCHER.search('6341036010' + '575b') # the COINBASE is an argument of PUSH4
+
+def test_dead_code_is_not_matched():
+    assert not MATCHER.search('00' + '41036010575b') # after STOP, without JUMPDEST
+    assert MATCHER.search('00' + '41036010575b', reachable=False)
+    assert not MATCHER.search('fe5b' + '41036010575b') # JUMPDEST that no jump reaches
+    assert MATCHER.search('600356' '5b' + '41036010575b') # JUMPDEST reached by the jump
+
+# RED PILL ####################################################################
+
+def test_red_pill_patterns_are_linear():
+    assert not iir.bytecode_has_coinbase_test('41' + 12000 * '6000' + '57') # too far from the jump
@@ -0,0 +1,62 @@
+import random
+import subprocess
+import sys
+
+import pytest
+
+import ioseeth.indicators.metamorphism as iim
+import ioseeth.indicators.proxy as iip
+import ioseeth.metrics.evasion.morphing.metamorphism
+import ioseeth.parsing.signatures as ips
+
+# FIXTURES ####################################################################
+
+PATTERNS = {'he': b'he', 'she': b'she', 'his': b'his', 'hers': b'hers', 'e': b'e'}
+
+def naive_scan(data: bytes, patterns: dict) -> frozenset:
+    return frozenset(__n for __n, __p in patterns.items() if __p in data)
+
+# AUTOMATON ###################################################################
+
+def test_overlapping_patterns_are_all_found():
+    __automaton = ips.compile_automaton(patterns=PATTERNS)
+    assert ips.scan(b'ushers', __automaton) == {'she', 'he', 'hers', 'e'}
+    assert ips.scan(b'', __automaton) == frozenset()
+
+def test_automaton_matches_the_naive_scan():
+    __patterns = {str(__i): bytes(random.choices(b'\x00\x01\x02', k=random.randint(1, 6))) for __i in range(32)}
+    __automaton = ips.compile_automaton(patterns=__patterns)
+    for _ in range(64):
+        __data = bytes(random.choices(b'\x00\x01\x02\x03', k=256))
+        assert ips.scan(__data, __automaton) == naive_scan(__data, __patterns)
+
+# REGISTRY ####################################################################
+
+def test_indicators_register_their_constants():
+    assert ips.get_family('proxy/logic-slot') == tuple('proxy/logic-slot/' + __k for __k in iip.LOGIC_SLOTS)
+    assert len(ips.get_family('metamorphism/init-code')) == len(iim.INIT_CODES)
+
+def test_all_the_signatures_are_found_in_one_scan():
+    __bytecode = '0x7f' + iip.LOGIC_SLOTS['erc-1967'] + '54' + iim.INIT_CODES[0]
+    assert {'proxy/logic-slot/erc-1967', 'metamorphism/init-code/0', 'selector/get-implementation/0'} <= ips.get_signature_hits(__bytecode)
+    assert iip.bytecode_uses_standard_proxy_slots(__bytecode)
+    assert not iip.bytecode_has_proxy_slots_from_several_standards(__bytecode)
+    assert iim.bytecode_has_known_metamorphic_init_code(__bytecode)
+
+def test_new_signatures_are_found_without_a_new_scan_function():
+    ips.register_signature(name='test/marker', pattern='0xdeadbeef')
+    try:
+        assert ips.bytecode_has_signature('0x60deadbeef00', name='test/marker')
+    finally:
+        del ips.SIGNATURES['test/marker']
+    assert not ips.bytecode_has_signature('0x60deadbeef00', name='test/marker')
+
+def test_registry_version_is_stable_across_processes():
+    __script = 'import ioseeth.indicators.proxy, ioseeth.parsing.signatures as s; print(s.get_version())'
+    __versions = {subprocess.run([sys.executable, '-c', __script], capture_output=True, text=True, check=True).stdout for _ in range(2)}
+    assert len(__versions) == 1
+
+def test_copies_of_the_standards_use_the_registered_signatures():
+    __bytecode = '0x7f' + iip.LOGIC_SLOTS['erc-1967'] + '54'
+    assert iip.bytecode_uses_standard_proxy_slots(__bytecode, standards=dict(iip.LOGIC_SLOTS)) == iip.bytecode_uses_standard_proxy_slots(__bytecode)
+    assert ips.lookup_signature(pattern=iip.LOGIC_SLOTS['erc-1967']) == 'proxy/logic-slot/erc-1967'
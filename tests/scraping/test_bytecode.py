@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+import ioseeth.scraping.bytecode as isb
+import ioseeth.scraping.rpc as isr
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+BLOCKS = [0, 1, 7, 12345, 9999999, td.LATEST_BLOCK - 1, td.LATEST_BLOCK] # the stub deploys each contract at block = address
+
+ADDRESSES = ['0x{:040x}'.format(__b) for __b in BLOCKS]
+
+def search(url: str, addresses: list, **kwargs) -> dict:
+    return isb.find_deployment_blocks_sync(provider=isr.AsyncBatchProvider(url=url, batch_size=1024), addresses=addresses, **kwargs)
+
+# PROBES ######################################################################
+
+def test_probes_are_inside_the_interval():
+    assert isb._get_probes(left=10, right=12, arity=8) == [10, 11]
+    assert all(10 <= __p < 1000 for __p in isb._get_probes(left=10, right=1000, arity=8))
+
+# BATCH SEARCH ################################################################
+
+def test_deployment_blocks_are_exact(url):
+    assert search(url=url, addresses=ADDRESSES) == dict(zip(ADDRESSES, BLOCKS))
+
+def test_contracts_deployed_after_the_right_bound_are_not_found(url):
+    assert search(url=url, addresses=ADDRESSES[-2:], right=td.LATEST_BLOCK - 2) == {ADDRESSES[-2]: None, ADDRESSES[-1]: None}
+
+def test_all_the_contracts_share_the_round_trips(url):
+    td.StubNode.requests.clear()
+    search(url=url, addresses=ADDRESSES, arity=16)
+    assert len(td.StubNode.requests) <= 2 + 24 // 4 # block number + existence + log16(2**24) rounds
+
+def test_known_bounds_skip_the_search(url):
+    td.StubNode.requests.clear()
+    __bounds = isb.get_deployment_bounds_from_traces([{'type': 'create', 'blockNumber': 12345, 'result': {'address': ADDRESSES[3]}}])
+    assert search(url=url, addresses=ADDRESSES[3:4], bounds=__bounds, right=td.LATEST_BLOCK) == {ADDRESSES[3]: 12345}
+    assert not td.StubNode.requests
@@ -0,0 +1,58 @@
+import pytest
+import web3
+
+import ioseeth.scraping.cache as isc
+
+# FIXTURES ####################################################################
+
+LATEST = 1000
+ADDRESS = web3.Web3.to_checksum_address('0x' + 20 * 'ab')
+
+class StubProvider(web3.providers.BaseProvider):
+    """Answer eth_getBalance with balance = 7 * block, and record the calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def make_request(self, method, params):
+        self.calls.append(method)
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(LATEST)}
+        if method == 'eth_getBalance':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(7 * (LATEST if params[1] == 'latest' else int(params[1], 16)))}
+        return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32601, 'message': 'method not found'}}
+
+@pytest.fixture
+def w3(tmp_path):
+    __w3 = web3.Web3(StubProvider())
+    isc.enable_rpc_cache(w3=__w3, path=str(tmp_path / 'rpc.sqlite'), finality=64)
+    return __w3
+
+# KEYS ########################################################################
+
+def test_keys_ignore_the_case_of_the_addresses():
+    assert isc.request_key('eth_getCode', [ADDRESS, '0x10']) == isc.request_key('eth_getCode', [ADDRESS.lower(), '0x10'])
+
+def test_block_tags_are_not_numbers():
+    assert isc.get_block_number('eth_getBalance', [ADDRESS, 'latest']) is None
+    assert isc.get_block_number('eth_getStorageAt', [ADDRESS, '0x0', '0x10']) == 16
+
+# MIDDLEWARE ##################################################################
+
+def test_final_blocks_are_fetched_once(w3):
+    for _ in range(4):
+        assert w3.eth.get_balance(ADDRESS, 10) == 70
+    assert w3.provider.calls.count('eth_getBalance') == 1
+
+def test_recent_blocks_are_not_cached(w3):
+    for _ in range(4):
+        assert w3.eth.get_balance(ADDRESS, LATEST - 8) == 7 * (LATEST - 8)
+        assert w3.eth.get_balance(ADDRESS) == 7 * LATEST
+    assert w3.provider.calls.count('eth_getBalance') == 8
+
+def test_the_cache_persists_across_instances(w3, tmp_path):
+    w3.eth.get_balance(ADDRESS, 10)
+    __other = web3.Web3(StubProvider())
+    isc.enable_rpc_cache(w3=__other, path=str(tmp_path / 'rpc.sqlite'))
+    assert __other.eth.get_balance(ADDRESS, 10) == 70
+    assert not __other.provider.calls
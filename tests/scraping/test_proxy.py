@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import ioseeth.cache as ic
+import ioseeth.indicators.proxy as iip
+import ioseeth.scraping.proxy as isp
+import ioseeth.scraping.rpc as isr
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+def address(index: int) -> str:
+    return '0x{:040x}'.format(index)
+
+def clone(implementation: str) -> str:
+    return '0x363d3d373d3d3d363d73' + implementation[2:] + '5af43d82803e903d91602b57fd5bf3'
+
+LOGIC = '0x' + iip.LOGIC_SLOTS['erc-1967']
+BEACON = '0x' + iip.BEACON_SLOTS['erc-1967']
+
+# clone (1) => beacon proxy (2) => [beacon (3)] => transparent proxy (4) => logic (5)
+# beacon proxy (8) => [not a beacon (9)], implementation() reverts
+CODES = {address(__i): clone(address(2)) if __i == 1 else '0x60' for __i in range(1, 10)}
+STORAGE = {(address(2), BEACON): address(3), (address(4), LOGIC): address(5), (address(6), LOGIC): address(7), (address(7), LOGIC): address(6), (address(8), BEACON): address(9)}
+BEACONS = {address(3): address(4)}
+
+class StubNode(td.StubNode):
+    """Serve the code, storage and beacons of the fixture contracts."""
+
+    def answer(self, call: dict) -> dict:
+        __params = call['params']
+        if call['method'] == 'eth_getCode':
+            __result = CODES.get(__params[0], '0x')
+        elif call['method'] == 'eth_getStorageAt':
+            __result = '0x{:0>64}'.format(STORAGE.get((__params[0], __params[1]), '0x0')[2:])
+        elif call['method'] == 'eth_call' and __params[0]['to'] not in BEACONS:
+            return {'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': 3, 'message': 'execution reverted'}}
+        elif call['method'] == 'eth_call':
+            __result = '0x{:0>64}'.format(BEACONS[__params[0]['to']][2:])
+        else:
+            return super().answer(call)
+        return {'jsonrpc': '2.0', 'id': call['id'], 'result': __result}
+
+@pytest.fixture(scope='module')
+def url():
+    __server = td.serve(StubNode)
+    yield 'http://127.0.0.1:{port}'.format(port=__server.server_address[1])
+    __server.shutdown()
+
+def resolve(url: str, addresses: list, **kwargs) -> dict:
+    async def __resolve():
+        async with isr.AsyncBatchProvider(url=url) as __provider:
+            return await isp.resolve_implementations(provider=__provider, addresses=addresses, **kwargs)
+    return asyncio.run(__resolve())
+
+# OFFLINE #####################################################################
+
+def test_minimal_proxies_are_decoded_offline():
+    assert iip.get_minimal_proxy_implementation(clone(address(2))) == address(2)
+    assert not iip.get_minimal_proxy_implementation('0x60')
+
+# CHAINS ######################################################################
+
+def test_chains_are_followed_through_clones_beacons_and_slots(url):
+    __chains = resolve(url=url, addresses=[address(1), address(5)])
+    assert [__l.standard for __l in __chains[address(1)]] == ['erc-1167', 'beacon/erc-1967', 'slot/erc-1967']
+    assert isp.get_final_implementation(__chains[address(1)]) == address(5)
+    assert __chains[address(5)] == []
+
+def test_reverted_beacons_do_not_abort_the_batch(url):
+    __chains = resolve(url=url, addresses=[address(8), address(1), address(4)])
+    assert __chains[address(8)] == []
+    assert isp.get_final_implementation(__chains[address(1)]) == isp.get_final_implementation(__chains[address(4)]) == address(5)
+
+def test_depth_is_bounded_and_cycles_stop(url):
+    assert len(resolve(url=url, addresses=[address(1)], depth=1)[address(1)]) == 1
+    assert len(resolve(url=url, addresses=[address(6)])[address(6)]) == 1 # 6 => 7, then back to 6
+
+def test_links_are_cached_per_block(url):
+    __cache = ic.LRUCache(maxsize=64)
+    resolve(url=url, addresses=[address(1)], block=100, cache=__cache)
+    td.StubNode.requests.clear()
+    assert isp.get_final_implementation(resolve(url=url, addresses=[address(1)], block=100, cache=__cache)[address(1)]) == address(5)
+    assert not td.StubNode.requests
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+import ioseeth.indicators.batch as iib
+import ioseeth.parsing.balances as ipb
+import ioseeth.scraping.rpc as isr
+import tests.test_data as td
+
+# FIXTURES ####################################################################
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def multisend(recipients: list) -> str:
+    """Encode a call to multisend(address[],uint256[])."""
+    __count = len(recipients)
+    __words = [64, 64 + 32 * (__count + 1), __count] + recipients + [__count] + __count * [10**18]
+    return '0x' + 'e63d38ed' + ''.join('{:064x}'.format(__w) for __w in __words)
+
+# BATCHES #####################################################################
+
+def test_results_are_in_the_order_of_the_calls(url):
+    async def __balances():
+        async with isr.AsyncBatchProvider(url=url, batch_size=3) as __provider:
+            return await __provider.get_balances(addresses=['0x{:040x}'.format(__i) for __i in range(10)], block=2)
+    assert run(__balances()) == [2 * __i for __i in range(10)]
+
+def test_errors_are_raised(url):
+    async def __unknown():
+        async with isr.AsyncBatchProvider(url=url) as __provider:
+            return await __provider.request('eth_unknown')
+    with pytest.raises(ValueError):
+        run(__unknown())
+
+def test_errors_can_be_answered_with_none(url):
+    async def __mixed():
+        async with isr.AsyncBatchProvider(url=url) as __provider:
+            return await __provider.batch([('eth_getBalance', ('0x2', '0x3')), ('eth_unknown', ())], errors=False)
+    assert run(__mixed()) == ['0x6', None]
+
+# BALANCES ####################################################################
+
+def test_balance_deltas_cost_a_single_round_trip(url):
+    td.StubNode.requests.clear()
+    __addresses = ['0x{:040x}'.format(__i) for __i in range(200)]
+    async def __deltas():
+        async with isr.AsyncBatchProvider(url=url, batch_size=400) as __provider:
+            return await ipb.get_balance_deltas_async(provider=__provider, addresses=__addresses, block=10)
+    assert run(__deltas()) == {__a: int(__a, 16) for __a in __addresses[1:]} # the null address has no balance
+    assert len(td.StubNode.requests) == 1
+
+def test_multisend_recipients_are_checked_in_batches(url):
+    td.StubNode.requests.clear()
+    __data = multisend(recipients=[(1 << 159) + __i for __i in range(200)])
+    async def __check():
+        async with isr.AsyncBatchProvider(url=url, batch_size=256) as __provider:
+            return await iib.multiple_native_token_balances_changed_async(provider=__provider, data=__data, block=10, min_count=8, min_total=1)
+    assert run(__check())
+    assert len(td.StubNode.requests) == 2
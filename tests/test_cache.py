@@ -0,0 +1,67 @@
+import pytest
+
+import ioseeth.cache as ic
+import ioseeth.parsing.bytecode as ipb
+
+# FIXTURES ####################################################################
+
+BYTECODE = '0x6080604052348015600f57600080fd5b5060043610603c5760003560e01c8063a9059cbb146041578063095ea7b3146041575b600080fd5b00'
+
+# HASH ########################################################################
+
+def test_code_hash_ignores_the_encoding():
+    assert ic.code_hash(BYTECODE) == ic.code_hash(BYTECODE[2:]) == ic.code_hash(bytes.fromhex(BYTECODE[2:]))
+
+# LRU #########################################################################
+
+def test_lru_evicts_the_oldest_entries():
+    __cache = ic.LRUCache(maxsize=2)
+    __cache.set('a', 1)
+    __cache.set('b', 2)
+    __cache.get('a')
+    __cache.set('c', 3)
+    assert __cache.get('a') == 1
+    assert __cache.get('b') is None
+    assert __cache.info() == ic.CacheInfo(hits=2, misses=1, maxsize=2, currsize=2)
+
+def test_disk_store_outlives_the_memory(tmp_path):
+    __store = ic.DiskStore(path=str(tmp_path / 'cache.sqlite'))
+    ic.LRUCache(maxsize=8, store=__store).set(('key',), (1, 2))
+    __cache = ic.LRUCache(maxsize=8, store=__store)
+    assert __cache.get(('key',)) == (1, 2)
+    assert __cache.info().hits == 1
+    assert len(__store) == 1
+
+# MEMOIZATION #################################################################
+
+def test_each_code_is_analysed_once():
+    __cache = ic.configure_bytecode_cache(maxsize=64)
+    __first = ipb.get_function_selectors(bytecode=BYTECODE)
+    __info = __cache.info()
+    for _ in range(8):
+        assert ipb.get_function_selectors(bytecode=BYTECODE) == __first
+    assert __cache.info().misses == __info.misses
+    assert __cache.info().hits == __info.hits + 8
+
+def test_positional_codes_are_indexed_by_hash():
+    __cache = ic.configure_bytecode_cache(maxsize=64)
+    __metric = ic.memoize_by_code_hash(lambda action, creation_bytecode, runtime_bytecode: len(creation_bytecode))
+    assert __metric('create', BYTECODE, '0x') == __metric(action='create', creation_bytecode=BYTECODE, runtime_bytecode='0x')
+    assert __cache.info().hits == 1
+    assert all(BYTECODE not in str(__k) for __k in __cache._data)
+
+def test_disk_store_evicts_the_least_recently_accessed(tmp_path):
+    __store = ic.DiskStore(path=str(tmp_path / 'cache.sqlite'), maxsize=4096, interval=0.)
+    for __i in range(16):
+        __store.set(str(__i), bytes(512))
+        __store.get('0') # keep the first entry alive
+    assert __store.size() <= 4096
+    assert __store.get('0') is not None
+    assert __store.get('1') is None
+
+def test_fresh_access_times_are_not_rewritten(tmp_path):
+    __store = ic.DiskStore(path=str(tmp_path / 'cache.sqlite'), maxsize=4096)
+    __store.set('0', bytes(512))
+    __atime = __store._connect().execute('SELECT atime FROM cache').fetchone()[0]
+    __store.get('0')
+    assert __store._connect().execute('SELECT atime FROM cache').fetchone()[0] == __atime
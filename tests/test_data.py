@@ -1,8 +1,14 @@
 """Historic blockchain data"""
 
+import http.server
 import itertools
+import json
 import os
 import pickle
+import threading
+
+import toolblocks.parsing.common as fpc
+import ioseeth.utils
 
 # IO ##########################################################################
 
@@ -44,3 +50,88 @@ ALL_TRANSACTIONS = tuple(itertools.chain.from_iterable([TRANSACTIONS[__type][__s
 ALL_TRACES = tuple(itertools.chain.from_iterable([TRACES[__type][__subtype] for __type in TRACES for __subtype in TRACES[__type]]))
 
 ALL_LOGS = tuple(itertools.chain.from_iterable([LOGS[__type][__subtype] for __type in LOGS for __subtype in LOGS[__type]]))
+
+# BYTECODE ####################################################################
+
+RAW = '0x608060405234801561001057600080fd5b50600436106100415760003560e01c80631c4695f4146100465780633d7403a3146100645780636d4ce63c14610080575b600080fd5b61004e61009e565b60405161005b9190610314565b60405180910390f35b61007e6004803603810190610079919061047f565b61012c565b005b610088610146565b6040516100959190610314565b60405180910390f35b600080546100ab906104f7565b80601f01602080910402602001604051908101604052809291908181526020018280546100d7906104f7565b80156101245780601f106100f957610100808354040283529160200191610124565b820191906000526020600020905b81548152906001019060200180831161010757829003601f168201915b505050505081565b80600090805190602001906101429291906101d8565b5050565b606060008054610155906104f7565b80601f0160208091040260200160405190810160405280929190818152602001828054610181906104f7565b80156101ce5780601f106101a3576101008083540402835291602001916101ce565b820191906000526020600020905b8154815290600101906020018083116101b157829003601f168201915b5050505050905090565b8280546101e4906104f7565b90600052602060002090601f016020900481019282610206576000855561024d565b82601f1061021f57805160ff191683800117855561024d565b8280016001018555821561024d579182015b8281111561024c578251825591602001919060010190610231565b5b50905061025a919061025e565b5090565b5b8082111561027757600081600090555060010161025f565b5090565b600081519050919050565b600082825260208201905092915050565b60005b838110156102b557808201518184015260208101905061029a565b838111156102c4576000848401525b50505050565b6000601f19601f8301169050919050565b60006102e68261027b565b6102f08185610286565b9350610300818560208601610297565b610309816102ca565b840191505092915050565b6000602082019050818103600083015261032e81846102db565b905092915050565b6000604051905090565b600080fd5b600080fd5b600080fd5b600080fd5b7f4e487b7100000000000000000000000000000000000000000000000000000000600052604160045260246000fd5b61038c826102ca565b810181811067ffffffffffffffff821117156103ab576103aa610354565b5b80604052505050565b60006103be610336565b90506103ca8282610383565b919050565b600067ffffffffffffffff8211156103ea576103e9610354565b5b6103f3826102ca565b9050602081019050919050565b82818337600083830152505050565b600061042261041d846103cf565b6103b4565b90508281526020810184848401111561043e5761043d61034f565b5b610449848285610400565b509392505050565b600082601f8301126104665761046561034a565b5b813561047684826020860161040f565b91505092915050565b60006020828403121561049557610494610340565b5b600082013567ffffffffffffffff8111156104b3576104b2610345565b5b6104bf84828501610451565b91505092915050565b7f4e487b7100000000000000000000000000000000000000000000000000000000600052602260045260246000fd5b6000600282049050600182168061050f57607f821691505b60208210811415610523576105226104c8565b5b5091905056fea264697066735822122014c357c4501b2214feba94e456acc1333edfefe021426146d970ef3a848545a864736f6c634300080a0033'
+
+ERC20_SELECTORS = ('06fdde03', '95d89b41', '313ce567', '18160ddd', '70a08231', 'a9059cbb', 'dd62ed3e', '095ea7b3', '23b872dd')
+
+ERC20_HUB = '0x' + ''.join('8063{selector}14610100575b'.format(selector=__s) for __s in ERC20_SELECTORS) # DUP1 PUSH4 EQ PUSH2 JUMPI JUMPDEST
+
+IMPLEMENTATION_HASH = ioseeth.utils.keccak(text='eip1967.proxy.implementation')
+IMPLEMENTATION_SLOT = '{:064x}'.format(int(IMPLEMENTATION_HASH, 16) - 1)
+
+COMPUTED_PROXY = (
+    '0x7f' + IMPLEMENTATION_HASH + '6001' '90' '03' # PUSH32 hash PUSH1 1 SWAP1 SUB
+    '54' '73' + 20 * 'ff' + '16' # SLOAD PUSH20 mask AND
+    '6000' '6000' '6000' '6000' '93' '5a' 'f4' '00') # args, SWAP4, GAS DELEGATECALL STOP
+
+HASHED_SLOT = (
+    '0x6042' '6000' '52' # MSTORE 0x42 at 0
+    '6020' '6000' '20' # SHA3 over 32 bytes
+    '6001' '90' '55' '00') # SSTORE 1 at the hash
+
+def deploy(runtime: str) -> str:
+    """Prepend the init code that copies and returns the runtime: PUSH2 size DUP1 PUSH2 offset PUSH1 0 CODECOPY PUSH1 0 RETURN INVALID."""
+    __size = len(fpc.to_bytes(runtime))
+    return '61{size:04x}806100{offset:02x}600039' '6000f3' 'fe'.format(size=__size, offset=14) + fpc.to_hexstr(runtime)
+
+# EVENTS ######################################################################
+
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+def transfer_log(sender: int, recipient: int, value: int, indexed: bool=False) -> dict:
+    __topics = [TRANSFER_TOPIC, '0x{:064x}'.format(sender), '0x{:064x}'.format(recipient)] + indexed * ['0x{:064x}'.format(value)]
+    return {
+        'address': '0x' + 20 * 'ab',
+        'topics': __topics,
+        'data': '0x' if indexed else '0x{:064x}'.format(value),
+        'logIndex': 0,
+        'transactionIndex': 0,
+        'transactionHash': '0x' + 64 * '0',
+        'blockHash': '0x' + 64 * '0',
+        'blockNumber': 1}
+
+TRANSFER_LOGS = [transfer_log(sender=0, recipient=1 + __i, value=10 * __i, indexed=bool(__i % 2)) for __i in range(8)]
+
+SYNTHETIC_TRANSACTIONS = [
+    {'data': '0x', 'logs': TRANSFER_LOGS[:__i], 'traces': [], 'value': hex(__i * 10**17), 'to': '0x' + 40 * 'a'}
+    for __i in range(12)]
+
+# RPC #########################################################################
+
+LATEST_BLOCK = 2**24
+
+class StubNode(http.server.BaseHTTPRequestHandler):
+    """Answer eth_getBalance with balance = address * block, deploy the contracts at block = address, and count the HTTP requests."""
+
+    requests = []
+
+    def do_POST(self):
+        __payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StubNode.requests.append(__payload)
+        __responses = [self.answer(__c) for __c in (__payload if isinstance(__payload, list) else [__payload])]
+        __body = json.dumps(list(reversed(__responses))).encode('utf-8') # the order of the responses is not guaranteed
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(__body)))
+        self.end_headers()
+        self.wfile.write(__body)
+
+    def answer(self, call: dict) -> dict:
+        if call['method'] == 'eth_getBalance':
+            return {'jsonrpc': '2.0', 'id': call['id'], 'result': hex(int(call['params'][0], 16) * int(call['params'][1], 16))}
+        if call['method'] == 'eth_getCode':
+            return {'jsonrpc': '2.0', 'id': call['id'], 'result': '0x6001' if int(call['params'][1], 16) >= int(call['params'][0], 16) else '0x'}
+        if call['method'] == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': call['id'], 'result': hex(LATEST_BLOCK)}
+        return {'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': -32601, 'message': 'method not found'}}
+
+    def log_message(self, *args):
+        pass
+
+def serve(handler: type) -> http.server.ThreadingHTTPServer:
+    __server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=__server.serve_forever, daemon=True).start()
+    return __server